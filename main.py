@@ -1,4 +1,5 @@
 import sys
+import multiprocessing
 from PyQt6.QtWidgets import QApplication
 from src.ui.main_window import MainWindow
 from src.utils.environment_check import main as check_environment
@@ -11,4 +12,5 @@ def main():
     sys.exit(app.exec())
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # 打包后的进程池工作进程需要
     main()
\ No newline at end of file
@@ -4,6 +4,24 @@ from datetime import datetime
 import logging
 from typing import List, Dict, Optional, Union, Tuple
 from contextlib import contextmanager
+from ..images.deck_media_cache import make_virtual_path, VIRTUAL_PREFIX, VIRTUAL_SEPARATOR
+
+# shape_index保存引用图片的形状标识：幻灯片中形状的cNvPr id，背景图片为'background'，
+# 其他来源（PDF、旧版PPT）为空或来源内的编号。列声明为INTEGER（主键的一部分，改类型需重建表），
+# 按SQLite的类型亲和性，数字形式的ID存为整数，其余按文本保存
+MAPPING_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS image_ppt_mapping (
+        img_hash TEXT,
+        pptx_path TEXT,
+        part_name TEXT,
+        slide_index INTEGER,
+        shape_index INTEGER,
+        created_at TEXT,
+        member_name TEXT,
+        PRIMARY KEY (img_hash, pptx_path, part_name, slide_index, shape_index)
+    )
+"""
+
 
 class DatabaseManager:
     """数据库管理器 - 负责所有数据库操作"""
@@ -13,6 +31,7 @@ class DatabaseManager:
         self.db_conn = None
         self.cursor = None
         self.table_name = "images"
+        self.fts_enabled = False
         self.logger = logging.getLogger(__name__)
         
         # 确保目录存在
@@ -63,6 +82,21 @@ class DatabaseManager:
                 )
             """)
             
+            # 创建图片表
+            self.execute(f"""
+                CREATE TABLE IF NOT EXISTS {self.table_name} (
+                    img_hash TEXT PRIMARY KEY,
+                    img_path TEXT,
+                    img_name TEXT,
+                    extract_date TEXT,
+                    img_type TEXT,
+                    format TEXT,
+                    width INTEGER,
+                    height INTEGER,
+                    file_size INTEGER
+                )
+            """)
+            
             # 创建PPT源文件表
             self.execute("""
                 CREATE TABLE IF NOT EXISTS ppt_sources (
@@ -113,15 +147,96 @@ class DatabaseManager:
                 )
             """)
             
-            # 创建图片PPT映射表
+            # 创建图片PPT映射表（part_name为引用图片的部件，如幻灯片、版式、母版或备注页，
+            # member_name为图片在PPT中的成员，用于虚拟图库中图片路径的重新指向）
+            self._migrate_mapping_table()
+            self.execute(MAPPING_TABLE_SQL)
+            self._migrate_mapping_member()
+            
+            # 创建PPT变更清单表（用于增量索引）
             self.execute("""
-                CREATE TABLE IF NOT EXISTS image_ppt_mapping (
+                CREATE TABLE IF NOT EXISTS deck_manifest (
+                    pptx_path TEXT PRIMARY KEY,
+                    file_size INTEGER,
+                    mtime_ns INTEGER,
+                    fingerprint TEXT,
+                    indexed_at TEXT
+                )
+            """)
+            
+            # 创建媒体CRC索引表（用于跳过已知媒体的解压和哈希）
+            self.execute("""
+                CREATE TABLE IF NOT EXISTS media_crc_index (
+                    crc32 INTEGER,
+                    file_size INTEGER,
                     img_hash TEXT,
+                    PRIMARY KEY (crc32, file_size, img_hash)
+                )
+            """)
+            
+            # 创建PPT目录表（docProps中的文档属性和缩略图，用于快速浏览）
+            self.execute("""
+                CREATE TABLE IF NOT EXISTS decks (
+                    pptx_path TEXT PRIMARY KEY,
+                    file_size INTEGER,
+                    mtime_ns INTEGER,
+                    title TEXT,
+                    subject TEXT,
+                    author TEXT,
+                    last_modified_by TEXT,
+                    created TEXT,
+                    modified TEXT,
+                    slide_count INTEGER,
+                    thumbnail BLOB,
+                    cataloged_at TEXT
+                )
+            """)
+            
+            # 创建幻灯片文字表及其全文索引（用于跨PPT搜索文字）
+            self.execute("""
+                CREATE TABLE IF NOT EXISTS slide_text (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
                     pptx_path TEXT,
                     slide_index INTEGER,
-                    shape_index INTEGER,
+                    text TEXT,
+                    notes TEXT
+                )
+            """)
+            self.execute("CREATE INDEX IF NOT EXISTS idx_slide_text_path ON slide_text (pptx_path)")
+            self._init_fts_tables()
+            
+            # 创建幻灯片哈希表（规范化幻灯片XML的哈希，用于查找跨PPT复制的幻灯片）
+            self.execute("""
+                CREATE TABLE IF NOT EXISTS slides (
+                    pptx_path TEXT,
+                    slide_index INTEGER,
+                    part_name TEXT,
+                    slide_hash TEXT,
+                    PRIMARY KEY (pptx_path, slide_index)
+                )
+            """)
+            self.execute("CREATE INDEX IF NOT EXISTS idx_slides_hash ON slides (slide_hash)")
+            
+            # 创建索引任务日志表（用于中断后续跑）
+            self.execute("""
+                CREATE TABLE IF NOT EXISTS index_jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    folder_path TEXT,
+                    output_folder TEXT,
+                    status TEXT,
                     created_at TEXT,
-                    PRIMARY KEY (img_hash, pptx_path, slide_index, shape_index)
+                    updated_at TEXT
+                )
+            """)
+            self.execute("""
+                CREATE TABLE IF NOT EXISTS index_job_decks (
+                    job_id INTEGER,
+                    pptx_path TEXT,
+                    status TEXT,
+                    error TEXT,
+                    updated_at TEXT,
+                    PRIMARY KEY (job_id, pptx_path),
+                    FOREIGN KEY (job_id) REFERENCES index_jobs (id)
                 )
             """)
             
@@ -131,6 +246,60 @@ class DatabaseManager:
             self.logger.error(f"初始化数据库表失败: {str(e)}")
             raise
     
+    def _init_fts_tables(self):
+        """创建slide_text的FTS5外部内容索引，由触发器与slide_text保持同步
+        
+        使用trigram分词以支持中文等无空格分隔文字的子串搜索；SQLite不支持FTS5时
+        只保留slide_text表，搜索退化为LIKE查询。
+        """
+        for tokenizer in ('trigram', 'unicode61'):
+            try:
+                self.execute(f"""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS slide_text_fts USING fts5(
+                        text, notes, content='slide_text', content_rowid='id',
+                        tokenize='{tokenizer}'
+                    )
+                """)
+                break
+            except sqlite3.OperationalError as e:
+                self.logger.warning(f"创建全文索引失败（分词器 {tokenizer}）: {str(e)}")
+        else:
+            return
+        
+        self.execute("""
+            CREATE TRIGGER IF NOT EXISTS slide_text_ai AFTER INSERT ON slide_text BEGIN
+                INSERT INTO slide_text_fts (rowid, text, notes) VALUES (new.id, new.text, new.notes);
+            END
+        """)
+        self.execute("""
+            CREATE TRIGGER IF NOT EXISTS slide_text_ad AFTER DELETE ON slide_text BEGIN
+                INSERT INTO slide_text_fts (slide_text_fts, rowid, text, notes)
+                VALUES ('delete', old.id, old.text, old.notes);
+            END
+        """)
+        self.fts_enabled = True
+    
+    def _migrate_mapping_table(self):
+        """旧版映射表缺少part_name列时重建，原有映射归入空部件名"""
+        columns = [row[1] for row in self.execute("PRAGMA table_info(image_ppt_mapping)").fetchall()]
+        if not columns or 'part_name' in columns:
+            return
+        self.execute("ALTER TABLE image_ppt_mapping RENAME TO image_ppt_mapping_old")
+        self.execute(MAPPING_TABLE_SQL)
+        self.execute("""
+            INSERT OR IGNORE INTO image_ppt_mapping
+            (img_hash, pptx_path, part_name, slide_index, shape_index, created_at)
+            SELECT img_hash, pptx_path, '', slide_index, shape_index, created_at
+            FROM image_ppt_mapping_old
+        """)
+        self.execute("DROP TABLE image_ppt_mapping_old")
+    
+    def _migrate_mapping_member(self):
+        """旧版映射表缺少member_name列时补充（旧映射的成员未知，为NULL）"""
+        columns = [row[1] for row in self.execute("PRAGMA table_info(image_ppt_mapping)").fetchall()]
+        if 'member_name' not in columns:
+            self.execute("ALTER TABLE image_ppt_mapping ADD COLUMN member_name TEXT")
+    
     def execute(self, sql: str, params: Optional[Union[tuple, dict]] = None) -> sqlite3.Cursor:
         """执行SQL语句"""
         try:
@@ -172,6 +341,169 @@ class DatabaseManager:
         if self.db_conn:
             self.db_conn.close()
     
+    def bulk_ingest(self, pptx_path: str, images: List[Dict], replace_mappings: bool = False,
+                    job_id: Optional[int] = None, slides: Optional[List[Dict]] = None,
+                    slide_hashes: Optional[List[Dict]] = None) -> int:
+        """在单个事务中批量写入一个PPT的所有图片记录
+        
+        Args:
+            pptx_path: PPT文件路径
+            images: 图片信息列表，每项包含 hash、path、format、width、height、
+                    slide、shape（形状ID，见MAPPING_TABLE_SQL），可选 part（引用图片的部件）、member（图片在PPT中的成员）、
+                    file_size、crc32（zip成员的CRC32，写入媒体CRC索引）
+            replace_mappings: 是否先清除该PPT已有的图片映射（重新索引已修改的PPT时使用），
+                              不再被该PPT引用的图片按release_deck_images修正虚拟路径
+            job_id: 索引任务ID，提供时在同一事务中将该PPT标记为已完成，
+                    保证映射写入与任务进度一致
+            slides: 每页文字 [{'slide', 'text', 'notes'}]，提供时替换该PPT已有的文字索引
+            slide_hashes: 每页规范化哈希 [{'slide', 'part', 'hash'}]，提供时替换该PPT已有的幻灯片哈希
+            
+        Returns:
+            int: 写入的映射数量
+        """
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        deck_prefix = make_virtual_path(pptx_path, '')
+        image_rows = [
+            (
+                img['hash'],
+                str(img['path']),
+                Path(img['path']).name,
+                now,
+                'normal',
+                img['format'],
+                img['width'],
+                img['height'],
+                img.get('file_size'),
+                len(deck_prefix),
+                deck_prefix
+            )
+            for img in images
+        ]
+        mapping_rows = [
+            (img['hash'], str(pptx_path), img.get('part', ''), img['slide'], str(img['shape']), now,
+             img.get('member'))
+            for img in images
+        ]
+        crc_rows = {
+            (img['crc32'], img['file_size'], img['hash'])
+            for img in images if img.get('crc32') is not None
+        }
+        
+        with self.transaction():
+            if replace_mappings:
+                self.execute(
+                    "DELETE FROM image_ppt_mapping WHERE pptx_path = ?",
+                    (str(pptx_path),)
+                )
+            # 已入库的图片保留原记录；原记录是指向本PPT内成员的虚拟路径时，
+            # PPT已重新提取，改用本次的路径（成员可能已改名或换成其他内容）
+            self.executemany(
+                f"""
+                INSERT INTO {self.table_name}
+                (img_hash, img_path, img_name, extract_date, img_type, format, width, height, file_size)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (img_hash) DO UPDATE SET img_path = excluded.img_path, img_name = excluded.img_name
+                WHERE substr({self.table_name}.img_path, 1, ?) = ?
+                """,
+                image_rows
+            )
+            self.executemany(
+                """
+                INSERT OR IGNORE INTO image_ppt_mapping
+                (img_hash, pptx_path, part_name, slide_index, shape_index, created_at, member_name)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                mapping_rows
+            )
+            if replace_mappings:
+                self.release_deck_images(pptx_path)
+            if slides is not None:
+                self.execute("DELETE FROM slide_text WHERE pptx_path = ?", (str(pptx_path),))
+                self.executemany(
+                    "INSERT INTO slide_text (pptx_path, slide_index, text, notes) VALUES (?, ?, ?, ?)",
+                    [
+                        (str(pptx_path), slide['slide'], slide['text'], slide['notes'])
+                        for slide in slides if slide['text'] or slide['notes']
+                    ]
+                )
+            if slide_hashes is not None:
+                self.execute("DELETE FROM slides WHERE pptx_path = ?", (str(pptx_path),))
+                self.executemany(
+                    "INSERT INTO slides (pptx_path, slide_index, part_name, slide_hash) VALUES (?, ?, ?, ?)",
+                    [(str(pptx_path), slide['slide'], slide['part'], slide['hash']) for slide in slide_hashes]
+                )
+            if crc_rows:
+                self.executemany(
+                    "INSERT OR IGNORE INTO media_crc_index (crc32, file_size, img_hash) VALUES (?, ?, ?)",
+                    list(crc_rows)
+                )
+            # 每个PPT只更新一次源记录
+            self.execute(
+                "INSERT OR REPLACE INTO ppt_sources (path, added_date) VALUES (?, ?)",
+                (str(pptx_path), now)
+            )
+            if job_id is not None:
+                self.execute(
+                    """
+                    UPDATE index_job_decks SET status = 'done', error = NULL, updated_at = ?
+                    WHERE job_id = ? AND pptx_path = ?
+                    """,
+                    (now, job_id, str(pptx_path))
+                )
+        
+        return len(mapping_rows)
+    
+    def release_deck_images(self, pptx_path: str) -> int:
+        """PPT的映射被删除或替换后，修正图片表中仍指向该PPT内成员的虚拟路径（需在事务中调用）
+        
+        虚拟图库中每张图片只记录首次提取时所在PPT的成员。该PPT不再引用这张图片时，
+        改为指向其他仍引用它的PPT中的成员；已没有任何PPT引用时删除图片记录。
+        
+        Args:
+            pptx_path: 映射已被删除或替换的PPT路径
+            
+        Returns:
+            int: 删除的图片记录数量
+        """
+        deck_prefix = make_virtual_path(pptx_path, '')
+        stale = f"""
+            substr(img_path, 1, ?) = ? AND NOT EXISTS (
+                SELECT 1 FROM image_ppt_mapping m
+                WHERE m.img_hash = {self.table_name}.img_hash AND m.pptx_path = ?
+            )
+        """
+        stale_params = (len(deck_prefix), deck_prefix, str(pptx_path))
+        self.execute(
+            f"""
+            UPDATE {self.table_name} SET img_path = (
+                SELECT ? || m.pptx_path || ? || m.member_name FROM image_ppt_mapping m
+                WHERE m.img_hash = {self.table_name}.img_hash AND m.member_name IS NOT NULL
+                ORDER BY m.pptx_path LIMIT 1
+            )
+            WHERE {stale} AND EXISTS (
+                SELECT 1 FROM image_ppt_mapping m
+                WHERE m.img_hash = {self.table_name}.img_hash AND m.member_name IS NOT NULL
+            )
+            """,
+            (VIRTUAL_PREFIX, VIRTUAL_SEPARATOR) + stale_params
+        )
+        orphans = [
+            (row['img_hash'],) for row in self.execute(
+                f"""
+                SELECT img_hash FROM {self.table_name}
+                WHERE {stale} AND NOT EXISTS (
+                    SELECT 1 FROM image_ppt_mapping m WHERE m.img_hash = {self.table_name}.img_hash
+                )
+                """,
+                stale_params
+            ).fetchall()
+        ]
+        if orphans:
+            self.executemany(f"DELETE FROM {self.table_name} WHERE img_hash = ?", orphans)
+            self.executemany("DELETE FROM media_crc_index WHERE img_hash = ?", orphans)
+            self.executemany("DELETE FROM image_tags WHERE img_hash = ?", orphans)
+        return len(orphans)
+    
     def get_image_by_hash(self, img_hash: str) -> Optional[Dict]:
         """根据哈希值获取图片信息"""
         try:
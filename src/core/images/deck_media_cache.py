@@ -0,0 +1,108 @@
+from pathlib import Path
+from typing import Optional, Tuple
+import io
+import zipfile
+from PIL import Image
+from ..ppt.zip_index_cache import ZipIndexCache
+from ..ppt.source_readers import is_zip_source, open_source_reader
+from ...utils.config.settings import Settings
+
+# 虚拟图库路径：pptx://<来源文件路径>!/<成员>，图片不从来源文件中复制出来
+# （PDF的成员是读取器给出的图片名，如obj/12.jpg）
+VIRTUAL_PREFIX = 'pptx://'
+VIRTUAL_SEPARATOR = '!/'
+
+
+def make_virtual_path(pptx_path, member: str) -> str:
+    """构造指向PPT内媒体成员的虚拟路径"""
+    return f"{VIRTUAL_PREFIX}{pptx_path}{VIRTUAL_SEPARATOR}{member}"
+
+
+def is_virtual_path(path) -> bool:
+    """判断是否为虚拟图库路径"""
+    return str(path).startswith(VIRTUAL_PREFIX)
+
+
+def split_virtual_path(path) -> Tuple[str, str]:
+    """拆分虚拟路径
+
+    Returns:
+        Tuple[str, str]: (PPT路径, zip成员)
+    """
+    pptx_path, member = str(path)[len(VIRTUAL_PREFIX):].rsplit(VIRTUAL_SEPARATOR, 1)
+    return pptx_path, member
+
+
+class DeckMediaCache:
+    """PPT媒体按需读取 - 借助持久化的中央目录缓存直接定位成员
+
+    打开PPT时解析整个中央目录对成员众多的PPT（尤其在网络共享上）代价不小；
+    中央目录按(路径, 大小, 修改时间)缓存到磁盘并在内存中保留最近使用的部分，
+    之后每次读取只是一次定位和解压。PPT被修改后自动重新解析。
+    """
+
+    def __init__(self, index: Optional[ZipIndexCache] = None):
+        self.index = index or ZipIndexCache(default_index_path())
+
+    def read(self, path) -> bytes:
+        """读取图片字节，虚拟路径从PPT中按需解压，普通路径直接读取文件"""
+        if not is_virtual_path(path):
+            with open(path, 'rb') as f:
+                return f.read()
+        pptx_path, member = split_virtual_path(path)
+        if not is_zip_source(pptx_path):
+            # PDF等非zip来源由对应的读取器解码
+            with open_source_reader(pptx_path) as reader:
+                return reader.read(member)
+        try:
+            return self.index.read(pptx_path, member)
+        except zipfile.BadZipFile:
+            # 缓存的位置与文件不符（如被就地改写且修改时间未变），回退到完整解析
+            with zipfile.ZipFile(pptx_path) as zf:
+                return zf.read(member)
+
+    def exists(self, path) -> bool:
+        """判断图片是否仍然存在（虚拟路径检查PPT及其中的成员）"""
+        if not is_virtual_path(path):
+            return Path(path).exists()
+        pptx_path, member = split_virtual_path(path)
+        try:
+            if not is_zip_source(pptx_path):
+                with open_source_reader(pptx_path) as reader:
+                    return reader.has_member(member)
+            return self.index.has_member(pptx_path, member)
+        except (OSError, ValueError, zipfile.BadZipFile):
+            return False
+
+    def open_image(self, path) -> Image.Image:
+        """以PIL打开图片，普通路径直接打开文件，虚拟路径从内存中的字节打开"""
+        if not is_virtual_path(path):
+            return Image.open(path)
+        return Image.open(io.BytesIO(self.read(path)))
+
+    def close(self):
+        """关闭中央目录缓存"""
+        self.index.close()
+
+
+def default_index_path() -> Path:
+    """中央目录缓存文件的默认位置（应用缓存目录下）"""
+    return Settings().IMAGE_CACHE_DIR.expanduser().parent / 'zip_index.db'
+
+
+_shared_cache: Optional[DeckMediaCache] = None
+
+
+def get_deck_media_cache() -> DeckMediaCache:
+    """获取进程内共享的PPT媒体缓存"""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = DeckMediaCache()
+    return _shared_cache
+
+
+def local_path_for(path) -> str:
+    """获取可在资源管理器中定位的本地文件路径（虚拟路径返回所在的PPT）"""
+    if is_virtual_path(path):
+        return split_virtual_path(path)[0]
+    return str(path)
@@ -0,0 +1,164 @@
+from typing import Dict, Optional, Tuple
+import hashlib
+import struct
+
+# 元文件没有像素尺寸，按96 DPI换算
+METAFILE_DPI = 96
+
+
+def _probe_png(data: bytes) -> Tuple[int, int]:
+    # IHDR块紧跟在8字节签名之后
+    return struct.unpack('>II', data[16:24])
+
+
+def _probe_gif(data: bytes) -> Tuple[int, int]:
+    return struct.unpack('<HH', data[6:10])
+
+
+def _probe_bmp(data: bytes) -> Tuple[int, int]:
+    header_size = struct.unpack('<I', data[14:18])[0]
+    if header_size == 12:  # BITMAPCOREHEADER
+        return struct.unpack('<HH', data[18:22])
+    width, height = struct.unpack('<ii', data[18:26])
+    return width, abs(height)  # 高度为负表示自上而下存储
+
+
+def _probe_jpeg(data: bytes) -> Optional[Tuple[int, int]]:
+    pos = 2
+    size = len(data)
+    while pos + 4 <= size:
+        if data[pos] != 0xFF:
+            pos += 1
+            continue
+        marker = data[pos + 1]
+        if marker == 0xFF:  # 填充字节
+            pos += 1
+            continue
+        if marker in (0x01, 0xD8) or 0xD0 <= marker <= 0xD7:  # 无长度字段的标记
+            pos += 2
+            continue
+        if marker == 0xD9:  # EOI
+            break
+        length = struct.unpack('>H', data[pos + 2:pos + 4])[0]
+        # SOF0-SOF15（C4/C8/CC除外）包含图像尺寸
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            height, width = struct.unpack('>HH', data[pos + 5:pos + 9])
+            return width, height
+        pos += 2 + length
+    return None
+
+
+def _probe_tiff(data: bytes) -> Optional[Tuple[int, int]]:
+    endian = '<' if data[:2] == b'II' else '>'
+    ifd_offset = struct.unpack(endian + 'I', data[4:8])[0]
+    entry_count = struct.unpack(endian + 'H', data[ifd_offset:ifd_offset + 2])[0]
+    width = height = None
+    for i in range(entry_count):
+        entry = ifd_offset + 2 + i * 12
+        tag, field_type = struct.unpack(endian + 'HH', data[entry:entry + 4])
+        if tag not in (256, 257):
+            continue
+        if field_type == 3:  # SHORT
+            value = struct.unpack(endian + 'H', data[entry + 8:entry + 10])[0]
+        else:  # LONG
+            value = struct.unpack(endian + 'I', data[entry + 8:entry + 12])[0]
+        if tag == 256:
+            width = value
+        else:
+            height = value
+    if width is None or height is None:
+        return None
+    return width, height
+
+
+def _probe_webp(data: bytes) -> Optional[Tuple[int, int]]:
+    chunk = data[12:16]
+    if chunk == b'VP8 ':
+        width, height = struct.unpack('<HH', data[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b'VP8L':
+        b0, b1, b2, b3 = data[21:25]
+        width = 1 + (((b1 & 0x3F) << 8) | b0)
+        height = 1 + (((b3 & 0x0F) << 10) | (b2 << 2) | ((b1 & 0xC0) >> 6))
+        return width, height
+    if chunk == b'VP8X':
+        width = 1 + int.from_bytes(data[24:27], 'little')
+        height = 1 + int.from_bytes(data[27:30], 'little')
+        return width, height
+    return None
+
+
+def _probe_emf(data: bytes) -> Tuple[int, int]:
+    # EMR_HEADER: rclBounds为设备像素，rclFrame单位为0.01毫米
+    left, top, right, bottom = struct.unpack('<iiii', data[8:24])
+    if right > left and bottom > top:
+        return right - left + 1, bottom - top + 1
+    left, top, right, bottom = struct.unpack('<iiii', data[24:40])
+    scale = METAFILE_DPI / 2540
+    return round((right - left) * scale), round((bottom - top) * scale)
+
+
+def _probe_wmf(data: bytes) -> Tuple[int, int]:
+    # 可放置WMF头：边界框（逻辑单位）+ 每英寸单位数
+    left, top, right, bottom, units_per_inch = struct.unpack('<hhhhH', data[6:16])
+    if not units_per_inch:
+        return abs(right - left), abs(bottom - top)
+    scale = METAFILE_DPI / units_per_inch
+    return round(abs(right - left) * scale), round(abs(bottom - top) * scale)
+
+
+def probe_image(data: bytes) -> Optional[Tuple[str, int, int]]:
+    """只读取文件头解析图片格式和尺寸，不解码像素
+
+    支持PNG、JPEG、GIF、BMP、TIFF、WebP、EMF和WMF（可放置头）。
+
+    Args:
+        data: 图片字节内容（或至少包含文件头的前缀）
+
+    Returns:
+        Optional[Tuple[str, int, int]]: (格式, 宽, 高)，无法识别时返回None
+    """
+    try:
+        if data.startswith(b'\x89PNG\r\n\x1a\n'):
+            return ('PNG',) + tuple(_probe_png(data))
+        if data.startswith(b'\xFF\xD8'):
+            size = _probe_jpeg(data)
+            return ('JPEG',) + size if size else None
+        if data[:6] in (b'GIF87a', b'GIF89a'):
+            return ('GIF',) + tuple(_probe_gif(data))
+        if data.startswith(b'BM'):
+            return ('BMP',) + tuple(_probe_bmp(data))
+        if data[:4] in (b'II*\x00', b'MM\x00*'):
+            size = _probe_tiff(data)
+            return ('TIFF',) + size if size else None
+        if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+            size = _probe_webp(data)
+            return ('WEBP',) + size if size else None
+        if data[:4] == b'\x01\x00\x00\x00' and data[40:44] == b' EMF':
+            return ('EMF',) + _probe_emf(data)
+        if data[:4] == b'\xD7\xCD\xC6\x9A':
+            return ('WMF',) + _probe_wmf(data)
+        if data[:6] in (b'\x01\x00\x09\x00\x00\x03', b'\x02\x00\x09\x00\x00\x03'):
+            # 不可放置的WMF头中没有尺寸信息
+            return ('WMF', 0, 0)
+    except (struct.error, ValueError, IndexError):
+        return None
+    return None
+
+
+def describe_image(data: bytes) -> Dict:
+    """对内存中的图片数据一次性完成哈希和头部解析
+
+    Returns:
+        Dict: {'hash', 'file_size', 'format', 'width', 'height'}，
+              无法识别格式时format为None，宽高为0
+    """
+    probed = probe_image(data)
+    img_format, width, height = probed if probed else (None, 0, 0)
+    return {
+        'hash': hashlib.md5(data).hexdigest(),
+        'file_size': len(data),
+        'format': img_format,
+        'width': width,
+        'height': height
+    }
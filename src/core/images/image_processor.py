@@ -1,5 +1,6 @@
 from PIL import Image, ImageDraw, ImageFont
 import hashlib
+import io
 from pathlib import Path
 import os
 from typing import Dict, List, Optional, Tuple
@@ -7,6 +8,8 @@ import json
 import logging
 from datetime import datetime
 from ..tags.tag_manager import TagManager
+from .image_probe import describe_image
+from .deck_media_cache import get_deck_media_cache
 from ...utils.config.settings import Settings
 
 class ImageProcessor:
@@ -16,6 +19,8 @@ class ImageProcessor:
         self.db = db_manager
         self.tag_manager = TagManager(db_manager)
         self.cursor = db_manager.cursor  # 添加cursor属性
+        # 虚拟图库中的图片按需从PPT中读取
+        self.media_cache = get_deck_media_cache()
     
     def search_images_by_tags(self, tags: Tuple[str, ...], match_all: bool = False) -> List[Dict]:
         """根据标签搜索图片"""
@@ -91,6 +96,36 @@ class ImageProcessor:
             logging.error(f"获取PPT源文件失败: {str(e)}")
             return []
     
+    def get_image_ppt_mappings(self, img_hash: str) -> List[Dict]:
+        """获取使用该图片的所有PPT及其位置
+        
+        Returns:
+            List[Dict]: [{'ppt_path', 'ppt_name', 'part', 'slide', 'shape'}]，
+                        版式和母版中的图片slide为0，shape为形状ID（背景图片为'background'）
+        """
+        try:
+            results = self.db.execute(
+                """
+                SELECT pptx_path, part_name, slide_index, shape_index
+                FROM image_ppt_mapping WHERE img_hash = ?
+                ORDER BY pptx_path, slide_index
+                """,
+                (img_hash,)
+            ).fetchall()
+            return [
+                {
+                    'ppt_path': row['pptx_path'],
+                    'ppt_name': Path(row['pptx_path']).name,
+                    'part': row['part_name'],
+                    'slide': row['slide_index'],
+                    'shape': row['shape_index']
+                }
+                for row in results
+            ]
+        except Exception as e:
+            logging.error(f"获取图片的PPT映射失败: {str(e)}")
+            return []
+    
     def get_setting(self, key: str) -> Optional[str]:
         """获取设置值"""
         try:
@@ -173,24 +208,25 @@ class ImageProcessor:
     def process_image(self, img_path: str) -> Dict:
         """处理单个图片，返回图片信息"""
         try:
-            # 打开图片获取基本信息
-            with Image.open(img_path) as img:
-                width, height = img.size
-                img_format = img.format
+            # 只读取一次文件，在同一份数据上计算哈希并解析文件头
+            img_data = self.media_cache.read(img_path)
+            info = describe_image(img_data)
             
-            # 计算图片哈希
-            with open(img_path, 'rb') as f:
-                img_hash = hashlib.md5(f.read()).hexdigest()
+            if not info['format']:
+                # 文件头无法识别的格式回退到PIL
+                with Image.open(io.BytesIO(img_data)) as img:
+                    info['width'], info['height'] = img.size
+                    info['format'] = img.format
             
             # 构建图片信息
             img_info = {
-                'hash': img_hash,
+                'hash': info['hash'],
                 'path': str(img_path),
                 'name': Path(img_path).name,
-                'format': img_format,
-                'width': width,
-                'height': height,
-                'size': os.path.getsize(img_path)
+                'format': info['format'],
+                'width': info['width'],
+                'height': info['height'],
+                'size': info['file_size']
             }
             
             return img_info
@@ -200,7 +236,7 @@ class ImageProcessor:
             raise
     
     def create_thumbnail(self, img_path: str, size=(200, 200)) -> str:
-        """创建缩略图"""
+        """创建缩略图（支持虚拟图库路径，图片从PPT中按需读取）"""
         try:
             # 检查文件扩展名
             ext = Path(img_path).suffix.lower()
@@ -235,7 +271,7 @@ class ImageProcessor:
                 return str(thumb_path)
             
             # 创建缩略图
-            with Image.open(img_path) as img:
+            with self.media_cache.open_image(img_path) as img:
                 # 保持RGBA格式
                 if img.mode == 'RGBA':
                     thumb = img.copy()
@@ -0,0 +1,155 @@
+from pathlib import Path
+from typing import BinaryIO, Optional, Tuple
+import hashlib
+import os
+import tempfile
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+
+def _copy_file_range(src_fd: int, src_offset: int, dst_fd: int, size: int) -> bool:
+    """用os.copy_file_range在内核中复制文件区间
+
+    Returns:
+        bool: 是否复制完成；平台或文件系统不支持时返回False，由调用方回退到普通写入
+    """
+    if not hasattr(os, 'copy_file_range'):
+        return False
+    copied = 0
+    try:
+        while copied < size:
+            n = os.copy_file_range(src_fd, dst_fd, size - copied,
+                                   src_offset + copied, copied)
+            if n == 0:
+                break
+            copied += n
+    except OSError:
+        # 跨文件系统等情况下不支持，已复制的部分会被回退写入整体覆盖
+        return False
+    return copied == size
+
+
+class ImageStore:
+    """内容寻址图片存储 - 以图片内容的MD5命名文件，相同图片只写入一次
+
+    分片模式下图片保存在 <root>/<哈希前两位>/<哈希><扩展名>，
+    避免图库中单个目录文件过多；非分片模式直接保存在 <root>/<哈希><扩展名>。
+    """
+
+    def __init__(self, root: str, shard: bool = True):
+        self.root = Path(root)
+        self.shard = shard
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, img_hash: str, ext: str) -> Path:
+        """获取哈希值对应的存储路径"""
+        if self.shard:
+            return self.root / img_hash[:2] / f"{img_hash}{ext}"
+        return self.root / f"{img_hash}{ext}"
+
+    def put(self, data: bytes, ext: str, img_hash: Optional[str] = None) -> Tuple[str, Path, bool]:
+        """先在内存中计算哈希，仅在图片不存在时写入
+
+        Args:
+            data: 图片字节内容
+            ext: 扩展名（含点）
+            img_hash: 调用方已计算好的MD5，避免重复哈希
+
+        Returns:
+            Tuple[str, Path, bool]: (MD5哈希, 存储路径, 是否为新写入)
+        """
+        if img_hash is None:
+            img_hash = hashlib.md5(data).hexdigest()
+        path = self.path_for(img_hash, ext)
+        if path.exists():
+            return img_hash, path, False
+
+        self._write_atomic(path, data)
+        return img_hash, path, True
+
+    def put_stream(self, fileobj: BinaryIO, ext: str, prefix: bytes = b'',
+                   chunk_size: int = DEFAULT_CHUNK_SIZE) -> Tuple[str, Path, bool]:
+        """以固定大小的块流式写入图片，边写边计算哈希，内存占用不超过一个块
+
+        Args:
+            fileobj: 可读的二进制流（如zip成员）
+            ext: 扩展名（含点）
+            prefix: 调用方已从流中读出的开头数据（如用于解析文件头的部分）
+            chunk_size: 每次读取的字节数
+
+        Returns:
+            Tuple[str, Path, bool]: (MD5哈希, 存储路径, 是否为新写入)
+        """
+        md5 = hashlib.md5()
+        fd, tmp_path = tempfile.mkstemp(dir=str(self.root), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                if prefix:
+                    md5.update(prefix)
+                    f.write(prefix)
+                for chunk in iter(lambda: fileobj.read(chunk_size), b''):
+                    md5.update(chunk)
+                    f.write(chunk)
+
+            img_hash = md5.hexdigest()
+            path = self.path_for(img_hash, ext)
+            if path.exists():
+                os.remove(tmp_path)
+                return img_hash, path, False
+
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(tmp_path, path)
+            return img_hash, path, True
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def put_view(self, view: memoryview, ext: str, img_hash: Optional[str] = None,
+                 src_fd: Optional[int] = None, src_offset: int = 0) -> Tuple[str, Path, bool]:
+        """写入内存映射的数据区间（如PPTX中未压缩的媒体），全程不产生Python字节对象
+
+        哈希直接在视图上计算；提供src_fd且平台支持os.copy_file_range时由内核直接复制
+        文件区间，否则从视图写出。
+
+        Args:
+            view: 数据的只读视图（通常来自mmap）
+            ext: 扩展名（含点）
+            img_hash: 调用方已计算好的MD5，避免重复哈希
+            src_fd: 数据所在源文件的描述符
+            src_offset: 数据在源文件中的起始偏移
+
+        Returns:
+            Tuple[str, Path, bool]: (MD5哈希, 存储路径, 是否为新写入)
+        """
+        if img_hash is None:
+            img_hash = hashlib.md5(view).hexdigest()
+        path = self.path_for(img_hash, ext)
+        if path.exists():
+            return img_hash, path, False
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                if src_fd is None or not _copy_file_range(src_fd, src_offset, f.fileno(), len(view)):
+                    f.write(view)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return img_hash, path, True
+
+    def _write_atomic(self, path: Path, data: bytes):
+        """先写临时文件再重命名，多个进程同时写入同一图片时也不会产生半截文件"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
@@ -0,0 +1,185 @@
+from typing import Dict, List, Optional, Tuple
+import io
+import struct
+
+# 复合文档（OLE/CFB）文件头
+CFB_SIGNATURE = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+HEADER_SIZE = 512
+HEADER_DIFAT_ENTRIES = 109
+DIR_ENTRY_SIZE = 128
+
+# 特殊扇区号
+MAX_REG_SECTOR = 0xFFFFFFFA
+END_OF_CHAIN = 0xFFFFFFFE
+FREE_SECTOR = 0xFFFFFFFF
+
+STREAM_OBJECT = 2
+ROOT_STORAGE_OBJECT = 5
+
+
+class _SegmentStream(io.RawIOBase):
+    """由若干(文件偏移, 长度)片段拼接成的只读流，按需读取底层文件，不把整个流读入内存"""
+
+    def __init__(self, fileobj, segments: List[Tuple[int, int]], size: int):
+        self._file = fileobj
+        self._segments = segments
+        self._segment_size = segments[0][1] if segments else 1
+        self._size = size
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += self._size
+        self._pos = max(0, offset)
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+    def readinto(self, buffer) -> int:
+        remaining = min(len(buffer), self._size - self._pos)
+        written = 0
+        while remaining > 0:
+            # 除最后一个外所有片段等长（一个扇区或一个小扇区）
+            index, inner = divmod(self._pos, self._segment_size)
+            file_offset, length = self._segments[index]
+            count = min(remaining, length - inner)
+            self._file.seek(file_offset + inner)
+            chunk = self._file.read(count)
+            if not chunk:
+                break
+            buffer[written:written + len(chunk)] = chunk
+            written += len(chunk)
+            self._pos += len(chunk)
+            remaining -= len(chunk)
+        return written
+
+
+class CompoundFile:
+    """OLE复合文档（CFB）读取器 - 旧版Office二进制格式（.ppt、.doc、.xls）的容器
+
+    只实现按名称定位并流式读取其中的流，足以读取.ppt的Pictures流，无需第三方库。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._load()
+        except Exception:
+            self._file.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """关闭文件"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _read_sector(self, sector: int) -> bytes:
+        self._file.seek((sector + 1) * self.sector_size)
+        return self._file.read(self.sector_size)
+
+    def _load(self):
+        header = self._file.read(HEADER_SIZE)
+        if len(header) < HEADER_SIZE or header[:8] != CFB_SIGNATURE:
+            raise ValueError(f"不是OLE复合文档: {self.path}")
+
+        self.sector_size = 1 << struct.unpack('<H', header[0x1E:0x20])[0]
+        self.mini_sector_size = 1 << struct.unpack('<H', header[0x20:0x22])[0]
+        first_dir_sector = struct.unpack('<I', header[0x30:0x34])[0]
+        self.mini_stream_cutoff = struct.unpack('<I', header[0x38:0x3C])[0]
+        first_mini_fat, mini_fat_count = struct.unpack('<II', header[0x3C:0x44])
+        first_difat, difat_count = struct.unpack('<II', header[0x44:0x4C])
+        per_sector = self.sector_size // 4
+
+        # DIFAT：文件头中的109项，之后是DIFAT扇区链（每个扇区最后一项指向下一个扇区）
+        fat_sectors = list(struct.unpack(f'<{HEADER_DIFAT_ENTRIES}I', header[0x4C:HEADER_SIZE]))
+        sector = first_difat
+        for _ in range(difat_count):
+            if sector > MAX_REG_SECTOR:
+                break
+            entries = struct.unpack(f'<{per_sector}I', self._read_sector(sector))
+            fat_sectors.extend(entries[:-1])
+            sector = entries[-1]
+
+        self._fat = []
+        for fat_sector in fat_sectors:
+            if fat_sector > MAX_REG_SECTOR:
+                continue
+            self._fat.extend(struct.unpack(f'<{per_sector}I', self._read_sector(fat_sector)))
+
+        self._mini_fat = []
+        for sector in self._chain(first_mini_fat)[:mini_fat_count or None]:
+            self._mini_fat.extend(struct.unpack(f'<{per_sector}I', self._read_sector(sector)))
+
+        directory = b''.join(self._read_sector(sector) for sector in self._chain(first_dir_sector))
+        self._entries = []
+        for pos in range(0, len(directory) - DIR_ENTRY_SIZE + 1, DIR_ENTRY_SIZE):
+            entry = directory[pos:pos + DIR_ENTRY_SIZE]
+            name_len = struct.unpack('<H', entry[64:66])[0]
+            self._entries.append({
+                'name': entry[:max(name_len - 2, 0)].decode('utf-16-le', errors='replace'),
+                'type': entry[66],
+                'start': struct.unpack('<I', entry[116:120])[0],
+                # 版本3的文件只使用低32位
+                'size': struct.unpack('<Q', entry[120:128])[0] & (
+                    0xFFFFFFFF if self.sector_size == 512 else 0xFFFFFFFFFFFFFFFF
+                )
+            })
+        if not self._entries or self._entries[0]['type'] != ROOT_STORAGE_OBJECT:
+            raise ValueError(f"复合文档缺少根目录: {self.path}")
+        self._mini_stream_sectors = self._chain(self._entries[0]['start'])
+
+    def _chain(self, start: int, fat: Optional[List[int]] = None) -> List[int]:
+        """沿FAT（或小扇区FAT）获取扇区链，遇到循环或越界时截断"""
+        fat = self._fat if fat is None else fat
+        chain, seen = [], set()
+        sector = start
+        while sector <= MAX_REG_SECTOR and sector < len(fat) and sector not in seen:
+            seen.add(sector)
+            chain.append(sector)
+            sector = fat[sector]
+        return chain
+
+    def find_stream(self, name: str) -> Optional[Dict]:
+        """按名称查找流（不区分大小写），找不到时返回None"""
+        name = name.lower()
+        for entry in self._entries:
+            if entry['type'] == STREAM_OBJECT and entry['name'].lower() == name:
+                return entry
+        return None
+
+    def open_stream(self, entry: Dict) -> io.BufferedReader:
+        """以可随机访问的流打开目录项，小于阈值的流从迷你流中读取"""
+        size = entry['size']
+        if size < self.mini_stream_cutoff:
+            segments = []
+            for mini_sector in self._chain(entry['start'], self._mini_fat):
+                offset = mini_sector * self.mini_sector_size
+                index, inner = divmod(offset, self.sector_size)
+                if index >= len(self._mini_stream_sectors):
+                    break
+                file_offset = (self._mini_stream_sectors[index] + 1) * self.sector_size + inner
+                segments.append((file_offset, self.mini_sector_size))
+        else:
+            segments = [
+                ((sector + 1) * self.sector_size, self.sector_size)
+                for sector in self._chain(entry['start'])
+            ]
+        size = min(size, sum(length for _, length in segments))
+        return io.BufferedReader(_SegmentStream(self._file, segments, size))
@@ -0,0 +1,230 @@
+from pathlib import Path
+from typing import Dict, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import logging
+import xml.etree.ElementTree as ET
+from tqdm import tqdm
+from .zip_media_reader import ZipMediaReader, NS_OFFICE_REL
+from .text_extractor import iter_pptx_files
+
+# docProps部件的命名空间
+NS_CORE_PROPERTIES = 'http://schemas.openxmlformats.org/package/2006/metadata/core-properties'
+NS_DC = 'http://purl.org/dc/elements/1.1/'
+NS_DCTERMS = 'http://purl.org/dc/terms/'
+NS_EXTENDED_PROPERTIES = 'http://schemas.openxmlformats.org/officeDocument/2006/extended-properties'
+
+RT_CORE_PROPERTIES = 'http://schemas.openxmlformats.org/package/2006/relationships/metadata/core-properties'
+RT_THUMBNAIL = 'http://schemas.openxmlformats.org/package/2006/relationships/metadata/thumbnail'
+RT_EXTENDED_PROPERTIES = NS_OFFICE_REL + '/extended-properties'
+
+# 包根关系缺失时按惯例位置查找
+DEFAULT_PARTS = {
+    RT_CORE_PROPERTIES: 'docProps/core.xml',
+    RT_EXTENDED_PROPERTIES: 'docProps/app.xml',
+    RT_THUMBNAIL: 'docProps/thumbnail.jpeg',
+}
+
+# core.xml中的元素 -> decks表的列
+CORE_FIELDS = {
+    f"{{{NS_DC}}}title": 'title',
+    f"{{{NS_DC}}}subject": 'subject',
+    f"{{{NS_DC}}}creator": 'author',
+    f"{{{NS_CORE_PROPERTIES}}}lastModifiedBy": 'last_modified_by',
+    f"{{{NS_DCTERMS}}}created": 'created',
+    f"{{{NS_DCTERMS}}}modified": 'modified',
+}
+
+# 可用于排序的列
+SORT_COLUMNS = ('pptx_path', 'title', 'author', 'last_modified_by', 'created', 'modified',
+                'slide_count', 'file_size')
+
+# 每批写入的PPT数量（一个事务）
+CATALOG_BATCH_SIZE = 500
+
+logger = logging.getLogger(__name__)
+
+
+def read_deck_properties(pptx_path) -> Dict:
+    """只读取docProps中的属性和缩略图，不解析幻灯片
+
+    core.xml提供标题、作者和日期，app.xml提供页数，缩略图是PowerPoint保存时生成的首页预览。
+    app.xml缺少页数时（部分第三方工具生成的文件）才读取presentation.xml计数。
+
+    Args:
+        pptx_path: PPTX文件路径
+
+    Returns:
+        Dict: {'title', 'subject', 'author', 'last_modified_by', 'created', 'modified',
+               'slide_count', 'thumbnail'}，缺失的项为None，日期为W3CDTF字符串（可直接排序）
+    """
+    properties = {column: None for column in CORE_FIELDS.values()}
+    properties.update({'slide_count': None, 'thumbnail': None})
+
+    with ZipMediaReader(str(pptx_path)) as reader:
+        parts = dict(DEFAULT_PARTS)
+        for rel in reader.get_rels(''):
+            if rel['type'] in parts and not rel['external']:
+                parts[rel['type']] = rel['target']
+
+        if reader.has_member(parts[RT_CORE_PROPERTIES]):
+            root = ET.fromstring(reader.read(parts[RT_CORE_PROPERTIES]))
+            for elem in root:
+                column = CORE_FIELDS.get(elem.tag)
+                if column and elem.text and elem.text.strip():
+                    properties[column] = elem.text.strip()
+
+        if reader.has_member(parts[RT_EXTENDED_PROPERTIES]):
+            root = ET.fromstring(reader.read(parts[RT_EXTENDED_PROPERTIES]))
+            slides = root.findtext(f"{{{NS_EXTENDED_PROPERTIES}}}Slides")
+            if slides and slides.strip().isdigit():
+                properties['slide_count'] = int(slides)
+        if properties['slide_count'] is None:
+            properties['slide_count'] = len(reader.get_slide_parts())
+
+        if reader.has_member(parts[RT_THUMBNAIL]):
+            properties['thumbnail'] = reader.read(parts[RT_THUMBNAIL])
+
+    return properties
+
+
+def _read_properties_worker(pptx_path: str) -> Dict:
+    """进程池工作函数 - 读取单个PPT的属性，失败时返回错误信息"""
+    try:
+        return {'ppt': pptx_path, **read_deck_properties(pptx_path)}
+    except Exception as e:
+        return {'ppt': pptx_path, 'error': str(e)}
+
+
+class DeckCatalog:
+    """PPT目录 - 记录每个PPT的文档属性和缩略图，用于快速浏览和排序，无需打开PPT"""
+
+    def __init__(self, db_manager):
+        self.db = db_manager
+        self.logger = logging.getLogger(__name__)
+
+    def update_folder(self, folder_path: str, workers: int = 1, progress_callback=None) -> Dict:
+        """编目文件夹中的所有PPTX
+
+        只读取大小或修改时间变化的PPT，已不存在的PPT从目录中移除。
+
+        Args:
+            folder_path: PPT文件夹路径
+            workers: 工作进程数
+            progress_callback: 进度回调函数
+
+        Returns:
+            Dict: {'decks': PPT总数, 'updated': 重新读取的数量, 'removed': 移除的数量,
+                   'failed': [失败信息列表]}
+        """
+        folder_path = Path(folder_path)
+        if not folder_path.exists():
+            raise FileNotFoundError(f"文件夹不存在: {folder_path}")
+
+        known = {
+            row['pptx_path']: (row['file_size'], row['mtime_ns'])
+            for row in self.db.execute("SELECT pptx_path, file_size, mtime_ns FROM decks").fetchall()
+            if Path(row['pptx_path']).is_relative_to(folder_path)
+        }
+        stats = {}
+        for pptx_path in iter_pptx_files(folder_path):
+            stat = pptx_path.stat()
+            stats[str(pptx_path)] = (stat.st_size, stat.st_mtime_ns)
+        changed = [path for path, stat in stats.items() if known.get(path) != stat]
+        removed = [path for path in known if path not in stats]
+
+        summary = {'decks': len(stats), 'updated': 0, 'removed': len(removed), 'failed': []}
+        if removed:
+            with self.db.transaction():
+                self.db.executemany("DELETE FROM decks WHERE pptx_path = ?", [(path,) for path in removed])
+        if not changed:
+            return summary
+
+        if workers > 1:
+            executor = ProcessPoolExecutor(max_workers=workers)
+            # 单个PPT只读取几KB，分块提交以减少进程间通信次数
+            results = executor.map(_read_properties_worker, changed, chunksize=16)
+        else:
+            executor = None
+            results = map(_read_properties_worker, changed)
+
+        rows = []
+        try:
+            for current_idx, result in enumerate(tqdm(results, total=len(changed), desc="编目PPT"), 1):
+                if progress_callback:
+                    progress_callback(current_idx, len(changed), f"正在编目: {Path(result['ppt']).name}")
+
+                if 'error' in result:
+                    self.logger.error(f"读取 {result['ppt']} 的属性时出错: {result['error']}")
+                    summary['failed'].append(result)
+                    continue
+                rows.append(self._make_row(result, stats[result['ppt']]))
+                if len(rows) >= CATALOG_BATCH_SIZE:
+                    summary['updated'] += self._write_rows(rows)
+                    rows = []
+            summary['updated'] += self._write_rows(rows)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        return summary
+
+    @staticmethod
+    def _make_row(result: Dict, stat) -> tuple:
+        return (
+            result['ppt'], stat[0], stat[1],
+            result['title'], result['subject'], result['author'], result['last_modified_by'],
+            result['created'], result['modified'], result['slide_count'], result['thumbnail'],
+            datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        )
+
+    def _write_rows(self, rows: List[tuple]) -> int:
+        if not rows:
+            return 0
+        with self.db.transaction():
+            self.db.executemany(
+                """
+                INSERT OR REPLACE INTO decks
+                (pptx_path, file_size, mtime_ns, title, subject, author, last_modified_by,
+                 created, modified, slide_count, thumbnail, cataloged_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows
+            )
+        return len(rows)
+
+    def list_decks(self, folder_path: Optional[str] = None, order_by: str = 'modified',
+                   descending: bool = True) -> List[Dict]:
+        """列出已编目的PPT（不含缩略图数据）
+
+        Args:
+            folder_path: 只列出该文件夹下的PPT，默认全部
+            order_by: 排序列，见SORT_COLUMNS
+            descending: 是否降序
+
+        Returns:
+            List[Dict]: [{'pptx_path', 'title', 'subject', 'author', 'last_modified_by', 'created',
+                          'modified', 'slide_count', 'file_size', 'has_thumbnail'}]
+        """
+        if order_by not in SORT_COLUMNS:
+            raise ValueError(f"不支持的排序列: {order_by}")
+        rows = self.db.execute(
+            f"""
+            SELECT pptx_path, title, subject, author, last_modified_by, created, modified,
+                   slide_count, file_size, thumbnail IS NOT NULL AS has_thumbnail
+            FROM decks
+            ORDER BY {order_by} IS NULL, {order_by} {'DESC' if descending else 'ASC'}, pptx_path
+            """
+        ).fetchall()
+        decks = [dict(row) for row in rows]
+        if folder_path is not None:
+            folder_path = Path(folder_path)
+            decks = [deck for deck in decks if Path(deck['pptx_path']).is_relative_to(folder_path)]
+        return decks
+
+    def get_thumbnail(self, pptx_path: str) -> Optional[bytes]:
+        """获取PPT的缩略图数据（通常为JPEG），没有时返回None"""
+        row = self.db.execute(
+            "SELECT thumbnail FROM decks WHERE pptx_path = ?", (str(pptx_path),)
+        ).fetchone()
+        return row['thumbnail'] if row else None
@@ -0,0 +1,117 @@
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+import hashlib
+import logging
+
+# 指纹采样大小：zip的中央目录位于文件末尾，包含每个成员的CRC32，
+# 因此文件头尾各取一段即可感知绝大多数内容变化
+FINGERPRINT_SAMPLE_SIZE = 64 * 1024
+
+
+def compute_fingerprint(path: Path, file_size: Optional[int] = None) -> str:
+    """计算PPT文件的廉价内容指纹（文件大小 + 头尾采样的MD5）"""
+    if file_size is None:
+        file_size = path.stat().st_size
+    
+    md5 = hashlib.md5(str(file_size).encode())
+    with open(path, 'rb') as f:
+        md5.update(f.read(FINGERPRINT_SAMPLE_SIZE))
+        if file_size > FINGERPRINT_SAMPLE_SIZE:
+            f.seek(max(FINGERPRINT_SAMPLE_SIZE, file_size - FINGERPRINT_SAMPLE_SIZE))
+            md5.update(f.read(FINGERPRINT_SAMPLE_SIZE))
+    return md5.hexdigest()
+
+
+class DeckManifest:
+    """PPT变更清单 - 记录每个已索引PPT的大小、修改时间和内容指纹"""
+    
+    def __init__(self, db_manager):
+        self.db = db_manager
+        self.logger = logging.getLogger(__name__)
+    
+    def load(self, folder_path: Path) -> Dict[str, Dict]:
+        """加载文件夹下所有已记录的PPT清单"""
+        rows = self.db.execute(
+            "SELECT pptx_path, file_size, mtime_ns, fingerprint FROM deck_manifest"
+        ).fetchall()
+        folder_path = Path(folder_path)
+        return {
+            row['pptx_path']: dict(row) for row in rows
+            if Path(row['pptx_path']).is_relative_to(folder_path)
+        }
+    
+    def partition(self, folder_path: Path, ppt_files: List[Path]) -> Tuple[List[Tuple[Path, Dict]], List[Path], List[str]]:
+        """将PPT文件划分为需要处理、未变化和已删除三类
+        
+        Returns:
+            Tuple: (
+                [(需要处理的PPT路径, 待写入的清单信息)],
+                [未变化的PPT路径],
+                [已删除的PPT路径]
+            )
+        """
+        known = self.load(folder_path)
+        changed, unchanged = [], []
+        
+        for ppt_path in ppt_files:
+            stat = ppt_path.stat()
+            entry = {'file_size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+            record = known.pop(str(ppt_path), None)
+            
+            if record and record['file_size'] == entry['file_size'] \
+                    and record['mtime_ns'] == entry['mtime_ns']:
+                unchanged.append(ppt_path)
+                continue
+            
+            entry['fingerprint'] = compute_fingerprint(ppt_path, stat.st_size)
+            if record and record['fingerprint'] == entry['fingerprint']:
+                # 仅修改时间变化（如复制、同步），内容未变
+                self.record(ppt_path, entry)
+                unchanged.append(ppt_path)
+                continue
+            
+            # 已记录但内容变化的PPT需要先清除旧映射
+            entry['modified'] = record is not None
+            changed.append((ppt_path, entry))
+        
+        # 清单中剩余的记录对应的文件已不存在
+        deleted = list(known)
+        return changed, unchanged, deleted
+    
+    def record(self, ppt_path: Path, entry: Dict):
+        """记录PPT已完成索引"""
+        with self.db.transaction():
+            self.db.execute(
+                """
+                INSERT OR REPLACE INTO deck_manifest
+                (pptx_path, file_size, mtime_ns, fingerprint, indexed_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (
+                    str(ppt_path),
+                    entry['file_size'],
+                    entry['mtime_ns'],
+                    entry['fingerprint'],
+                    datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                )
+            )
+    
+    def purge_deleted(self, ppt_paths: List[str]):
+        """清除已删除PPT的映射、文字索引、幻灯片哈希、目录、源记录和清单记录
+        
+        虚拟图库中指向这些PPT内成员的图片改为指向其他仍引用它的PPT，不再被引用的图片记录删除。
+        """
+        if not ppt_paths:
+            return
+        params = [(str(path),) for path in ppt_paths]
+        with self.db.transaction():
+            self.db.executemany("DELETE FROM image_ppt_mapping WHERE pptx_path = ?", params)
+            for path in ppt_paths:
+                self.db.release_deck_images(str(path))
+            self.db.executemany("DELETE FROM slide_text WHERE pptx_path = ?", params)
+            self.db.executemany("DELETE FROM slides WHERE pptx_path = ?", params)
+            self.db.executemany("DELETE FROM decks WHERE pptx_path = ?", params)
+            self.db.executemany("DELETE FROM ppt_sources WHERE path = ?", params)
+            self.db.executemany("DELETE FROM deck_manifest WHERE pptx_path = ?", params)
+        self.logger.info(f"已清除 {len(ppt_paths)} 个已删除PPT的索引")
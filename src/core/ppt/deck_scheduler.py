@@ -0,0 +1,95 @@
+from pathlib import Path
+from typing import Dict, List, Optional
+import struct
+import time
+
+# 每个zip成员的固定开销（解析关系、哈希、写库等），折算为等价字节数
+ENTRY_COST_BYTES = 64 * 1024
+
+# zip中央目录结束记录（EOCD）
+EOCD_SIGNATURE = b'PK\x05\x06'
+EOCD_SIZE = 22
+EOCD_SEARCH_SIZE = EOCD_SIZE + 0xFFFF  # 最长注释
+
+
+def read_zip_entry_count(path: Path, file_size: int) -> int:
+    """只读取文件末尾的中央目录结束记录，获取zip成员数量
+
+    Returns:
+        int: 成员数量，非zip文件（如旧版.ppt）返回0
+    """
+    with open(path, 'rb') as f:
+        f.seek(max(0, file_size - EOCD_SEARCH_SIZE))
+        tail = f.read()
+    pos = tail.rfind(EOCD_SIGNATURE)
+    if pos < 0 or pos + EOCD_SIZE > len(tail):
+        return 0
+    return struct.unpack('<H', tail[pos + 10:pos + 12])[0]
+
+
+def estimate_deck_cost(path: Path) -> Dict:
+    """估算处理单个PPT的成本（文件大小 + 成员数量折算）
+
+    Returns:
+        Dict: {'path', 'size', 'entries', 'cost'}
+    """
+    size = path.stat().st_size
+    try:
+        entries = read_zip_entry_count(path, size)
+    except OSError:
+        entries = 0
+    return {
+        'path': path,
+        'size': size,
+        'entries': entries,
+        'cost': size + entries * ENTRY_COST_BYTES
+    }
+
+
+def plan_longest_first(ppt_files: List[Path]) -> List[Dict]:
+    """按估算成本从高到低排列待处理的PPT（最长处理时间优先）
+
+    大文件先开始处理，末尾只剩小文件，可以避免一个大文件拖住整个任务的尾部。
+    """
+    plan = []
+    for ppt_path in ppt_files:
+        try:
+            plan.append(estimate_deck_cost(ppt_path))
+        except OSError:
+            # 无法读取的文件按零成本处理，交由后续流程报告错误
+            plan.append({'path': ppt_path, 'size': 0, 'entries': 0, 'cost': 0})
+    plan.sort(key=lambda task: task['cost'], reverse=True)
+    return plan
+
+
+def format_eta(seconds: Optional[float]) -> str:
+    """格式化剩余时间"""
+    if seconds is None:
+        return "估算中"
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}小时{seconds % 3600 // 60}分"
+    if seconds >= 60:
+        return f"{seconds // 60}分{seconds % 60}秒"
+    return f"{seconds}秒"
+
+
+class ByteProgress:
+    """按已处理字节数而非文件数估算剩余时间"""
+
+    def __init__(self, total_bytes: int):
+        self.total_bytes = total_bytes
+        self.done_bytes = 0
+        self.start_time = time.monotonic()
+
+    def advance(self, size: int):
+        """记录又处理完成了size字节"""
+        self.done_bytes += size
+
+    def eta(self) -> Optional[float]:
+        """剩余秒数，尚无进度时返回None"""
+        if self.done_bytes <= 0:
+            return None
+        elapsed = time.monotonic() - self.start_time
+        remaining = max(0, self.total_bytes - self.done_bytes)
+        return elapsed * remaining / self.done_bytes
@@ -0,0 +1,329 @@
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+import io
+import logging
+import math
+import os
+import shutil
+from lxml import etree
+from PIL import Image
+from tqdm import tqdm
+from .zip_media_reader import (
+    ZipMediaReader, NS_PRESENTATION, REL_ATTR_PREFIX, RT_IMAGE, part_for_rels
+)
+from .text_extractor import NS_DRAWING, iter_pptx_files
+from .package_writer import rewrite_package
+from .deck_scheduler import plan_longest_first
+from ...utils.config.settings import Settings
+
+EMU_PER_INCH = 914400
+
+TAG_BLIP = f"{{{NS_DRAWING}}}blip"
+TAG_SRC_RECT = f"{{{NS_DRAWING}}}srcRect"
+TAG_TILE = f"{{{NS_DRAWING}}}tile"
+TAG_XFRM = f"{{{NS_DRAWING}}}xfrm"
+TAG_EXT = f"{{{NS_DRAWING}}}ext"
+TAG_CH_EXT = f"{{{NS_DRAWING}}}chExt"
+TAG_SLD_SZ = f"{{{NS_PRESENTATION}}}sldSz"
+TAG_BG = f"{{{NS_PRESENTATION}}}bg"
+TAG_GRP_SP = f"{{{NS_PRESENTATION}}}grpSp"
+# 形状的几何尺寸：图片、形状等在p:spPr/a:xfrm中，图形框（表格）在p:xfrm中
+SHAPE_XFRM_PATHS = {
+    f"{{{NS_PRESENTATION}}}pic": f"{{{NS_PRESENTATION}}}spPr/{TAG_XFRM}",
+    f"{{{NS_PRESENTATION}}}sp": f"{{{NS_PRESENTATION}}}spPr/{TAG_XFRM}",
+    f"{{{NS_PRESENTATION}}}cxnSp": f"{{{NS_PRESENTATION}}}spPr/{TAG_XFRM}",
+    f"{{{NS_PRESENTATION}}}graphicFrame": f"{{{NS_PRESENTATION}}}xfrm",
+}
+GROUP_XFRM_PATH = f"{{{NS_PRESENTATION}}}grpSpPr/{TAG_XFRM}"
+
+CT_PRESENTATIONML = 'application/vnd.openxmlformats-officedocument.presentationml.'
+# 背景铺满整页的部件；备注页等其余部件中的背景无法确定显示尺寸
+PAGE_CONTENT_TYPES = tuple(CT_PRESENTATIONML + name for name in ('slide+xml', 'slideLayout+xml', 'slideMaster+xml'))
+SHAPE_CONTENT_TYPES = PAGE_CONTENT_TYPES + tuple(
+    CT_PRESENTATIONML + name for name in ('notesSlide+xml', 'notesMaster+xml', 'handoutMaster+xml')
+)
+
+# 只有图片比显示所需大出一定比例时才重新采样，避免为少量收益重新编码
+RESAMPLE_THRESHOLD = 0.75
+SUPPORTED_FORMATS = ('JPEG', 'PNG')
+
+logger = logging.getLogger(__name__)
+
+
+def _get_slide_size(reader: ZipMediaReader) -> Optional[Tuple[int, int]]:
+    """幻灯片尺寸（EMU）"""
+    root = etree.fromstring(reader.read(reader.get_presentation_part()))
+    size = root.find(TAG_SLD_SZ)
+    if size is None:
+        return None
+    return int(size.get('cx')), int(size.get('cy'))
+
+
+def _displayed_extent(ref, page_size: Optional[Tuple[int, int]]) -> Optional[Tuple[float, float]]:
+    """计算一处图片引用需要的完整图片显示尺寸（EMU）
+
+    取所在形状的尺寸，乘以外层组合形状的缩放，再除以裁剪后保留的比例。
+    平铺填充、缺少尺寸（如继承版式位置的占位符）等无法确定的情况返回None。
+    """
+    if ref.tag != TAG_BLIP:
+        return None
+    blip_fill = ref.getparent()
+    if blip_fill is None or blip_fill.find(TAG_TILE) is not None:
+        return None
+
+    keep_w = keep_h = 1.0
+    src_rect = blip_fill.find(TAG_SRC_RECT)
+    if src_rect is not None:
+        keep_w = 1 - (int(src_rect.get('l', 0)) + int(src_rect.get('r', 0))) / 100000
+        keep_h = 1 - (int(src_rect.get('t', 0)) + int(src_rect.get('b', 0))) / 100000
+        if keep_w <= 0 or keep_h <= 0:
+            return None
+
+    shape = blip_fill.getparent()
+    while shape is not None and shape.tag not in SHAPE_XFRM_PATHS and shape.tag != TAG_BG:
+        shape = shape.getparent()
+    if shape is None:
+        return None
+    if shape.tag == TAG_BG:
+        if page_size is None:
+            return None
+        return page_size[0] / keep_w, page_size[1] / keep_h
+
+    ext = shape.find(f"{SHAPE_XFRM_PATHS[shape.tag]}/{TAG_EXT}")
+    if ext is None:
+        return None
+    width, height = int(ext.get('cx', 0)), int(ext.get('cy', 0))
+
+    # 组合形状中子形状的坐标按ext/chExt缩放
+    for group in shape.iterancestors(TAG_GRP_SP):
+        xfrm = group.find(GROUP_XFRM_PATH)
+        if xfrm is None:
+            continue
+        group_ext, child_ext = xfrm.find(TAG_EXT), xfrm.find(TAG_CH_EXT)
+        if group_ext is None or child_ext is None:
+            continue
+        if int(child_ext.get('cx', 0)) > 0:
+            width *= int(group_ext.get('cx', 0)) / int(child_ext.get('cx'))
+        if int(child_ext.get('cy', 0)) > 0:
+            height *= int(group_ext.get('cy', 0)) / int(child_ext.get('cy'))
+
+    if width <= 0 or height <= 0:
+        return None
+    return width / keep_w, height / keep_h
+
+
+def collect_image_extents(reader: ZipMediaReader) -> Dict[str, Optional[List[Tuple[float, float]]]]:
+    """遍历包中所有关系，收集每个图片成员的全部显示尺寸
+
+    同一图片被多处引用时汇总到一起，只要有一处无法确定尺寸，该图片记为None（不处理）。
+
+    Returns:
+        Dict[str, Optional[List[Tuple[float, float]]]]: {图片成员: [(宽EMU, 高EMU)] 或 None}
+    """
+    slide_size = _get_slide_size(reader)
+    extents = {}
+    for rels_name in reader.zip_file.namelist():
+        if not rels_name.endswith('.rels'):
+            continue
+        part = part_for_rels(rels_name)
+        image_rels = [
+            rel for rel in reader.get_rels(part)
+            if rel['type'] == RT_IMAGE and not rel['external'] and reader.has_member(rel['target'])
+        ]
+        if not image_rels:
+            continue
+
+        content_type = reader.get_content_type(part)
+        root = etree.fromstring(reader.read(part)) if content_type in SHAPE_CONTENT_TYPES else None
+        page_size = slide_size if content_type in PAGE_CONTENT_TYPES else None
+        refs = {}
+        if root is not None:
+            for elem in root.iter():
+                for name, value in elem.attrib.items():
+                    if name.startswith(REL_ATTR_PREFIX):
+                        refs.setdefault(value, []).append(elem)
+
+        for rel in image_rels:
+            member = rel['target']
+            if member in extents and extents[member] is None:
+                continue
+            # 图表、SmartArt等部件，或XML中找不到引用（如VML）时无法确定尺寸
+            found = [_displayed_extent(ref, page_size) for ref in refs.get(rel['id'], [])]
+            if not found or None in found:
+                extents[member] = None
+            else:
+                extents.setdefault(member, []).extend(found)
+    return extents
+
+
+def _resample(data: bytes, extents: List[Tuple[float, float]], target_dpi: int,
+              jpeg_quality: int) -> Optional[Tuple[bytes, Tuple[int, int], Tuple[int, int]]]:
+    """按最大显示尺寸和目标DPI重新采样图片
+
+    Returns:
+        Optional[Tuple]: (新图片字节, 原尺寸, 新尺寸)，无需处理或重新编码后没有变小时返回None
+    """
+    img = Image.open(io.BytesIO(data))
+    if img.format not in SUPPORTED_FORMATS or getattr(img, 'is_animated', False):
+        return None
+    width, height = img.size
+
+    # 各处引用中需要的最大缩放比例，宽高都要满足
+    scale = max(
+        max(w / EMU_PER_INCH * target_dpi / width, h / EMU_PER_INCH * target_dpi / height)
+        for w, h in extents
+    )
+    if scale >= RESAMPLE_THRESHOLD:
+        return None
+    new_size = (max(1, math.ceil(width * scale)), max(1, math.ceil(height * scale)))
+
+    image_format, info = img.format, img.info
+    if image_format == 'JPEG':
+        # 让解码器直接按1/2、1/4、1/8缩小解码，大图无需完整解码
+        img.draft(img.mode, new_size)
+    if img.mode in ('P', '1'):
+        img = img.convert('RGBA' if img.mode == 'P' else 'L')
+    resized = img.resize(new_size, Image.Resampling.LANCZOS)
+
+    buffer = io.BytesIO()
+    save_args = {'optimize': True}
+    if info.get('icc_profile'):
+        save_args['icc_profile'] = info['icc_profile']
+    if image_format == 'JPEG':
+        save_args['quality'] = jpeg_quality
+        if info.get('exif'):
+            save_args['exif'] = info['exif']
+    resized.save(buffer, image_format, **save_args)
+
+    new_data = buffer.getvalue()
+    if len(new_data) >= len(data):
+        return None
+    return new_data, (width, height), new_size
+
+
+def slim_deck(pptx_path, output_path=None, target_dpi: Optional[int] = None,
+              jpeg_quality: Optional[int] = None) -> Dict:
+    """精简PPT：把远大于显示尺寸的图片按目标DPI重新采样
+
+    根据每处引用所在形状的尺寸（考虑组合缩放和裁剪）计算图片实际显示的大小，
+    同一图片被多处引用时按最大的显示尺寸处理且只处理一次。只处理JPEG和PNG，
+    保持原格式和成员名，因此关系和内容类型都无需改动；重新编码后没有变小的图片保持不变。
+
+    Args:
+        pptx_path: PPTX文件路径
+        output_path: 输出路径，默认覆盖原文件
+        target_dpi: 目标DPI，默认读取SLIM_CONFIG
+        jpeg_quality: JPEG重新编码的质量，默认读取SLIM_CONFIG
+
+    Returns:
+        Dict: {'ppt', 'images': [{'member', 'size', 'new_size', 'bytes_before', 'bytes_after'}],
+               'skipped'（无法确定显示尺寸的图片数）, 'size_before', 'size_after'}
+    """
+    slim_config = Settings().SLIM_CONFIG
+    target_dpi = target_dpi or slim_config['target_dpi']
+    jpeg_quality = jpeg_quality or slim_config['jpeg_quality']
+
+    pptx_path = str(pptx_path)
+    result = {'ppt': pptx_path, 'images': [], 'skipped': 0, 'size_before': os.path.getsize(pptx_path)}
+    result['size_after'] = result['size_before']
+    replacements = {}
+
+    with ZipMediaReader(pptx_path) as reader:
+        for member, extents in collect_image_extents(reader).items():
+            if extents is None:
+                result['skipped'] += 1
+                continue
+            data = reader.read(member)
+            try:
+                resampled = _resample(data, extents, target_dpi, jpeg_quality)
+            except Exception as e:
+                logger.warning(f"重新采样 {pptx_path} 中的 {member} 失败: {str(e)}")
+                continue
+            if resampled is None:
+                continue
+            new_data, size, new_size = resampled
+            replacements[member] = new_data
+            result['images'].append({
+                'member': member,
+                'size': size,
+                'new_size': new_size,
+                'bytes_before': len(data),
+                'bytes_after': len(new_data)
+            })
+
+    if replacements:
+        result['size_after'] = rewrite_package(pptx_path, replacements, output_path=output_path)
+    elif output_path:
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(pptx_path, output_path)
+    return result
+
+
+def _slim_deck_worker(pptx_path: str, output_path: Optional[str], target_dpi: Optional[int],
+                      jpeg_quality: Optional[int]) -> Dict:
+    """进程池工作函数 - 精简单个PPT，失败时返回错误信息"""
+    try:
+        return slim_deck(pptx_path, output_path, target_dpi, jpeg_quality)
+    except Exception as e:
+        return {'ppt': pptx_path, 'error': str(e)}
+
+
+def slim_folder(folder_path: str, output_folder: Optional[str] = None, workers: int = 1,
+                target_dpi: Optional[int] = None, jpeg_quality: Optional[int] = None,
+                progress_callback=None) -> Dict:
+    """批量精简文件夹中所有PPTX
+
+    Args:
+        folder_path: PPT文件夹路径
+        output_folder: 输出文件夹（保持相对目录结构），默认覆盖原文件
+        workers: 工作进程数
+        target_dpi: 目标DPI
+        jpeg_quality: JPEG重新编码的质量
+        progress_callback: 进度回调函数
+
+    Returns:
+        Dict: {'decks': 处理的PPT数, 'images': 重新采样的图片数,
+               'bytes_saved': 共减少的字节数, 'failed': [失败信息列表]}
+    """
+    folder_path = Path(folder_path)
+    if not folder_path.exists():
+        raise FileNotFoundError(f"文件夹不存在: {folder_path}")
+
+    # 大文件先处理，避免末尾被单个大文件拖住
+    ppt_files = [str(task['path']) for task in plan_longest_first(list(iter_pptx_files(folder_path)))]
+    output_paths = [
+        str(Path(output_folder) / Path(path).relative_to(folder_path)) if output_folder else None
+        for path in ppt_files
+    ]
+    summary = {'decks': 0, 'images': 0, 'bytes_saved': 0, 'failed': []}
+    if not ppt_files:
+        logger.warning(f"未在 {folder_path} 找到PPTX文件")
+        return summary
+
+    dpi_args = [target_dpi] * len(ppt_files)
+    quality_args = [jpeg_quality] * len(ppt_files)
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(_slim_deck_worker, ppt_files, output_paths, dpi_args, quality_args)
+    else:
+        executor = None
+        results = map(_slim_deck_worker, ppt_files, output_paths, dpi_args, quality_args)
+
+    try:
+        for current_idx, result in enumerate(tqdm(results, total=len(ppt_files), desc="精简PPT"), 1):
+            if progress_callback:
+                progress_callback(current_idx, len(ppt_files), f"正在处理: {Path(result['ppt']).name}")
+
+            summary['decks'] += 1
+            if 'error' in result:
+                logger.error(f"精简 {result['ppt']} 时出错: {result['error']}")
+                summary['failed'].append(result)
+                continue
+            summary['images'] += len(result['images'])
+            summary['bytes_saved'] += result['size_before'] - result['size_after']
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return summary
@@ -0,0 +1,117 @@
+from pathlib import Path
+from typing import Dict, List, Optional
+from datetime import datetime
+import logging
+
+# 任务中PPT的状态
+DECK_PENDING = 'pending'
+DECK_DONE = 'done'
+DECK_FAILED = 'failed'
+
+# 任务状态
+JOB_RUNNING = 'running'
+JOB_COMPLETED = 'completed'
+
+
+class IndexJournal:
+    """索引任务日志 - 记录一次索引任务中每个PPT的完成情况，程序中断后可从断点续跑
+    
+    PPT的完成状态与其图片映射在同一事务中写入（见DatabaseManager.bulk_ingest），
+    因此日志中标记为done的PPT一定已经完整入库。
+    """
+    
+    def __init__(self, db_manager):
+        self.db = db_manager
+        self.logger = logging.getLogger(__name__)
+    
+    def _now(self) -> str:
+        return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    
+    def create_job(self, folder_path: str, output_folder: Optional[str], ppt_files: List[Path]) -> int:
+        """创建索引任务，所有PPT初始为待处理状态"""
+        now = self._now()
+        with self.db.transaction():
+            self.db.execute(
+                """
+                INSERT INTO index_jobs (folder_path, output_folder, status, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (str(folder_path), str(output_folder) if output_folder else None, JOB_RUNNING, now, now)
+            )
+            job_id = self.db.cursor.lastrowid
+            self.db.executemany(
+                """
+                INSERT OR IGNORE INTO index_job_decks (job_id, pptx_path, status, updated_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                [(job_id, str(ppt_path), DECK_PENDING, now) for ppt_path in ppt_files]
+            )
+        return job_id
+    
+    def find_resumable(self, folder_path: str) -> Optional[int]:
+        """查找该文件夹最近一次未完成的任务"""
+        row = self.db.execute(
+            """
+            SELECT id FROM index_jobs
+            WHERE folder_path = ? AND status = ?
+            ORDER BY id DESC LIMIT 1
+            """,
+            (str(folder_path), JOB_RUNNING)
+        ).fetchone()
+        return row[0] if row else None
+    
+    def get_decks(self, job_id: int, status: str = DECK_PENDING) -> List[Path]:
+        """获取任务中指定状态的PPT"""
+        rows = self.db.execute(
+            "SELECT pptx_path FROM index_job_decks WHERE job_id = ? AND status = ?",
+            (job_id, status)
+        ).fetchall()
+        return [Path(row[0]) for row in rows]
+    
+    def requeue_failed(self, job_id: int) -> int:
+        """将任务中失败的PPT重新置为待处理，续跑时重试
+        
+        失败可能是暂时的（文件被占用、工作进程崩溃时正在处理的PPT等），
+        不重试的话这些PPT在下次完整索引之前都不会入库。
+        
+        Returns:
+            int: 重新置为待处理的PPT数量
+        """
+        with self.db.transaction():
+            cursor = self.db.execute(
+                """
+                UPDATE index_job_decks SET status = ?, error = NULL, updated_at = ?
+                WHERE job_id = ? AND status = ?
+                """,
+                (DECK_PENDING, self._now(), job_id, DECK_FAILED)
+            )
+        return cursor.rowcount
+    
+    def mark_failed(self, job_id: int, ppt_path: Path, error: str):
+        """标记PPT处理失败（续跑时重新处理）"""
+        with self.db.transaction():
+            self.db.execute(
+                """
+                UPDATE index_job_decks SET status = ?, error = ?, updated_at = ?
+                WHERE job_id = ? AND pptx_path = ?
+                """,
+                (DECK_FAILED, error, self._now(), job_id, str(ppt_path))
+            )
+    
+    def complete_job(self, job_id: int):
+        """标记任务完成"""
+        with self.db.transaction():
+            self.db.execute(
+                "UPDATE index_jobs SET status = ?, updated_at = ? WHERE id = ?",
+                (JOB_COMPLETED, self._now(), job_id)
+            )
+    
+    def get_summary(self, job_id: int) -> Dict[str, int]:
+        """统计任务中各状态的PPT数量"""
+        rows = self.db.execute(
+            "SELECT status, COUNT(*) FROM index_job_decks WHERE job_id = ? GROUP BY status",
+            (job_id,)
+        ).fetchall()
+        summary = {DECK_PENDING: 0, DECK_DONE: 0, DECK_FAILED: 0}
+        summary.update({row[0]: row[1] for row in rows})
+        return summary
@@ -0,0 +1,337 @@
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+from concurrent.futures import ProcessPoolExecutor
+import logging
+import os
+import shutil
+from lxml import etree
+from tqdm import tqdm
+from .zip_media_reader import (
+    ZipMediaReader, NS_PRESENTATION, NS_OFFICE_REL, REL_ATTR_PREFIX,
+    RT_IMAGE, RT_SLIDE_LAYOUT, RT_SLIDE_MASTER, rels_path_for
+)
+from .package_writer import rewrite_package
+from .deck_scheduler import plan_longest_first
+from .text_extractor import iter_pptx_files
+
+TAG_SLD_MASTER_ID_LST = f"{{{NS_PRESENTATION}}}sldMasterIdLst"
+TAG_SLD_LAYOUT_ID_LST = f"{{{NS_PRESENTATION}}}sldLayoutIdLst"
+TAG_SP_TREE = f"{{{NS_PRESENTATION}}}spTree"
+TAG_PH = f"{{{NS_PRESENTATION}}}ph"
+ATTR_REL_ID = f"{{{NS_OFFICE_REL}}}id"
+
+CT_SLIDE_MASTER = 'application/vnd.openxmlformats-officedocument.presentationml.slideMaster+xml'
+CT_SLIDE_LAYOUT = 'application/vnd.openxmlformats-officedocument.presentationml.slideLayout+xml'
+
+# 占位符未写type时的默认类型
+DEFAULT_PH_TYPE = 'obj'
+# 版式占位符按类型继承母版占位符，除以下类型外都继承母版的正文占位符
+MASTER_PH_TYPES = {'title': 'title', 'ctrTitle': 'title', 'dt': 'dt', 'ftr': 'ftr', 'sldNum': 'sldNum'}
+
+logger = logging.getLogger(__name__)
+
+
+def _parse(reader: ZipMediaReader, part_name: str):
+    return etree.fromstring(reader.read(part_name))
+
+
+def _serialize(root) -> bytes:
+    return etree.tostring(root, xml_declaration=True, encoding='UTF-8', standalone=True)
+
+
+def _iter_placeholders(root):
+    """遍历部件形状树中的占位符，产出(形状元素, ph元素)"""
+    sp_tree = root.find(f".//{TAG_SP_TREE}")
+    if sp_tree is None:
+        return
+    for ph in sp_tree.iter(TAG_PH):
+        # ph位于 p:nvXxPr/p:nvPr/p:ph，形状元素在其上三层
+        shape = ph.getparent().getparent().getparent()
+        yield shape, ph
+
+
+def _ph_key(ph):
+    """占位符的(类型, 索引)"""
+    return ph.get('type', DEFAULT_PH_TYPE), ph.get('idx', '0')
+
+
+class _RelsPart:
+    """可修改的.rels部件"""
+
+    def __init__(self, reader: ZipMediaReader, part_name: str):
+        self.name = rels_path_for(part_name)
+        self.root = _parse(reader, self.name) if reader.has_member(self.name) else None
+        self.rels = {rel['id']: rel for rel in reader.get_rels(part_name)}
+        self.modified = False
+
+    def targets(self, rel_type: str) -> List[str]:
+        return [rel['target'] for rel in self.rels.values()
+                if rel['type'] == rel_type and not rel['external']]
+
+    def drop(self, rel_ids: Iterable[str]):
+        rel_ids = set(rel_ids)
+        if not rel_ids or self.root is None:
+            return
+        for elem in list(self.root):
+            if elem.get('Id') in rel_ids:
+                self.root.remove(elem)
+        for rel_id in rel_ids:
+            self.rels.pop(rel_id, None)
+        self.modified = True
+
+
+def _drop_unreferenced_image_rels(root, rels: _RelsPart):
+    """删除部件XML中已不再引用的图片关系（删除占位符后可能遗留）"""
+    referenced = {
+        value for elem in root.iter() for key, value in elem.attrib.items()
+        if key.startswith(REL_ATTR_PREFIX)
+    }
+    rels.drop(rel_id for rel_id, rel in rels.rels.items()
+              if rel['type'] == RT_IMAGE and rel_id not in referenced)
+
+
+def _reachable_parts(reader: ZipMediaReader, rels_overrides: Dict[str, _RelsPart]) -> Set[str]:
+    """从包根沿关系图可到达的全部部件（使用修改后的关系）"""
+    reachable = set()
+    pending = ['']
+    while pending:
+        part = pending.pop()
+        rels = rels_overrides[part].rels.values() if part in rels_overrides else reader.get_rels(part)
+        for rel in rels:
+            target = rel['target']
+            if rel['external'] or target in reachable or not reader.has_member(target):
+                continue
+            reachable.add(target)
+            pending.append(target)
+    return reachable
+
+
+def clean_deck_layouts(pptx_path, output_path=None, prune_placeholders: bool = True) -> Dict:
+    """清理PPT中未使用的版式和母版（纯XML实现，不依赖PowerPoint）
+
+    1. 删除没有任何幻灯片使用的母版和版式，同时修正presentation.xml、母版的版式列表和各.rels；
+    2. 删除保留的版式中没有幻灯片继承的占位符，以及没有保留的版式继承的母版占位符；
+    3. 删除所有因此不再可达的部件（版式、母版、主题及其图片），并更新[Content_Types].xml。
+
+    版式和母版上的占位符只是模板，不会显示在幻灯片上，删除未被继承的占位符不改变任何页面的外观。
+    只重写改动过的XML部件，其余成员原样复制。
+
+    Args:
+        pptx_path: PPTX文件路径
+        output_path: 输出路径，默认覆盖原文件
+        prune_placeholders: 是否清理未被继承的占位符
+
+    Returns:
+        Dict: {'ppt', 'masters', 'layouts', 'placeholders', 'parts'（删除的部件数）,
+               'size_before', 'size_after'}
+    """
+    pptx_path = str(pptx_path)
+    result = {'ppt': pptx_path, 'masters': 0, 'layouts': 0, 'placeholders': 0, 'parts': 0,
+              'size_before': os.path.getsize(pptx_path)}
+    result['size_after'] = result['size_before']
+    replacements = {}
+
+    with ZipMediaReader(pptx_path) as reader:
+        pres_part = reader.get_presentation_part()
+        slide_parts = reader.get_slide_parts()
+        reachable_before = _reachable_parts(reader, {})
+
+        # 幻灯片 -> 版式 -> 母版 的使用关系
+        slide_layout = {}
+        for slide_part in slide_parts:
+            layouts = _RelsPart(reader, slide_part).targets(RT_SLIDE_LAYOUT)
+            if layouts:
+                slide_layout[slide_part] = layouts[0]
+        used_layouts = set(slide_layout.values())
+        layout_master = {}
+        for layout in used_layouts:
+            masters = _RelsPart(reader, layout).targets(RT_SLIDE_MASTER)
+            if masters:
+                layout_master[layout] = masters[0]
+        used_masters = set(layout_master.values())
+
+        pres_rels = _RelsPart(reader, pres_part)
+        master_parts = pres_rels.targets(RT_SLIDE_MASTER)
+        if not used_masters and master_parts:
+            # 没有幻灯片时仍需保留一个母版和一个版式，PPT才能正常打开
+            used_masters = {master_parts[0]}
+            first_layouts = _RelsPart(reader, master_parts[0]).targets(RT_SLIDE_LAYOUT)
+            used_layouts = set(first_layouts[:1])
+            layout_master = {layout: master_parts[0] for layout in used_layouts}
+
+        rels_overrides = {pres_part: pres_rels}
+
+        # 删除未使用的母版
+        pres_root = _parse(reader, pres_part)
+        id_lst = pres_root.find(TAG_SLD_MASTER_ID_LST)
+        dropped = []
+        if id_lst is not None:
+            for master_id in list(id_lst):
+                rel = pres_rels.rels.get(master_id.get(ATTR_REL_ID))
+                if rel is not None and rel['target'] not in used_masters:
+                    id_lst.remove(master_id)
+                    dropped.append(rel['id'])
+        if dropped:
+            pres_rels.drop(dropped)
+            replacements[pres_part] = _serialize(pres_root)
+
+        # 逐个母版删除未使用的版式
+        master_roots = {}
+        for master in used_masters:
+            master_rels = _RelsPart(reader, master)
+            rels_overrides[master] = master_rels
+            master_root = master_roots[master] = _parse(reader, master)
+            layout_lst = master_root.find(TAG_SLD_LAYOUT_ID_LST)
+            dropped = []
+            if layout_lst is not None:
+                for layout_id in list(layout_lst):
+                    rel = master_rels.rels.get(layout_id.get(ATTR_REL_ID))
+                    if rel is not None and rel['target'] not in used_layouts:
+                        layout_lst.remove(layout_id)
+                        dropped.append(rel['id'])
+            if dropped:
+                master_rels.drop(dropped)
+                replacements[master] = _serialize(master_root)
+
+        if prune_placeholders:
+            result['placeholders'] = _prune_placeholders(
+                reader, slide_layout, layout_master, master_roots, rels_overrides, replacements
+            )
+
+        for part, rels in rels_overrides.items():
+            if rels.modified and rels.root is not None:
+                replacements[rels.name] = _serialize(rels.root)
+
+        removed = reachable_before - _reachable_parts(reader, rels_overrides)
+        result['parts'] = len(removed)
+        # 被删除母版下的版式随母版一起不可达，按内容类型统计
+        content_types = [reader.get_content_type(part) for part in removed]
+        result['masters'] = content_types.count(CT_SLIDE_MASTER)
+        result['layouts'] = content_types.count(CT_SLIDE_LAYOUT)
+
+    if not replacements and not removed:
+        if output_path:
+            Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(pptx_path, output_path)
+        return result
+
+    result['size_after'] = rewrite_package(pptx_path, replacements, removed, output_path)
+    return result
+
+
+def _prune_placeholders(reader: ZipMediaReader, slide_layout: Dict[str, str],
+                        layout_master: Dict[str, str], master_roots: Dict,
+                        rels_overrides: Dict[str, _RelsPart], replacements: Dict[str, bytes]) -> int:
+    """删除版式和母版中未被继承的占位符
+
+    幻灯片占位符按索引或类型继承版式占位符，版式占位符按类型继承母版占位符。
+    """
+    removed_count = 0
+
+    # 每个版式被幻灯片引用的占位符
+    slide_keys = {}
+    for slide_part, layout in slide_layout.items():
+        keys = slide_keys.setdefault(layout, set())
+        keys.update(_ph_key(ph) for _, ph in _iter_placeholders(_parse(reader, slide_part)))
+
+    master_keys = {master: set() for master in master_roots}
+    for layout, master in layout_master.items():
+        layout_root = _parse(reader, layout)
+        used = slide_keys.get(layout, set())
+        used_types = {ph_type for ph_type, _ in used}
+        used_idx = {idx for _, idx in used}
+        pruned = 0
+        for shape, ph in list(_iter_placeholders(layout_root)):
+            ph_type, idx = _ph_key(ph)
+            if idx in used_idx or ph_type in used_types:
+                master_keys.setdefault(master, set()).add(MASTER_PH_TYPES.get(ph_type, 'body'))
+                continue
+            shape.getparent().remove(shape)
+            pruned += 1
+        if pruned:
+            layout_rels = rels_overrides[layout] = _RelsPart(reader, layout)
+            _drop_unreferenced_image_rels(layout_root, layout_rels)
+            replacements[layout] = _serialize(layout_root)
+            removed_count += pruned
+
+    for master, master_root in master_roots.items():
+        used_types = master_keys.get(master, set())
+        pruned = 0
+        for shape, ph in list(_iter_placeholders(master_root)):
+            ph_type = MASTER_PH_TYPES.get(ph.get('type', DEFAULT_PH_TYPE), 'body')
+            if ph_type in used_types:
+                continue
+            shape.getparent().remove(shape)
+            pruned += 1
+        if pruned:
+            _drop_unreferenced_image_rels(master_root, rels_overrides[master])
+            replacements[master] = _serialize(master_root)
+            removed_count += pruned
+
+    return removed_count
+
+
+def _clean_layouts_worker(pptx_path: str, output_path: Optional[str], prune_placeholders: bool) -> Dict:
+    """进程池工作函数 - 清理单个PPT，失败时返回错误信息"""
+    try:
+        return clean_deck_layouts(pptx_path, output_path, prune_placeholders)
+    except Exception as e:
+        return {'ppt': pptx_path, 'error': str(e)}
+
+
+def clean_folder_layouts(folder_path: str, output_folder: Optional[str] = None, workers: int = 1,
+                         prune_placeholders: bool = True, progress_callback=None) -> Dict:
+    """批量清理文件夹中所有PPTX的未使用版式和母版
+
+    Args:
+        folder_path: PPT文件夹路径
+        output_folder: 输出文件夹（保持相对目录结构），默认覆盖原文件
+        workers: 工作进程数
+        prune_placeholders: 是否清理未被继承的占位符
+        progress_callback: 进度回调函数
+
+    Returns:
+        Dict: {'decks': 处理的PPT数, 'masters', 'layouts', 'placeholders',
+               'bytes_saved': 共减少的字节数, 'failed': [失败信息列表]}
+    """
+    folder_path = Path(folder_path)
+    if not folder_path.exists():
+        raise FileNotFoundError(f"文件夹不存在: {folder_path}")
+
+    # 大文件先处理，避免末尾被单个大文件拖住
+    ppt_files = [str(task['path']) for task in plan_longest_first(list(iter_pptx_files(folder_path)))]
+    output_paths = [
+        str(Path(output_folder) / Path(path).relative_to(folder_path)) if output_folder else None
+        for path in ppt_files
+    ]
+    summary = {'decks': 0, 'masters': 0, 'layouts': 0, 'placeholders': 0, 'bytes_saved': 0, 'failed': []}
+    if not ppt_files:
+        logger.warning(f"未在 {folder_path} 找到PPTX文件")
+        return summary
+
+    prune_flags = [prune_placeholders] * len(ppt_files)
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(_clean_layouts_worker, ppt_files, output_paths, prune_flags)
+    else:
+        executor = None
+        results = map(_clean_layouts_worker, ppt_files, output_paths, prune_flags)
+
+    try:
+        for current_idx, result in enumerate(tqdm(results, total=len(ppt_files), desc="清理PPT版式"), 1):
+            if progress_callback:
+                progress_callback(current_idx, len(ppt_files), f"正在处理: {Path(result['ppt']).name}")
+
+            summary['decks'] += 1
+            if 'error' in result:
+                logger.error(f"清理 {result['ppt']} 的版式时出错: {result['error']}")
+                summary['failed'].append(result)
+                continue
+            for key in ('masters', 'layouts', 'placeholders'):
+                summary[key] += result[key]
+            summary['bytes_saved'] += result['size_before'] - result['size_after']
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return summary
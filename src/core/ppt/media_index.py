@@ -0,0 +1,83 @@
+from typing import Dict, Optional, Set, Tuple
+import logging
+
+# (CRC32, 未压缩大小) -> 已入库图片信息；同一键对应多张不同图片（CRC冲突）时为None
+KnownMedia = Dict[Tuple[int, int], Optional[Dict]]
+
+
+class MediaCrcIndex:
+    """媒体CRC索引 - 利用zip中央目录中现成的CRC32和大小识别已入库的图片
+    
+    zip中每个成员都在中央目录中记录了CRC32和未压缩大小，读取它们无需解压。
+    (CRC32, 大小)已出现过且只对应一张图片时，直接复用该图片的记录，
+    跳过解压和MD5计算；键是新的或存在冲突时才完整哈希。
+    """
+    
+    def __init__(self, db_manager):
+        self.db = db_manager
+        self.logger = logging.getLogger(__name__)
+    
+    def load(self) -> KnownMedia:
+        """加载所有已知媒体，只包含仍存在于图片表中的记录
+        
+        Returns:
+            KnownMedia: {(crc32, file_size): {'hash', 'path', 'format', 'width', 'height', 'file_size'}}，
+                        冲突的键对应None
+        """
+        rows = self.db.execute(f"""
+            SELECT m.crc32, m.file_size, i.img_hash, i.img_path, i.format, i.width, i.height
+            FROM media_crc_index m
+            JOIN {self.db.table_name} i ON i.img_hash = m.img_hash
+            WHERE i.format IS NOT NULL AND i.width IS NOT NULL AND i.height IS NOT NULL
+        """).fetchall()
+        
+        known = {}
+        for row in rows:
+            key = (row['crc32'], row['file_size'])
+            if key in known:
+                # 同一(CRC32, 大小)对应不同图片，只能完整哈希区分
+                known[key] = None
+                continue
+            known[key] = {
+                'hash': row['img_hash'],
+                'path': row['img_path'],
+                'format': row['format'],
+                'width': row['width'],
+                'height': row['height'],
+                'file_size': row['file_size']
+            }
+        
+        collisions = sum(1 for info in known.values() if info is None)
+        if collisions:
+            self.logger.info(f"媒体CRC索引中有 {collisions} 个冲突键，相关媒体将完整哈希")
+        return known
+    
+    def keys_for(self, img_hash: str) -> Set[Tuple[int, int]]:
+        """图片出现过的(CRC32, 大小)，内容相同的成员必然具有这些键之一"""
+        rows = self.db.execute(
+            "SELECT crc32, file_size FROM media_crc_index WHERE img_hash = ?", (img_hash,)
+        ).fetchall()
+        return {(row['crc32'], row['file_size']) for row in rows}
+    
+    def remember(self, known: KnownMedia, images):
+        """将刚入库的图片加入内存中的索引，同一次运行中后续的PPT即可复用
+        
+        Args:
+            known: load()返回的索引，原地更新
+            images: 已分析的图片信息列表（含crc32、file_size、hash及尺寸）
+        """
+        for img in images:
+            if img.get('crc32') is None or img.get('file_size') is None:
+                continue
+            key = (img['crc32'], img['file_size'])
+            if key not in known:
+                known[key] = {
+                    'hash': img['hash'],
+                    'path': str(img['path']),
+                    'format': img['format'],
+                    'width': img['width'],
+                    'height': img['height'],
+                    'file_size': img['file_size']
+                }
+            elif known[key] is not None and known[key]['hash'] != img['hash']:
+                known[key] = None
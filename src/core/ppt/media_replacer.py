@@ -0,0 +1,265 @@
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import hashlib
+import logging
+import zlib
+from tqdm import tqdm
+from ..images.image_probe import describe_image
+from ..images.image_store import ImageStore
+from ..images.deck_media_cache import is_virtual_path, make_virtual_path
+from .zip_media_reader import ZipMediaReader
+from .package_writer import rewrite_package
+from .source_readers import IMAGE_EXTENSIONS
+from .slide_fingerprint import hash_deck_slides
+from .media_index import MediaCrcIndex, KnownMedia
+from .deck_manifest import compute_fingerprint
+from .deck_scheduler import plan_longest_first
+
+logger = logging.getLogger(__name__)
+
+
+def replace_deck_media(pptx_path, old_hash: str, new_data: bytes, new_ext: str,
+                       known_media: Optional[KnownMedia] = None,
+                       old_keys: Optional[Set[Tuple[int, int]]] = None) -> Dict:
+    """将PPTX中内容为old_hash的所有图片成员替换为新图片
+
+    一次遍历关系图找出所有被引用的图片成员。中央目录中的(CRC32, 大小)只用于预筛选：
+    与原图片的键相同的成员一律解压计算MD5确认后才替换，其余成员不可能是原图片，
+    只为重新计算幻灯片哈希取其哈希（命中已知媒体的直接复用）。成员名不变，
+    新图片格式与扩展名的默认内容类型不一致时在[Content_Types].xml中添加Override；
+    其余成员原样复制，不重新序列化。
+
+    Args:
+        pptx_path: PPTX文件路径（原地替换）
+        old_hash: 要替换的图片MD5
+        new_data: 新图片的字节内容
+        new_ext: 新图片的扩展名（含点）
+        known_media: MediaCrcIndex.load()的结果，用于跳过非候选成员的解压和哈希
+        old_keys: 原图片的(CRC32, 大小)，见MediaCrcIndex.keys_for；为None时所有成员都计算MD5
+
+    Returns:
+        Dict: {'ppt', 'members': [被替换的成员], 'slide_hashes': 替换后每页的规范化哈希,
+               'file_size', 'mtime_ns', 'fingerprint'}，没有匹配的成员时members为空且不改动文件
+    """
+    pptx_path = Path(pptx_path)
+    new_hash = hashlib.md5(new_data).hexdigest()
+    new_content_type = IMAGE_EXTENSIONS.get(new_ext.lower())
+    media_hashes, content_types, members = {}, {}, []
+
+    with ZipMediaReader(str(pptx_path)) as reader:
+        for media in reader.iter_media():
+            member = media['member']
+            if member in media_hashes:
+                continue
+            info = reader.get_info(member)
+            key = (info.CRC, info.file_size)
+            if old_keys is not None and key not in old_keys:
+                # 不可能是原图片，只用于幻灯片哈希
+                known = known_media.get(key) if known_media else None
+                media_hashes[member] = known['hash'] if known else hashlib.md5(reader.read(member)).hexdigest()
+                continue
+            media_hashes[member] = hashlib.md5(reader.read(member)).hexdigest()
+            if media_hashes[member] != old_hash:
+                continue
+            members.append(member)
+            if new_content_type and reader.get_content_type(member) != new_content_type:
+                content_types[member] = new_content_type
+
+    result = {'ppt': str(pptx_path), 'members': members, 'slide_hashes': None}
+    if not members:
+        return result
+
+    rewrite_package(pptx_path, {member: new_data for member in members}, content_types=content_types)
+
+    # 幻灯片哈希包含图片哈希，替换后重新计算
+    media_hashes.update({member: new_hash for member in members})
+    result['slide_hashes'] = hash_deck_slides(pptx_path, media_hashes)
+    stat = pptx_path.stat()
+    result.update({
+        'file_size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'fingerprint': compute_fingerprint(pptx_path, stat.st_size)
+    })
+    return result
+
+
+# 工作进程中的已知媒体索引和原图片的键，由进程池初始化函数设置一次，避免随每个任务传输
+_worker_known_media: Optional[KnownMedia] = None
+_worker_old_keys: Optional[Set[Tuple[int, int]]] = None
+
+
+def _init_replace_worker(known_media: Optional[KnownMedia], old_keys: Optional[Set[Tuple[int, int]]]):
+    """进程池初始化函数"""
+    global _worker_known_media, _worker_old_keys
+    _worker_known_media = known_media
+    _worker_old_keys = old_keys
+
+
+def _replace_deck_worker(pptx_path: str, old_hash: str, new_image_path: str) -> Dict:
+    """进程池工作函数 - 替换单个PPT中的图片，失败时返回错误信息"""
+    try:
+        new_path = Path(new_image_path)
+        return replace_deck_media(pptx_path, old_hash, new_path.read_bytes(), new_path.suffix,
+                                  _worker_known_media, _worker_old_keys)
+    except Exception as e:
+        return {'ppt': pptx_path, 'error': str(e)}
+
+
+class MediaReplacer:
+    """图片批量替换 - 按图片映射找到所有使用某张图片的PPT，逐个替换其中的媒体成员"""
+
+    def __init__(self, db_manager):
+        self.db = db_manager
+        self.logger = logging.getLogger(__name__)
+        self.media_index = MediaCrcIndex(db_manager)
+
+    def find_decks(self, img_hash: str) -> List[str]:
+        """获取映射中使用该图片的所有PPT"""
+        rows = self.db.execute(
+            "SELECT DISTINCT pptx_path FROM image_ppt_mapping WHERE img_hash = ? ORDER BY pptx_path",
+            (img_hash,)
+        ).fetchall()
+        return [row['pptx_path'] for row in rows]
+
+    def replace_everywhere(self, old_hash: str, new_image_path: str, workers: int = 1,
+                           progress_callback=None) -> Dict:
+        """在所有使用该图片的PPTX中替换为新图片，并在一个事务中更新数据库
+
+        只处理PPTX（其他来源的映射跳过）；各PPT并行改写，当前进程统一写入数据库：
+        新图片入库，替换成功的PPT的映射、幻灯片哈希和变更清单改为替换后的内容。
+
+        Args:
+            old_hash: 要替换的图片MD5
+            new_image_path: 新图片文件路径
+            workers: 工作进程数
+            progress_callback: 进度回调函数
+
+        Returns:
+            Dict: {'hash': 新图片MD5, 'decks': 替换的PPT数, 'members': 替换的成员数,
+                   'skipped': [未处理的PPT], 'failed': [失败信息列表]}
+        """
+        new_image_path = Path(new_image_path)
+        new_data = new_image_path.read_bytes()
+        new_info = describe_image(new_data)
+        if new_info['hash'] == old_hash:
+            raise ValueError("新图片与原图片内容相同")
+        new_ext = new_image_path.suffix.lower()
+        if new_ext not in IMAGE_EXTENSIONS:
+            raise ValueError(f"不支持的图片格式: {new_ext}")
+
+        summary = {'hash': new_info['hash'], 'decks': 0, 'members': 0, 'skipped': [], 'failed': []}
+        ppt_files = []
+        for path in self.find_decks(old_hash):
+            if Path(path).suffix.lower() == '.pptx' and Path(path).is_file():
+                ppt_files.append(path)
+            else:
+                summary['skipped'].append(path)
+        if not ppt_files:
+            self.logger.warning(f"没有可替换图片 {old_hash} 的PPTX")
+            return summary
+
+        ppt_files = [str(task['path']) for task in plan_longest_first([Path(path) for path in ppt_files])]
+        known_media = self.media_index.load()
+        # 原图片未记录CRC时无法预筛选，所有成员都计算MD5
+        old_keys = self.media_index.keys_for(old_hash) or None
+        old_hashes = [old_hash] * len(ppt_files)
+        new_paths = [str(new_image_path)] * len(ppt_files)
+        if workers > 1:
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_replace_worker,
+                                           initargs=(known_media, old_keys))
+            results = executor.map(_replace_deck_worker, ppt_files, old_hashes, new_paths)
+        else:
+            executor = None
+            _init_replace_worker(known_media, old_keys)
+            results = map(_replace_deck_worker, ppt_files, old_hashes, new_paths)
+
+        replaced = []
+        try:
+            for current_idx, result in enumerate(tqdm(results, total=len(ppt_files), desc="替换图片"), 1):
+                if progress_callback:
+                    progress_callback(current_idx, len(ppt_files), f"正在替换: {Path(result['ppt']).name}")
+
+                if 'error' in result:
+                    self.logger.error(f"替换 {result['ppt']} 中的图片时出错: {result['error']}")
+                    summary['failed'].append(result)
+                elif result['members']:
+                    replaced.append(result)
+                else:
+                    # 映射已过期（PPT在上次索引后被修改）
+                    summary['skipped'].append(result['ppt'])
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        if replaced:
+            self._record_replacement(old_hash, new_info, new_data, new_ext, replaced)
+        summary['decks'] = len(replaced)
+        summary['members'] = sum(len(result['members']) for result in replaced)
+        return summary
+
+    def _new_image_path(self, old_hash: str, new_hash: str, new_data: bytes, new_ext: str,
+                        first_result: Dict) -> str:
+        """新图片在图片表中的路径：原图片在虚拟图库中时指向替换后的PPT成员，否则写入原图片所在的图库"""
+        row = self.db.execute(
+            f"SELECT img_path FROM {self.db.table_name} WHERE img_hash = ?", (old_hash,)
+        ).fetchone()
+        if row is None or not row['img_path'] or is_virtual_path(row['img_path']):
+            return make_virtual_path(first_result['ppt'], first_result['members'][0])
+
+        root = Path(row['img_path']).parent
+        shard = root.name == old_hash[:2]
+        store = ImageStore(str(root.parent if shard else root), shard=shard)
+        _, img_path, _ = store.put(new_data, new_ext, img_hash=new_hash)
+        return str(img_path)
+
+    def _record_replacement(self, old_hash: str, new_info: Dict, new_data: bytes, new_ext: str,
+                            replaced: List[Dict]):
+        """在一个事务中写入新图片，并将替换成功的PPT的映射、幻灯片哈希和变更清单更新为替换后的内容
+
+        原图片在虚拟图库中指向被改写的成员时，改为指向仍使用它的其他PPT，已无PPT使用时删除其记录。
+        """
+        new_hash = new_info['hash']
+        img_path = self._new_image_path(old_hash, new_hash, new_data, new_ext, replaced[0])
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+        with self.db.transaction():
+            self.db.execute(
+                f"""
+                INSERT OR IGNORE INTO {self.db.table_name}
+                (img_hash, img_path, img_name, extract_date, img_type, format, width, height, file_size)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (new_hash, img_path, Path(img_path).name, now, 'normal', new_info['format'],
+                 new_info['width'], new_info['height'], new_info['file_size'])
+            )
+            self.db.execute(
+                "INSERT OR IGNORE INTO media_crc_index (crc32, file_size, img_hash) VALUES (?, ?, ?)",
+                (zlib.crc32(new_data), len(new_data), new_hash)
+            )
+            for result in replaced:
+                ppt = result['ppt']
+                # 同一位置已有新图片的映射时保留已有的，再删除剩余的旧映射
+                self.db.execute(
+                    "UPDATE OR IGNORE image_ppt_mapping SET img_hash = ? WHERE img_hash = ? AND pptx_path = ?",
+                    (new_hash, old_hash, ppt)
+                )
+                self.db.execute(
+                    "DELETE FROM image_ppt_mapping WHERE img_hash = ? AND pptx_path = ?",
+                    (old_hash, ppt)
+                )
+                self.db.release_deck_images(ppt)
+                self.db.execute("DELETE FROM slides WHERE pptx_path = ?", (ppt,))
+                self.db.executemany(
+                    "INSERT INTO slides (pptx_path, slide_index, part_name, slide_hash) VALUES (?, ?, ?, ?)",
+                    [(ppt, slide['slide'], slide['part'], slide['hash']) for slide in result['slide_hashes']]
+                )
+                # 文件已改写，更新变更清单，下次增量索引不必重新处理
+                self.db.execute(
+                    """
+                    UPDATE deck_manifest SET file_size = ?, mtime_ns = ?, fingerprint = ?, indexed_at = ?
+                    WHERE pptx_path = ?
+                    """,
+                    (result['file_size'], result['mtime_ns'], result['fingerprint'], now, ppt)
+                )
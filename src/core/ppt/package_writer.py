@@ -0,0 +1,213 @@
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+import os
+import posixpath
+import shutil
+import struct
+import tempfile
+import zipfile
+import zlib
+from lxml import etree
+from .zip_media_reader import (
+    ZipMediaReader, LOCAL_HEADER_SIGNATURE, NS_CONTENT_TYPES, rels_path_for
+)
+
+CONTENT_TYPES_PART = '[Content_Types].xml'
+
+CENTRAL_HEADER_SIGNATURE = b'PK\x01\x02'
+END_RECORD_SIGNATURE = b'PK\x05\x06'
+
+ZIP_VERSION = 20
+FLAG_DATA_DESCRIPTOR = 0x8
+FLAG_UTF8 = 0x800
+# 不支持zip64，超出限制的PPT（单个成员或整体超过4GB）直接报错
+ZIP32_LIMIT = 0xFFFFFFFF
+ZIP32_MAX_ENTRIES = 0xFFFF
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+# 新增成员时已压缩的媒体格式直接存储，其余（XML等）使用deflate
+STORED_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.mp4', '.m4a', '.mp3')
+
+
+def _dos_datetime(date_time) -> tuple:
+    """ZipInfo.date_time转换为zip头中的(时间, 日期)"""
+    year, month, day, hour, minute, second = date_time
+    return (hour << 11 | minute << 5 | second // 2,
+            max(year - 1980, 0) << 9 | month << 5 | day)
+
+
+class PackageWriter:
+    """精简的zip写入器 - 未改动的成员直接复制压缩后的原始字节，不解压也不重新压缩
+
+    zipfile只能写入未压缩的数据，重写PPT时每个成员都要解压再压缩一遍；
+    而清理版式、替换图片等操作只改动少数XML部件，其余成员（尤其是媒体）原样复制即可。
+    """
+
+    def __init__(self, fileobj):
+        self.fp = fileobj
+        self._central = []
+
+    def _write_entry(self, name: str, flags: int, method: int, date_time, crc: int,
+                     compress_size: int, file_size: int, external_attr: int = 0):
+        """写入本地文件头并记录中央目录项，数据由调用方紧随其后写入"""
+        offset = self.fp.tell()
+        if max(offset, compress_size, file_size) > ZIP32_LIMIT or len(self._central) >= ZIP32_MAX_ENTRIES:
+            raise ValueError(f"PPT超出zip32格式限制，无法重写: {name}")
+
+        encoded = name.encode('utf-8')
+        # 大小和CRC已写在文件头中，不再需要数据描述符
+        flags = flags & ~FLAG_DATA_DESCRIPTOR
+        if not name.isascii():
+            flags |= FLAG_UTF8
+        dos_time, dos_date = _dos_datetime(date_time)
+        fields = (ZIP_VERSION, flags, method, dos_time, dos_date, crc, compress_size, file_size)
+
+        self.fp.write(LOCAL_HEADER_SIGNATURE)
+        self.fp.write(struct.pack('<HHHHHLLLHH', *fields, len(encoded), 0))
+        self.fp.write(encoded)
+        self._central.append((fields, encoded, external_attr, offset))
+
+    def add_raw(self, info: zipfile.ZipInfo, src_file, data_offset: int):
+        """原样复制成员的压缩数据
+
+        Args:
+            info: 源成员的ZipInfo
+            src_file: 源PPT的原始文件句柄
+            data_offset: 压缩数据在源文件中的起始偏移
+        """
+        self._write_entry(info.filename, info.flag_bits, info.compress_type, info.date_time,
+                          info.CRC, info.compress_size, info.file_size, info.external_attr)
+        src_file.seek(data_offset)
+        remaining = info.compress_size
+        while remaining:
+            chunk = src_file.read(min(COPY_CHUNK_SIZE, remaining))
+            if not chunk:
+                raise zipfile.BadZipFile(f"成员数据不完整: {info.filename}")
+            self.fp.write(chunk)
+            remaining -= len(chunk)
+
+    def add_bytes(self, name: str, data: bytes, compress_type: int = zipfile.ZIP_DEFLATED,
+                  date_time=None):
+        """写入新的成员内容"""
+        if compress_type == zipfile.ZIP_DEFLATED:
+            compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+            payload = compressor.compress(data) + compressor.flush()
+        else:
+            compress_type = zipfile.ZIP_STORED
+            payload = data
+        self._write_entry(name, 0, compress_type, date_time or (1980, 1, 1, 0, 0, 0),
+                          zlib.crc32(data), len(payload), len(data))
+        self.fp.write(payload)
+
+    def close(self):
+        """写入中央目录和结束记录"""
+        start = self.fp.tell()
+        for fields, encoded, external_attr, offset in self._central:
+            self.fp.write(CENTRAL_HEADER_SIGNATURE)
+            self.fp.write(struct.pack('<HHHHHHLLLHHHHHLL', ZIP_VERSION, *fields,
+                                      len(encoded), 0, 0, 0, 0, external_attr, offset))
+            self.fp.write(encoded)
+        size = self.fp.tell() - start
+        if start > ZIP32_LIMIT:
+            raise ValueError("PPT超出zip32格式限制，无法重写")
+        self.fp.write(END_RECORD_SIGNATURE)
+        self.fp.write(struct.pack('<HHHHLLH', 0, 0, len(self._central), len(self._central),
+                                  size, start, 0))
+
+
+def _drop_content_type_overrides(data: bytes, parts: Iterable[str]) -> bytes:
+    """从[Content_Types].xml中移除已删除部件的Override"""
+    part_names = {'/' + part for part in parts}
+    root = etree.fromstring(data)
+    dropped = False
+    for override in root.findall(f"{{{NS_CONTENT_TYPES}}}Override"):
+        if override.get('PartName') in part_names:
+            root.remove(override)
+            dropped = True
+    if not dropped:
+        return data
+    return etree.tostring(root, xml_declaration=True, encoding='UTF-8', standalone=True)
+
+
+def _set_content_type_overrides(data: bytes, content_types: Dict[str, str]) -> bytes:
+    """在[Content_Types].xml中为部件设置Override（已有的更新内容类型，没有的追加）"""
+    root = etree.fromstring(data)
+    pending = {'/' + part: content_type for part, content_type in content_types.items()}
+    for override in root.findall(f"{{{NS_CONTENT_TYPES}}}Override"):
+        content_type = pending.pop(override.get('PartName'), None)
+        if content_type is not None:
+            override.set('ContentType', content_type)
+    for part_name, content_type in pending.items():
+        etree.SubElement(root, f"{{{NS_CONTENT_TYPES}}}Override",
+                         PartName=part_name, ContentType=content_type)
+    return etree.tostring(root, xml_declaration=True, encoding='UTF-8', standalone=True)
+
+
+def rewrite_package(pptx_path, replacements: Optional[Dict[str, bytes]] = None,
+                    removed: Iterable[str] = (), output_path=None,
+                    content_types: Optional[Dict[str, str]] = None) -> int:
+    """重写PPTX压缩包：替换或新增部件、删除部件，其余成员原样复制
+
+    删除部件时一并删除其.rels，并从[Content_Types].xml中移除对应的Override。
+    未指定输出路径时先写入同目录下的临时文件，完成后原子替换原文件。
+
+    Args:
+        pptx_path: 源PPTX路径
+        replacements: {成员名: 新内容}，不存在的成员追加到末尾
+        removed: 要删除的部件
+        output_path: 输出路径，默认覆盖源文件
+        content_types: {部件: 内容类型}，在[Content_Types].xml中为这些部件设置Override
+                       （如替换后的图片格式与扩展名的默认类型不一致）
+
+    Returns:
+        int: 输出文件的字节数
+    """
+    pptx_path = Path(pptx_path)
+    replacements = dict(replacements or {})
+    removed = set(removed)
+    removed |= {rels_path_for(part) for part in removed}
+
+    target = Path(output_path) if output_path else pptx_path
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=str(target.parent), suffix='.tmp')
+    try:
+        with ZipMediaReader(str(pptx_path)) as reader, \
+                open(str(pptx_path), 'rb') as src_file, os.fdopen(fd, 'wb') as out:
+            if removed or content_types:
+                types_xml = replacements.get(CONTENT_TYPES_PART) or reader.read(CONTENT_TYPES_PART)
+                if removed:
+                    types_xml = _drop_content_type_overrides(types_xml, removed)
+                if content_types:
+                    types_xml = _set_content_type_overrides(types_xml, content_types)
+                replacements[CONTENT_TYPES_PART] = types_xml
+
+            writer = PackageWriter(out)
+            for info in reader.zip_file.infolist():
+                name = info.filename
+                if name in removed:
+                    continue
+                if name in replacements:
+                    writer.add_bytes(name, replacements.pop(name), info.compress_type, info.date_time)
+                    continue
+                data_range = reader.get_raw_range(name)
+                if data_range is None:
+                    # 无法定位原始数据（如本地文件头异常）时退回解压后重新写入
+                    writer.add_bytes(name, reader.read(name), info.compress_type, info.date_time)
+                else:
+                    writer.add_raw(info, src_file, data_range[0])
+
+            for name, data in replacements.items():
+                ext = posixpath.splitext(name)[1].lower()
+                writer.add_bytes(name, data, zipfile.ZIP_STORED if ext in STORED_EXTENSIONS
+                                 else zipfile.ZIP_DEFLATED)
+            writer.close()
+
+        if target.exists():
+            shutil.copymode(str(target), tmp_path)
+        os.replace(tmp_path, str(target))
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return target.stat().st_size
@@ -1,11 +1,290 @@
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterator, Optional
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
 from PIL import Image
 import hashlib
-from datetime import datetime
+import io
 import logging
 from tqdm import tqdm
 from ...utils.config.settings import Settings
+from ..images.image_store import ImageStore, DEFAULT_CHUNK_SIZE
+from ..images.image_probe import describe_image, probe_image
+from ..images.deck_media_cache import get_deck_media_cache, make_virtual_path
+from .zip_media_reader import ZipMediaReader
+from .source_readers import open_source_reader, iter_source_files
+from .media_index import MediaCrcIndex, KnownMedia
+from .text_extractor import extract_deck_text
+from .slide_fingerprint import hash_deck_slides
+from .deck_manifest import DeckManifest
+from .index_journal import IndexJournal
+from .deck_scheduler import plan_longest_first, ByteProgress, format_eta
+
+# 默认在内存中整体处理的媒体大小上限，更大的媒体分块流式处理
+DEFAULT_MEMORY_LIMIT = 64 * 1024 * 1024
+# 流式处理时保留用于解析文件头的开头数据大小
+PROBE_HEAD_SIZE = 256 * 1024
+
+
+def _stream_member(reader: ZipMediaReader, member: str, ext: str,
+                   store: Optional[ImageStore], chunk_size: int) -> Dict:
+    """分块流式处理大媒体成员：边解压边哈希，图库存在时边写入磁盘
+    
+    只保留开头一小段用于解析文件头，内存占用与媒体大小无关。
+    """
+    with reader.open(member) as src:
+        head = src.read(PROBE_HEAD_SIZE)
+        if store is not None:
+            img_hash, img_path, _ = store.put_stream(src, ext, prefix=head, chunk_size=chunk_size)
+            info = {'hash': img_hash, 'path': str(img_path)}
+        else:
+            md5 = hashlib.md5(head)
+            for chunk in iter(lambda: src.read(chunk_size), b''):
+                md5.update(chunk)
+            info = {'hash': md5.hexdigest()}
+    
+    info['file_size'] = reader.get_info(member).file_size
+    probed = probe_image(head)
+    if probed:
+        info['format'], info['width'], info['height'] = probed
+    elif store is None:
+        # 不落盘时无法再用PIL读取，尺寸记为未知
+        info['width'] = info['height'] = 0
+    return info
+
+
+def _put_stored_member(reader: ZipMediaReader, member: str, view: memoryview,
+                       ext: str, store: ImageStore) -> Dict:
+    """零拷贝处理未压缩成员：在mmap视图上计算哈希，由内核直接复制文件区间到图库"""
+    offset, size = reader.get_stored_range(member)
+    img_hash, img_path, _ = store.put_view(view, ext, src_fd=reader.raw_fileno(), src_offset=offset)
+    info = {'hash': img_hash, 'path': str(img_path), 'file_size': size}
+    # 只有文件头部分会被复制出来用于解析
+    probed = probe_image(bytes(view[:PROBE_HEAD_SIZE]))
+    if probed:
+        info['format'], info['width'], info['height'] = probed
+    return info
+
+
+def iter_deck_media(ppt_path: Path, store: Optional[ImageStore] = None,
+                    memory_limit: int = DEFAULT_MEMORY_LIMIT,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    known_media: Optional[KnownMedia] = None,
+                    include_data: bool = True) -> Iterator[Dict]:
+    """逐个产出PPTX中幻灯片引用的媒体记录
+    
+    每个媒体成员只解压一次。写入图库时，未压缩（STORED）的成员直接从内存映射的PPTX
+    文件哈希并复制到图库，不经过Python字节对象；其余成员中不超过memory_limit的在内存中
+    完成哈希和文件头解析，更大的（如内嵌的超大TIFF）按chunk_size分块流式处理。
+    
+    提供known_media时，中央目录中的(CRC32, 大小)命中已入库图片的成员直接复用已有记录，
+    既不解压也不计算MD5。
+    
+    Args:
+        ppt_path: PPT文件路径
+        store: 内容寻址图库，提供时图片写入图库并在记录中给出path；
+               为None时不写磁盘，include_data为True时记录中携带图片字节data
+               （流式处理的大成员除外，可根据member自行读取）
+        memory_limit: 在内存中整体处理的成员大小上限（字节）
+        chunk_size: 流式处理时每次读取的字节数
+        known_media: MediaCrcIndex.load()的结果，不需要图片字节时使用
+        include_data: 不写图库时是否在记录中携带图片字节
+        
+    Yields:
+        Dict: 每个引用一条记录，包含slide（版式和母版为0）、part、shape（形状ID）、member、
+              format、hash、file_size、crc32，能从文件头解析尺寸时还包含width、height
+    """
+    described = {}
+    streamed = set()
+    
+    with open_source_reader(ppt_path) as reader:
+        for media in reader.iter_media():
+            member = media['member']
+            img_data = None
+            if member not in described:
+                zip_info = reader.get_info(member)
+                known = None
+                if known_media and (store is not None or not include_data):
+                    known = known_media.get((zip_info.CRC, zip_info.file_size))
+                    if known is not None and not get_deck_media_cache().exists(known['path']):
+                        known = None
+                view = reader.stored_view(member) if store is not None and known is None else None
+                if known is not None:
+                    # 已入库的媒体，跳过解压和哈希
+                    described[member] = dict(known)
+                elif view is not None:
+                    with view:
+                        described[member] = _put_stored_member(reader, member, view, media['ext'], store)
+                elif zip_info.file_size > memory_limit:
+                    described[member] = _stream_member(reader, member, media['ext'], store, chunk_size)
+                    streamed.add(member)
+                else:
+                    img_data = reader.read(member)
+                    # 哈希和文件头解析在同一份内存数据上完成
+                    info = describe_image(img_data)
+                    if store is not None:
+                        _, img_path, _ = store.put(img_data, media['ext'], img_hash=info['hash'])
+                        info['path'] = str(img_path)
+                    if not info['format']:
+                        # 无法从文件头识别，交由_analyze_image用PIL补充
+                        del info['format'], info['width'], info['height']
+                    described[member] = info
+                described[member]['crc32'] = zip_info.CRC
+            
+            record = {
+                'slide': media['slide'],
+                'part': media['part'],
+                'shape': media['shape'],
+                'member': member,
+                'format': media['ext'][1:].upper(),
+                **described[member]
+            }
+            if store is None and include_data and member not in streamed:
+                record['data'] = img_data if img_data is not None else reader.read(member)
+            yield record
+
+
+def _extract_deck_media(ppt_path: Path, output_folder: Optional[str],
+                        memory_limit: int = DEFAULT_MEMORY_LIMIT,
+                        chunk_size: int = DEFAULT_CHUNK_SIZE,
+                        known_media: Optional[KnownMedia] = None) -> List[Dict]:
+    """直接从PPTX压缩包中提取幻灯片引用的媒体文件到内容寻址图库
+    
+    Args:
+        ppt_path: PPT文件路径
+        output_folder: 图片输出文件夹（图库根目录），为None时使用虚拟图库：
+                       只计算哈希，path为指向PPT内成员的虚拟路径，不复制图片
+        memory_limit: 在内存中整体处理的成员大小上限（字节），更大的成员流式写入
+        chunk_size: 流式写入时每次读取的字节数
+        known_media: 已入库媒体的CRC索引，命中的成员跳过解压和哈希
+        
+    Returns:
+        List[Dict]: 与PPTProcessor.extract_all_images相同结构的图片信息列表，
+                    每个引用一条记录，同一图片的多次引用指向同一文件
+    """
+    if output_folder is None:
+        images = []
+        for record in iter_deck_media(ppt_path, None, memory_limit, chunk_size,
+                                      known_media, include_data=False):
+            # 命中CRC索引的媒体沿用已入库的路径
+            record.setdefault('path', make_virtual_path(ppt_path, record['member']))
+            images.append(record)
+        return images
+    return list(iter_deck_media(ppt_path, ImageStore(output_folder), memory_limit, chunk_size, known_media))
+
+
+def _analyze_image(img_info: Dict, cache: Optional[Dict] = None) -> Dict:
+    """补充图片的哈希、尺寸和格式
+    
+    优先从文件头解析尺寸，文件只读取一次；文件头无法识别时才用PIL打开。
+    
+    Args:
+        img_info: 包含path（或data）、slide、shape的图片信息字典，已有hash和尺寸时直接返回
+        cache: 按哈希缓存的尺寸信息，同一图片在PPT中多次引用时只解析一次
+        
+    Returns:
+        Dict: 补充了hash、width、height、format的图片信息
+    """
+    if all(key in img_info for key in ('hash', 'width', 'height')):
+        return img_info
+    
+    img_hash = img_info.get('hash')
+    if cache is not None and img_hash in cache:
+        return {**img_info, **cache[img_hash]}
+    
+    if 'data' not in img_info and 'hash' in img_info:
+        # 已哈希（可能是流式写入的大文件或虚拟图库中的图片），PIL只读取文件头获取尺寸
+        with get_deck_media_cache().open_image(img_info['path']) as img:
+            info = {'width': img.size[0], 'height': img.size[1], 'format': img.format}
+        if cache is not None:
+            cache[img_hash] = info
+        return {**img_info, **info}
+    
+    if 'data' in img_info:
+        img_data = img_info['data']
+    else:
+        with open(img_info['path'], 'rb') as f:
+            img_data = f.read()
+    info = describe_image(img_data)
+    if not info['format']:
+        # 文件头无法识别的格式回退到PIL
+        with Image.open(io.BytesIO(img_data)) as img:
+            info['width'], info['height'] = img.size
+            info['format'] = img.format
+    
+    if cache is not None:
+        cache[info['hash']] = info
+    return {**img_info, **info}
+
+
+# 工作进程中的已知媒体索引，由进程池初始化函数设置一次，避免随每个任务传输
+_worker_known_media: Optional[KnownMedia] = None
+
+
+def _init_extract_worker(known_media: Optional[KnownMedia]):
+    """进程池初始化函数"""
+    global _worker_known_media
+    _worker_known_media = known_media
+
+
+def _extract_deck_slides(ppt_path) -> Optional[List[Dict]]:
+    """提取PPT每页文字用于全文索引，失败时返回None（保留已有的文字索引，不影响图片入库）
+    
+    只有PPTX有逐页文字，其他来源返回None。
+    """
+    if Path(ppt_path).suffix.lower() != '.pptx':
+        return None
+    try:
+        return extract_deck_text(ppt_path)
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"提取 {ppt_path} 的文字失败: {str(e)}")
+        return None
+
+
+def _hash_deck_slides(ppt_path, images: List[Dict]) -> Optional[List[Dict]]:
+    """计算PPT每页的规范化哈希，失败时返回None（保留已有的幻灯片哈希）
+    
+    幻灯片中的图片引用替换为本次提取得到的图片哈希，只有PPTX有幻灯片，其他来源返回None。
+    
+    Args:
+        ppt_path: PPT文件路径
+        images: 本次提取的图片记录（包含member和hash）
+    """
+    if Path(ppt_path).suffix.lower() != '.pptx':
+        return None
+    media_hashes = {img['member']: img['hash'] for img in images if 'member' in img and 'hash' in img}
+    try:
+        return hash_deck_slides(ppt_path, media_hashes)
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"计算 {ppt_path} 的幻灯片哈希失败: {str(e)}")
+        return None
+
+
+def _extract_deck_worker(ppt_path: str, output_folder: Optional[str], memory_limit: int,
+                         chunk_size: int) -> Dict:
+    """进程池工作函数 - 提取并哈希单个PPT中的图片和每页文字，不访问数据库
+    
+    单个媒体在内存中的缓冲不超过memory_limit字节，更大的媒体分块流式写入磁盘。
+    
+    Returns:
+        Dict: {'ppt': PPT路径, 'images': [已分析的图片信息], 'failed': [失败信息],
+               'slides': [每页文字]或None, 'slide_hashes': [每页规范化哈希]或None}
+    """
+    images, failed, cache = [], [], {}
+    extracted = _extract_deck_media(Path(ppt_path), output_folder, memory_limit, chunk_size,
+                                    _worker_known_media)
+    for img_info in extracted:
+        try:
+            images.append(_analyze_image(img_info, cache))
+        except Exception as e:
+            failed.append({
+                'path': img_info['path'],
+                'error': str(e),
+                'ppt': ppt_path
+            })
+    return {'ppt': ppt_path, 'images': images, 'failed': failed,
+            'slides': _extract_deck_slides(ppt_path),
+            'slide_hashes': _hash_deck_slides(ppt_path, extracted)}
+
 
 class PPTExtractor:
     """PPT提取器 - 负责从PPT中提取图片到图库"""
@@ -13,16 +292,33 @@ class PPTExtractor:
     def __init__(self, db_manager):
         self.db = db_manager
         self.logger = logging.getLogger(__name__)
+        self.manifest = DeckManifest(db_manager)
+        self.journal = IndexJournal(db_manager)
+        self.media_index = MediaCrcIndex(db_manager)
+        extract_config = Settings().EXTRACT_CONFIG
+        self.memory_limit = extract_config['memory_limit_mb'] * 1024 * 1024
+        self.chunk_size = extract_config['chunk_size']
         self.total_processed_ppts = 0
+        self.total_skipped_ppts = 0
         
-    def extract_images_from_folder(self, folder_path: str, output_folder: str, 
-                                 progress_callback=None) -> Dict[str, List[Dict]]:
+    def extract_images_from_folder(self, folder_path: str, output_folder: Optional[str], 
+                                 progress_callback=None,
+                                 workers: int = 1, incremental: bool = True,
+                                 resume: bool = True, virtual: bool = False) -> Dict[str, List[Dict]]:
         """从PPT文件夹中提取图片到图库
         
         Args:
             folder_path: PPT文件夹路径
-            output_folder: 图片输出文件夹
+            output_folder: 图片输出文件夹（虚拟图库模式下忽略）
             progress_callback: 进度回调函数
+            workers: 工作进程数，大于1时使用进程池并行提取和哈希，
+                     由当前进程统一写入数据库
+            incremental: 是否增量索引，根据deck_manifest跳过未变化的PPT，
+                         重新处理已修改的PPT，并清除已删除PPT的映射
+            resume: 该文件夹存在未完成的索引任务时（如程序中途退出），
+                    只继续处理任务中尚未完成或处理失败的PPT
+            virtual: 虚拟图库模式，不复制图片，图片表中只记录指向PPT内成员的
+                     虚拟路径（pptx://<PPT路径>!/<成员>），查看时按需从PPT中读取
             
         Returns:
             Dict[str, List[Dict]]: 包含成功和失败信息的字典
@@ -36,172 +332,253 @@ class PPTExtractor:
             folder_path = Path(folder_path)
             if not folder_path.exists():
                 raise FileNotFoundError(f"文件夹不存在: {folder_path}")
+            if virtual:
+                output_folder = None
             
-            # 获取所有PPT文件
-            ppt_files = []
-            for ext in ['.ppt', '.pptx']:
-                ppt_files.extend(folder_path.glob(f"**/*{ext}"))
+            # 有未完成的任务时从断点续跑，只处理任务中尚未完成的PPT（包括失败的PPT）
+            job_id = self.journal.find_resumable(folder_path) if resume else None
+            if job_id is not None:
+                self.journal.requeue_failed(job_id)
+                # 中断后已被删除的PPT不再处理
+                ppt_files = [ppt_path for ppt_path in self.journal.get_decks(job_id) if ppt_path.exists()]
+                self.logger.info(f"续跑索引任务 {job_id}，剩余 {len(ppt_files)} 个PPT")
+            else:
+                ppt_files = list(self._iter_ppt_files(folder_path))
+                if not ppt_files:
+                    self.logger.warning(f"未在 {folder_path} 找到PPT文件")
+                    return results
+            
+            # 增量索引：只处理新增或修改过的PPT
+            manifest_entries = {}
+            if incremental:
+                changed, unchanged, deleted = self.manifest.partition(folder_path, ppt_files)
+                if job_id is None:
+                    # 续跑时文件列表只是任务的一部分，不能据此判断删除
+                    self.manifest.purge_deleted(deleted)
+                if unchanged:
+                    self.logger.info(f"跳过 {len(unchanged)} 个未变化的PPT")
+                    self.total_skipped_ppts += len(unchanged)
+                manifest_entries = dict(changed)
+                ppt_files = [ppt_path for ppt_path, _ in changed]
             
             if not ppt_files:
-                self.logger.warning(f"未在 {folder_path} 找到PPT文件")
+                self.logger.info(f"{folder_path} 中没有需要重新索引的PPT")
+                if job_id is not None:
+                    self.journal.complete_job(job_id)
                 return results
             
-            # 创建PPTProcessor实例
-            from .ppt_processor import PPTProcessor
-            ppt_processor = PPTProcessor()
+            if job_id is None:
+                job_id = self.journal.create_job(folder_path, output_folder, ppt_files)
+            run = {
+                'job_id': job_id,
+                'manifest_entries': manifest_entries,
+                # (CRC32, 大小)已知的媒体直接复用已入库的记录
+                'known_media': self.media_index.load()
+            }
             
-            # 使用tqdm创建进度条
-            for ppt_path in tqdm(ppt_files, desc="处理PPT文件"):
-                try:
-                    # 更新进度
-                    if progress_callback:
-                        current_idx = ppt_files.index(ppt_path) + 1
-                        progress_callback(current_idx, len(ppt_files), f"正在处理: {ppt_path.name}")
-                    
-                    # 打开PPT文件
-                    ppt_processor.open_presentation(str(ppt_path))
-                    
-                    # 提取图片
-                    images = ppt_processor.extract_all_images(output_folder)
-                    if not images:
-                        continue
-                        
-                    # 处理每个提取的图片
-                    for img_info in images:
-                        try:
-                            processed_info = self._process_single_image(img_info, ppt_path)
-                            if processed_info:
-                                results['success'].append(processed_info)
-                        except Exception as img_e:
-                            self.logger.error(f"处理图片 {img_info['path']} 时出错: {str(img_e)}")
-                            results['failed'].append({
-                                'path': img_info['path'],
-                                'error': str(img_e),
-                                'ppt': str(ppt_path)
-                            })
-                    
-                    self.total_processed_ppts += 1
-                    
-                except Exception as e:
-                    self.logger.error(f"处理文件 {ppt_path} 时出错: {str(e)}")
-                    results['failed'].append({
-                        'path': str(ppt_path),
-                        'error': str(e)
-                    })
+            if workers > 1:
+                self._extract_parallel(ppt_files, output_folder, results,
+                                       progress_callback, workers, run)
+            else:
+                self._extract_sequential(ppt_files, output_folder, results,
+                                         progress_callback, run)
             
+            self.journal.complete_job(job_id)
             return results
             
         except Exception as e:
             self.logger.error(f"处理文件夹 {folder_path} 时出错: {str(e)}")
             return results
     
-    def _process_single_image(self, img_info: Dict, ppt_path: Path) -> Optional[Dict]:
-        """处理单个图片
+    def _extract_sequential(self, ppt_files: List[Path], output_folder: str,
+                            results: Dict[str, List[Dict]], progress_callback,
+                            run: Dict):
+        """在当前进程中逐个处理PPT"""
+        # 使用tqdm创建进度条
+        for current_idx, ppt_path in enumerate(tqdm(ppt_files, desc="处理PPT文件"), 1):
+            try:
+                # 更新进度
+                if progress_callback:
+                    progress_callback(current_idx, len(ppt_files), f"正在处理: {ppt_path.name}")
+                
+                # 提取图片
+                images = _extract_deck_media(ppt_path, output_folder, self.memory_limit,
+                                            self.chunk_size, run['known_media'])
+                
+                # 分析每个提取的图片
+                analyzed, cache = [], {}
+                for img_info in images:
+                    try:
+                        analyzed.append(_analyze_image(img_info, cache))
+                    except Exception as img_e:
+                        self.logger.error(f"处理图片 {img_info['path']} 时出错: {str(img_e)}")
+                        results['failed'].append({
+                            'path': img_info['path'],
+                            'error': str(img_e),
+                            'ppt': str(ppt_path)
+                        })
+                
+                # 整个PPT的图片、文字和幻灯片哈希在一个事务中写入数据库
+                results['success'].extend(
+                    self._store_deck_images(analyzed, ppt_path, run, _extract_deck_slides(ppt_path),
+                                            _hash_deck_slides(ppt_path, images))
+                )
+                self._finish_deck(ppt_path, run)
+                
+            except Exception as e:
+                self._fail_deck(ppt_path, e, results, run)
+    
+    def iter_images(self, folder_path: str, output_folder: Optional[str] = None) -> Iterator[Dict]:
+        """流式遍历文件夹中所有PPT的图片，每提取一张立即产出一条记录
+        
+        不写数据库，也不预先收集文件列表，适合缩略图、入库、打标签等下游环节
+        边提取边消费，内存占用与文件夹大小无关。
         
         Args:
-            img_info: 图片信息字典
-            ppt_path: PPT文件路径
+            folder_path: PPT文件夹路径
+            output_folder: 图库文件夹，提供时图片写入图库并在记录中给出path，
+                           否则不写磁盘，记录中携带图片字节data
             
-        Returns:
-            Optional[Dict]: 处理成功返回图片信息，失败返回None
+        Yields:
+            Dict: {
+                'ppt': PPT路径, 'slide': 幻灯片序号, 'shape': 形状ID（cNvPr id，背景为'background'）,
+                'member': zip内媒体路径, 'hash': MD5, 'file_size': 字节数,
+                'format': 格式, 'width': 宽, 'height': 高,
+                'path': 图库中的路径 或 'data': 图片字节
+            }
         """
-        try:
-            # 获取图片信息
-            img_path = img_info['path']
-            slide_idx = img_info['slide']
-            shape_idx = img_info['shape']
-            
-            # 打开图片获取详细信息
-            with Image.open(img_path) as img:
-                width, height = img.size
-                img_format = img.format
-                
-            # 计算图片哈希
-            with open(img_path, 'rb') as f:
-                img_hash = hashlib.md5(f.read()).hexdigest()
+        folder_path = Path(folder_path)
+        if not folder_path.exists():
+            raise FileNotFoundError(f"文件夹不存在: {folder_path}")
+        
+        store = ImageStore(output_folder) if output_folder else None
+        for ppt_path in self._iter_ppt_files(folder_path):
+            cache = {}
+            try:
+                for record in iter_deck_media(ppt_path, store, self.memory_limit, self.chunk_size):
+                    try:
+                        record = _analyze_image(record, cache)
+                    except Exception as e:
+                        self.logger.error(f"处理图片 {record['member']} 时出错: {str(e)}")
+                        continue
+                    record['ppt'] = str(ppt_path)
+                    yield record
+            except Exception as e:
+                self.logger.error(f"处理文件 {ppt_path} 时出错: {str(e)}")
+    
+    def _iter_ppt_files(self, folder_path: Path) -> Iterator[Path]:
+        """遍历文件夹中所有已注册读取器的来源文件（PPTX、DOCX、Keynote、PDF）"""
+        return iter_source_files(folder_path)
+    
+    def _extract_parallel(self, ppt_files: List[Path], output_folder: str,
+                          results: Dict[str, List[Dict]], progress_callback,
+                          workers: int, run: Dict):
+        """使用进程池并行提取PPT图片
+        
+        工作进程只负责提取和哈希，当前进程作为唯一写入者将结果写入数据库，
+        避免多个进程同时写SQLite。
+        
+        PPT按估算成本（文件大小和zip成员数）从高到低提交，所有工作进程共享
+        同一个任务队列，空闲的进程立即领取下一个任务，大文件不会堆积在末尾。
+        提交窗口限制为工作进程数的两倍，进度和剩余时间按已处理字节数计算。
+        """
+        plan = plan_longest_first(ppt_files)
+        total = len(plan)
+        progress = ByteProgress(sum(task['size'] for task in plan))
+        tasks = iter(plan)
+        pending = {}
+        
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_extract_worker,
+                                 initargs=(run['known_media'],)) as executor, \
+                tqdm(total=progress.total_bytes, unit='B', unit_scale=True, desc="处理PPT文件") as bar:
             
-            # 添加到数据库
-            self._add_image_to_db(
-                img_hash, img_path, img_format, width, height,
-                ppt_path, slide_idx, shape_idx
-            )
+            def submit_next():
+                task = next(tasks, None)
+                if task is not None:
+                    future = executor.submit(
+                        _extract_deck_worker, str(task['path']), output_folder,
+                        self.memory_limit, self.chunk_size
+                    )
+                    pending[future] = task
             
-            # 返回完整信息
-            return {
-                **img_info,
-                'hash': img_hash,
-                'width': width,
-                'height': height,
-                'format': img_format,
-                'source_ppt': str(ppt_path)
-            }
+            for _ in range(workers * 2):
+                submit_next()
             
-        except Exception as e:
-            self.logger.error(f"处理图片失败: {str(e)}")
-            return None
+            current_idx = 0
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = pending.pop(future)
+                    submit_next()
+                    
+                    ppt_path = task['path']
+                    current_idx += 1
+                    progress.advance(task['size'])
+                    bar.update(task['size'])
+                    if progress_callback:
+                        progress_callback(
+                            current_idx, total,
+                            f"已完成: {ppt_path.name}，预计剩余 {format_eta(progress.eta())}"
+                        )
+                    
+                    try:
+                        deck_result = future.result()
+                        results['failed'].extend(deck_result['failed'])
+                        results['success'].extend(
+                            self._store_deck_images(deck_result['images'], ppt_path, run,
+                                                    deck_result['slides'], deck_result['slide_hashes'])
+                        )
+                    except Exception as e:
+                        self._fail_deck(ppt_path, e, results, run)
+                        continue
+                    
+                    self._finish_deck(ppt_path, run)
+    
+    def _finish_deck(self, ppt_path: Path, run: Dict):
+        """PPT处理完成后更新计数并记录到变更清单"""
+        self.total_processed_ppts += 1
+        entry = run['manifest_entries'].get(ppt_path)
+        if entry:
+            self.manifest.record(ppt_path, entry)
     
-    def _add_image_to_db(self, img_hash: str, img_path: str, img_format: str,
-                        width: int, height: int, ppt_path: Path, 
-                        slide_idx: int, shape_idx: str):
-        """将图片信息添加到数据库"""
+    def _fail_deck(self, ppt_path: Path, error: Exception, results: Dict[str, List[Dict]], run: Dict):
+        """记录PPT处理失败"""
+        self.logger.error(f"处理文件 {ppt_path} 时出错: {str(error)}")
+        results['failed'].append({
+            'path': str(ppt_path),
+            'error': str(error)
+        })
         try:
-            # 开始事务
-            self.db.execute("BEGIN TRANSACTION")
-            
-            # 添加图片记录
-            self.db.execute(
-                f"""
-                INSERT OR IGNORE INTO {self.db.table_name}
-                (img_hash, img_path, img_name, extract_date, img_type, format, width, height)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    img_hash,
-                    str(img_path),
-                    Path(img_path).name,
-                    datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                    'normal',
-                    img_format,
-                    width,
-                    height
-                )
-            )
-            
-            # 添加PPT映射关系
-            self.db.execute(
-                """
-                INSERT OR IGNORE INTO image_ppt_mapping
-                (img_hash, pptx_path, slide_index, shape_index, extract_date)
-                VALUES (?, ?, ?, ?, ?)
-                """,
-                (
-                    img_hash,
-                    str(ppt_path),
-                    slide_idx,
-                    str(shape_idx),
-                    datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                )
-            )
-            
-            # 添加PPT源
-            self.db.execute(
-                """
-                INSERT OR REPLACE INTO ppt_sources 
-                (path, added_date) VALUES (?, ?)
-                """,
-                (
-                    str(ppt_path),
-                    datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                )
-            )
-            
-            # 提交事务
-            self.db.commit()
-            
+            self.journal.mark_failed(run['job_id'], ppt_path, str(error))
         except Exception as e:
-            self.logger.error(f"添加图片到数据库失败: {str(e)}")
-            self.db.rollback()
-            raise
+            self.logger.error(f"更新索引任务日志失败: {str(e)}")
+    
+    def _store_deck_images(self, images: List[Dict], ppt_path: Path, run: Dict,
+                           slides: Optional[List[Dict]] = None,
+                           slide_hashes: Optional[List[Dict]] = None) -> List[Dict]:
+        """将一个PPT中已分析的所有图片批量写入数据库，并在同一事务中标记任务进度
+        
+        Args:
+            images: 包含hash、width、height、format的图片信息列表
+            ppt_path: PPT文件路径
+            run: 本次运行的状态，包含job_id、manifest_entries和known_media
+            slides: 每页文字，提供时在同一事务中更新全文索引
+            slide_hashes: 每页规范化哈希，提供时在同一事务中更新幻灯片哈希
+            
+        Returns:
+            List[Dict]: 补充了来源PPT的完整图片信息列表
+        """
+        entry = run['manifest_entries'].get(ppt_path)
+        self.db.bulk_ingest(
+            str(ppt_path), images,
+            replace_mappings=bool(entry and entry.get('modified')),
+            job_id=run['job_id'],
+            slides=slides,
+            slide_hashes=slide_hashes
+        )
+        # 并行模式下工作进程持有启动时的索引副本，新入库的媒体只对顺序处理生效
+        self.media_index.remember(run['known_media'], images)
+        return [{**img_info, 'source_ppt': str(ppt_path)} for img_info in images]
     
     def get_ppt_sources(self) -> List[str]:
         """获取所有PPT源文件夹"""
@@ -3,24 +3,34 @@ from pptx.enum.shapes import MSO_SHAPE_TYPE
 from pptx.enum.text import MSO_AUTO_SIZE
 from pptx.util import Pt
 import os
-import win32com.client
 from pathlib import Path
 from PIL import Image
 import io
 import tempfile
 from ..images.image_processor import ImageProcessor
-from .ppt_extractor import PPTExtractor
+from ..images.image_store import ImageStore
+from .ppt_extractor import PPTExtractor, iter_deck_media
+from .zip_media_reader import ZipMediaReader
+from .text_extractor import extract_deck_text
+from .layout_cleaner import clean_deck_layouts
+from .text_autofit import adjust_deck_text_boxes
+from .deck_slimmer import slim_deck
+from .deck_catalog import DeckCatalog, read_deck_properties
+from .deck_manifest import DeckManifest
+from .media_replacer import MediaReplacer
 import logging
 
 class PPTProcessor:
     """PPT处理器 - 专注于PPT编辑和格式调整功能"""
     
     def __init__(self, db_manager=None):
-        self.current_ppt = None
+        self._current_ppt = None
         self.current_ppt_path = None
         self.db_manager = db_manager
         self.image_processor = ImageProcessor(db_manager) if db_manager else None
         self.ppt_extractor = PPTExtractor(db_manager) if db_manager else None
+        self.deck_catalog = DeckCatalog(db_manager) if db_manager else None
+        self.media_replacer = MediaReplacer(db_manager) if db_manager else None
         
     def get_image_processor(self):
         """获取图片处理器实例"""
@@ -29,168 +39,146 @@ class PPTProcessor:
         return self.image_processor
     
     def open_presentation(self, filepath: str):
-        """打开PPT文件"""
+        """打开PPT文件
+        
+        只读取zip中央目录和包根关系，确认是包含主演示文稿部件的PPTX，损坏的文件在此处立即报错；
+        python-pptx对象模型在首次访问current_ppt时才加载。python-pptx会把所有部件
+        （包括全部媒体）读入内存，而调整文本框、清理版式等走COM的操作完全不需要它。
+        """
+        if not os.path.isfile(filepath):
+            raise ValueError(f"打开PPT文件失败: 文件不存在 {filepath}")
         try:
-            self.current_ppt = Presentation(filepath)
-            self.current_ppt_path = filepath
+            with ZipMediaReader(filepath) as reader:
+                pres_part = reader.get_presentation_part()
+                if not reader.has_member(pres_part):
+                    raise ValueError(f"缺少主演示文稿部件 {pres_part}")
         except Exception as e:
             raise ValueError(f"打开PPT文件失败: {str(e)}")
+        self._current_ppt = None
+        self.current_ppt_path = filepath
+    
+    @property
+    def current_ppt(self):
+        """当前PPT的python-pptx对象（按需加载）"""
+        if self._current_ppt is None and self.current_ppt_path:
+            try:
+                self._current_ppt = Presentation(self.current_ppt_path)
+            except Exception as e:
+                raise ValueError(f"打开PPT文件失败: {str(e)}")
+        return self._current_ppt
     
-    def adjust_text_boxes(self):
-        """调整所有文本框：设置为自动调整大小且不自动换行"""
+    def adjust_text_boxes(self) -> int:
+        """调整所有文本框：设置为自动调整大小且不自动换行
+        
+        直接改写幻灯片XML中的文本框属性，不启动PowerPoint。
+        
+        Returns:
+            int: 调整的文本框数量
+        """
         if not self.current_ppt_path:
             raise ValueError("未打开PPT文件")
         
         try:
-            # 获取PowerPoint应用程序实例
-            powerpoint = win32com.client.Dispatch("PowerPoint.Application")
-            
-            # 打开演示文稿
-            abs_path = os.path.abspath(self.current_ppt_path)
-            presentation = powerpoint.Presentations.Open(abs_path)
-            
-            try:
-                # 遍历所有幻灯片
-                for slide in presentation.Slides:
-                    # 遍历幻灯片中的所有形状
-                    for shape in slide.Shapes:
-                        if shape.HasTextFrame:
-                            # 取消勾选"形状中的文字自动换行"
-                            shape.TextFrame.WordWrap = False
-                            
-                            # 先设置为不自动调整
-                            shape.TextFrame.AutoSize = 0  # ppAutoSizeNone
-                            
-                            # 最后设置为根据文字调整形状大小
-                            shape.TextFrame.AutoSize = 1  # ppAutoSizeShapeToFitText
-                
-                # 保存更改
-                presentation.Save()
-                
-            finally:
-                # 关闭演示文稿
-                presentation.Close()
-                
+            result = adjust_deck_text_boxes(self.current_ppt_path)
+            # 已加载的对象模型不再与文件一致
+            self._current_ppt = None
+            return len(result['shapes'])
         except Exception as e:
             raise Exception(f"调整文本框时出错: {str(e)}")
-        
-        finally:
-            try:
-                # 确保PowerPoint应用程序被正确关闭
-                powerpoint.Quit()
-            except:
-                pass
     
     def extract_text(self) -> str:
-        """提取PPT中的所有文字内容"""
-        if not self.current_ppt:
+        """提取PPT中的所有文字内容（包括表格、组合形状和备注）
+        
+        直接从压缩包流式解析各页XML，不加载python-pptx对象模型。
+        """
+        if not self.current_ppt_path:
             raise ValueError("未打开PPT文件")
             
         text_content = []
         
-        # 遍历所有幻灯片
-        for slide_index, slide in enumerate(self.current_ppt.slides, 1):
-            text_content.append(f"\n--- 第{slide_index}页 ---\n")
-            
-            # 遍历幻灯片中的所有形状
-            for shape in slide.shapes:
-                if hasattr(shape, "text") and shape.text.strip():
-                    # 获取形状的文本内容
-                    text = shape.text.strip()
-                    if text:
-                        text_content.append(text)
+        for slide in extract_deck_text(self.current_ppt_path):
+            text_content.append(f"\n--- 第{slide['slide']}页 ---\n")
+            if slide['text']:
+                text_content.append(slide['text'])
+            if slide['notes']:
+                text_content.append(f"[备注]\n{slide['notes']}")
         
         # 合并所有文本
         return "\n".join(text_content)
     
     def clean_unused_layouts(self) -> int:
-        """彻底清理PPT母版"""
+        """彻底清理PPT母版：删除未使用的母版、版式和未被继承的占位符
+        
+        直接修改压缩包中的XML，不启动PowerPoint，可在Linux上批量运行。
+        
+        Returns:
+            int: 删除的母版、版式和占位符总数
+        """
         if not self.current_ppt_path:
             raise ValueError("未打开PPT文件")
         
         try:
-            cleaned_count = 0
-            powerpoint = win32com.client.Dispatch("PowerPoint.Application")
-            abs_path = os.path.abspath(self.current_ppt_path)
-            presentation = powerpoint.Presentations.Open(abs_path)
-            
-            try:
-                # 收集所有使用中的设计和布局名称
-                used_designs = set()
-                used_layouts = set()
-                
-                for slide in presentation.Slides:
-                    if hasattr(slide, 'Design') and slide.Design:
-                        used_designs.add(slide.Design.Name)
-                    if hasattr(slide, 'CustomLayout') and slide.CustomLayout:
-                        used_layouts.add(slide.CustomLayout.Name)
-                
-                # 删除未使用的设计（母版）
-                for design in list(presentation.Designs):
-                    design_name = design.Name
-                    if design_name not in used_designs:
-                        try:
-                            design.Delete()
-                            cleaned_count += 1
-                            print(f"删除未使用的设计: {design_name}")
-                        except Exception as e:
-                            print(f"删除设计 {design_name} 时出错: {str(e)}")
-                
-                # 处理剩余的设计（母版）
-                for design in presentation.Designs:
-                    slide_master = design.SlideMaster
-                    
-                    # 删除未使用的布局
-                    for layout in list(slide_master.CustomLayouts):
-                        layout_name = layout.Name
-                        if layout_name not in used_layouts:
-                            try:
-                                layout.Delete()
-                                cleaned_count += 1
-                                print(f"删除未使用的布局: {layout_name}")
-                            except Exception as e:
-                                print(f"删除布局 {layout_name} 时出错: {str(e)}")
-                    
-                    # 删除母版中的所有占位符
-                    for shape in list(slide_master.Shapes):
-                        try:
-                            if shape.Type == 14:  # 14 表示占位符
-                                shape.Delete()
-                                cleaned_count += 1
-                                print("删除母版中的占位符")
-                        except Exception as e:
-                            print(f"删除母版占位符时出错: {str(e)}")
-                    
-                    # 删除所有布局中的占位符
-                    for layout in slide_master.CustomLayouts:
-                        for shape in list(layout.Shapes):
-                            try:
-                                if shape.Type == 14:  # 14 表示占位符
-                                    shape.Delete()
-                                    cleaned_count += 1
-                                    print(f"删除布局 {layout.Name} 中的占位符")
-                            except Exception as e:
-                                print(f"删除布局占位符时出错: {str(e)}")
-                
-                # 保存更改
-                presentation.Save()
-                print(f"清理完成，共删除 {cleaned_count} 个元素")
-                
-            finally:
-                # 关闭演示文稿
-                presentation.Close()
-                
+            result = clean_deck_layouts(self.current_ppt_path)
+            # 已加载的对象模型不再与文件一致
+            self._current_ppt = None
+            logging.info(
+                f"清理完成: 删除{result['masters']}个母版、{result['layouts']}个版式、"
+                f"{result['placeholders']}个占位符，"
+                f"文件减小{(result['size_before'] - result['size_after']) / 1024:.1f}KB"
+            )
+            return result['masters'] + result['layouts'] + result['placeholders']
         except Exception as e:
             raise Exception(f"清理模板时出错: {str(e)}")
+
+    def slim_presentation(self) -> dict:
+        """精简PPT：把远大于显示尺寸的图片按目标DPI重新采样
         
-        finally:
-            try:
-                # 确保PowerPoint应用程序被正确关闭
-                powerpoint.Quit()
-            except:
-                pass
+        Returns:
+            dict: 精简结果，包含重新采样的图片列表和精简前后的文件大小
+        """
+        if not self.current_ppt_path:
+            raise ValueError("未打开PPT文件")
+        
+        try:
+            result = slim_deck(self.current_ppt_path)
+            # 已加载的对象模型不再与文件一致
+            self._current_ppt = None
+            return result
+        except Exception as e:
+            raise Exception(f"精简PPT时出错: {str(e)}")
+    
+    def get_deck_properties(self, filepath: str) -> dict:
+        """读取PPT的文档属性和缩略图（只读取docProps，不打开演示文稿）
+        
+        Returns:
+            dict: 标题、作者、日期、页数和缩略图数据，缺失的项为None
+        """
+        return read_deck_properties(filepath)
+    
+    def catalog_folder(self, folder_path: str, workers: int = 1, progress_callback=None) -> dict:
+        """编目文件夹中的所有PPT，更新PPT目录表
         
-        return cleaned_count    
+        Returns:
+            dict: 编目结果，包含PPT总数、更新数、移除数和失败列表
+        """
+        if self.deck_catalog is None:
+            raise RuntimeError("数据库管理器未初始化")
+        return self.deck_catalog.update_folder(folder_path, workers, progress_callback)
+    
+    def replace_image_everywhere(self, img_hash: str, new_image_path: str, workers: int = 1,
+                                 progress_callback=None) -> dict:
+        """在所有使用该图片的PPTX中替换为新图片，并更新图片映射
+        
+        Returns:
+            dict: 替换结果，包含新图片哈希、替换的PPT数和成员数、跳过和失败的PPT
+        """
+        if self.media_replacer is None:
+            raise RuntimeError("数据库管理器未初始化")
+        if self.current_ppt_path and self.current_ppt_path in self.media_replacer.find_decks(img_hash):
+            # 已加载的对象模型不再与文件一致
+            self._current_ppt = None
+        return self.media_replacer.replace_everywhere(img_hash, new_image_path, workers, progress_callback)
+    
     def save(self, filepath: str = None):
         """保存PPT文件"""
         if not self.current_ppt:
@@ -203,119 +191,39 @@ class PPTProcessor:
         
         self.current_ppt.save(filepath)
     
-    def extract_all_images(self, output_folder: str) -> list:
-        """从PPT中提取所有图片（保持原始格式）"""
-        if not self.current_ppt:
+    def extract_all_images(self, output_folder: str, store: ImageStore = None) -> list:
+        """从PPT中提取所有图片（保持原始格式）
+        
+        按关系图一次遍历所有部件，覆盖组合形状、图片填充、表格、背景、版式、母版和备注中的图片；
+        每个部件只解析一次，不加载python-pptx对象模型。图片以内容寻址的文件名写入，
+        相同图片只写入一次。
+        
+        Args:
+            output_folder: 图片输出文件夹
+            store: 内容寻址图片存储，默认在输出文件夹中以<哈希><扩展名>命名
+            
+        Returns:
+            list: 每个图片引用一条记录，包含path、slide（版式和母版为0）、part、shape（形状ID）、
+                  format、hash、file_size，能从文件头解析尺寸时还包含width、height
+        """
+        if not self.current_ppt_path:
             raise ValueError("未打开PPT文件")
         
         try:
-            output_folder = Path(output_folder)
-            output_folder.mkdir(parents=True, exist_ok=True)
-            extracted_images = []
-            
-            # 遍历所有幻灯片
-            for slide_idx, slide in enumerate(self.current_ppt.slides, 1):
-                # 提取形状中的图片
-                for shape_idx, shape in enumerate(slide.shapes, 1):
-                    try:
-                        if hasattr(shape, 'image'):
-                            # 获取图片数据
-                            img_data = shape.image.blob
-                            content_type = shape.image.content_type
-                            
-                            # 确定文件扩展名
-                            ext = self._get_image_extension(content_type, img_data)
-                            
-                            # 生成图片文件名
-                            img_name = f"slide{slide_idx}_shape{shape_idx}{ext}"
-                            img_path = str(output_folder / img_name)
-                            
-                            # 保存原始图片数据
-                            with open(img_path, 'wb') as f:
-                                f.write(img_data)
-                            
-                            # 记录图片信息
-                            image_info = {
-                                'path': img_path,
-                                'slide': slide_idx,
-                                'shape': shape_idx,
-                                'format': ext[1:].upper()
-                            }
-                            
-                            extracted_images.append(image_info)
-                            
-                    except Exception as e:
-                        print(f"处理图片时出错: {str(e)}")
-                        continue
-                
-                # 提取背景图片
-                try:
-                    if hasattr(slide, 'background') and hasattr(slide.background, 'image'):
-                        img_data = slide.background.image.blob
-                        content_type = slide.background.image.content_type
-                        ext = self._get_image_extension(content_type, img_data)
-                        
-                        img_name = f"slide{slide_idx}_background{ext}"
-                        img_path = str(output_folder / img_name)
-                        
-                        with open(img_path, 'wb') as f:
-                            f.write(img_data)
-                        
-                        image_info = {
-                            'path': img_path,
-                            'slide': slide_idx,
-                            'shape': 'background',
-                            'format': ext[1:].upper()
-                        }
-                        
-                        extracted_images.append(image_info)
-                        
-                except Exception as e:
-                    print(f"处理背景图片时出错: {str(e)}")
-            
-            return extracted_images
+            if store is None:
+                store = ImageStore(output_folder, shard=False)
+            return list(iter_deck_media(Path(self.current_ppt_path), store))
             
         except Exception as e:
             print(f"提取图片时出错: {str(e)}")
             raise
     
-    def _get_image_extension(self, content_type: str, img_data: bytes) -> str:
-        """根据内容类型和文件头确定图片扩展名"""
-        ext_map = {
-            'image/png': '.png',
-            'image/jpeg': '.jpg',
-            'image/gif': '.gif',
-            'image/bmp': '.bmp',
-            'image/tiff': '.tiff',
-            'image/x-emf': '.emf',
-            'image/x-wmf': '.wmf',
-            'image/webp': '.webp',
-            'image/x-icon': '.ico',
-            'image/svg+xml': '.svg'
-        }
-        
-        if content_type in ext_map:
-            return ext_map[content_type]
-        
-        # 从文件头判断
-        if img_data.startswith(b'\x89PNG'):
-            return '.png'
-        elif img_data.startswith(b'\xFF\xD8'):
-            return '.jpg'
-        elif img_data.startswith(b'GIF8'):
-            return '.gif'
-        elif img_data.startswith(b'BM'):
-            return '.bmp'
-        elif img_data.startswith(b'II*\x00') or img_data.startswith(b'MM\x00*'):
-            return '.tiff'
-        elif img_data.startswith(b'%PDF'):
-            return '.pdf'
-        
-        return '.bin' 
-    
     def remove_ppt_source(self, path: str):
         """移除PPT源文件
         
+        在一个事务中清除该PPT的映射、文字索引、幻灯片哈希、目录、源记录和变更清单，
+        之后再次索引时会重新处理该PPT。
+        
         Args:
             path: PPT文件路径
         """
@@ -323,25 +231,10 @@ class PPTProcessor:
             if not self.db_manager:
                 raise RuntimeError("数据库管理器未初始化")
             
-            # 从数据库中移除PPT源记录
-            self.db_manager.execute(
-                "DELETE FROM ppt_sources WHERE path = ?",
-                (path,)
-            )
-            
-            # 移除相关的图片映射
-            self.db_manager.execute(
-                "DELETE FROM image_ppt_mapping WHERE pptx_path = ?",
-                (path,)
-            )
-            
-            # 提交事务
-            self.db_manager.commit()
+            DeckManifest(self.db_manager).purge_deleted([path])
             
             logging.info(f"成功移除PPT源文件: {path}")
             
         except Exception as e:
             logging.error(f"移除PPT源文件失败: {str(e)}")
-            if self.db_manager:
-                self.db_manager.rollback()
             raise
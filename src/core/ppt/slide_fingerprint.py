@@ -0,0 +1,159 @@
+from pathlib import Path
+from typing import Dict, List, Optional
+import hashlib
+import logging
+from lxml import etree
+from .zip_media_reader import ZipMediaReader, REL_ATTR_PREFIX, NS_OFFICE_REL
+
+RT_SLIDE = NS_OFFICE_REL + '/slide'
+
+# 每次复制或保存都可能变化的标识：形状ID、连接线引用的形状ID
+VOLATILE_ID_ELEMENTS = ('cNvPr', 'stCxn', 'endCxn')
+# 扩展中的随机标识（p14:creationId、p14:modId、a16:creationId、a16:rowId、a16:colId）
+VOLATILE_ELEMENTS = ('creationId', 'modId', 'rowId', 'colId')
+# 去掉随机标识后可能变空的扩展容器
+EXTENSION_ELEMENTS = ('ext', 'extLst')
+
+logger = logging.getLogger(__name__)
+
+
+def _local_name(elem) -> str:
+    return etree.QName(elem).localname
+
+
+def canonicalize_slide(slide_xml: bytes, rel_values: Dict[str, str]) -> bytes:
+    """将幻灯片XML规范化为与所在PPT无关的形式
+
+    关系ID（r:embed、r:link、r:id等）替换为所引用内容的标识，形状ID和扩展中的随机标识去除，
+    最后按C14N输出（属性顺序、命名空间声明和空白写法统一）。
+
+    Args:
+        slide_xml: 幻灯片部件的XML
+        rel_values: {关系ID: 引用内容的标识}，见_rel_values
+
+    Returns:
+        bytes: 规范化后的XML
+    """
+    root = etree.fromstring(slide_xml)
+
+    for elem in list(root.iter(etree.Element)):
+        name = _local_name(elem)
+        if name in VOLATILE_ELEMENTS:
+            elem.getparent().remove(elem)
+            continue
+        if name in VOLATILE_ID_ELEMENTS:
+            elem.attrib.pop('id', None)
+        for attr, value in elem.attrib.items():
+            if attr.startswith(REL_ATTR_PREFIX):
+                elem.set(attr, rel_values.get(value, ''))
+
+    # 由内向外删除变空的扩展容器
+    for elem in reversed(list(root.iter(etree.Element))):
+        if _local_name(elem) in EXTENSION_ELEMENTS and len(elem) == 0 and elem.getparent() is not None:
+            elem.getparent().remove(elem)
+
+    return etree.tostring(root, method='c14n')
+
+
+def _rel_values(reader: ZipMediaReader, slide_part: str, media_hashes: Dict[str, str]) -> Dict[str, str]:
+    """幻灯片各关系引用内容的标识
+
+    图片为提取时计算的图片哈希；外部链接为链接地址；指向其他幻灯片的链接只保留类型
+    （目标页在不同PPT中不同）；其余内部部件（图表、音视频等）为中央目录中的CRC32和大小。
+    """
+    values = {}
+    for rel in reader.get_rels(slide_part):
+        target = rel['target']
+        if rel['external']:
+            value = f"external:{target}"
+        elif target in media_hashes:
+            value = f"media:{media_hashes[target]}"
+        elif rel['type'] == RT_SLIDE:
+            value = 'slide'
+        else:
+            info = reader.get_info(target) if reader.has_member(target) else None
+            value = f"part:{info.CRC:08x}:{info.file_size}" if info else ''
+        values[rel['id']] = value
+    return values
+
+
+def hash_deck_slides(pptx_path, media_hashes: Optional[Dict[str, str]] = None) -> List[Dict]:
+    """计算PPT每页的规范化哈希，用于查找在不同PPT间复制的幻灯片
+
+    Args:
+        pptx_path: PPTX文件路径
+        media_hashes: {zip成员: 图片哈希}，通常来自同一次提取的图片记录（member、hash），
+                      缺少的图片按CRC32和大小标识
+
+    Returns:
+        List[Dict]: [{'slide': 页码, 'part': 幻灯片部件, 'hash': 规范化XML的MD5}]
+    """
+    media_hashes = media_hashes or {}
+    slides = []
+    with ZipMediaReader(str(pptx_path)) as reader:
+        for slide_idx, slide_part in enumerate(reader.get_slide_parts(), 1):
+            canonical = canonicalize_slide(
+                reader.read(slide_part), _rel_values(reader, slide_part, media_hashes)
+            )
+            slides.append({
+                'slide': slide_idx,
+                'part': slide_part,
+                'hash': hashlib.md5(canonical).hexdigest()
+            })
+    return slides
+
+
+class SlideCopyIndex:
+    """幻灯片复制索引 - 按规范化哈希查找在其他PPT中出现的相同幻灯片"""
+
+    def __init__(self, db_manager):
+        self.db = db_manager
+        self.logger = logging.getLogger(__name__)
+
+    def find_copies(self, pptx_path: str, slide_index: int) -> List[Dict]:
+        """查找与指定幻灯片相同的其他幻灯片（包括同一PPT中的其他页）
+
+        Returns:
+            List[Dict]: [{'ppt_path', 'ppt_name', 'slide'}]
+        """
+        rows = self.db.execute(
+            """
+            SELECT s.pptx_path, s.slide_index FROM slides t
+            JOIN slides s ON s.slide_hash = t.slide_hash
+            WHERE t.pptx_path = ? AND t.slide_index = ?
+              AND NOT (s.pptx_path = t.pptx_path AND s.slide_index = t.slide_index)
+            ORDER BY s.pptx_path, s.slide_index
+            """,
+            (str(pptx_path), slide_index)
+        ).fetchall()
+        return [
+            {'ppt_path': row['pptx_path'], 'ppt_name': Path(row['pptx_path']).name, 'slide': row['slide_index']}
+            for row in rows
+        ]
+
+    def duplicate_groups(self, min_decks: int = 2) -> List[Dict]:
+        """列出出现在至少min_decks个PPT中的幻灯片
+
+        Returns:
+            List[Dict]: [{'hash', 'decks': PPT数, 'slides': [(PPT路径, 页码)]}]，按PPT数降序
+        """
+        groups = self.db.execute(
+            """
+            SELECT slide_hash, COUNT(DISTINCT pptx_path) AS decks FROM slides
+            GROUP BY slide_hash HAVING COUNT(DISTINCT pptx_path) >= ?
+            ORDER BY decks DESC, slide_hash
+            """,
+            (min_decks,)
+        ).fetchall()
+        result = []
+        for group in groups:
+            rows = self.db.execute(
+                "SELECT pptx_path, slide_index FROM slides WHERE slide_hash = ? ORDER BY pptx_path, slide_index",
+                (group['slide_hash'],)
+            ).fetchall()
+            result.append({
+                'hash': group['slide_hash'],
+                'decks': group['decks'],
+                'slides': [(row['pptx_path'], row['slide_index']) for row in rows]
+            })
+        return result
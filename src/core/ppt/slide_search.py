@@ -0,0 +1,99 @@
+from pathlib import Path
+from typing import Dict, List
+import logging
+
+# trigram分词至少需要3个字符才能使用全文索引，更短的查询退化为LIKE
+MIN_FTS_QUERY_LENGTH = 3
+
+SNIPPET_TOKENS = 16
+SNIPPET_CONTEXT_CHARS = 24
+
+
+class SlideTextSearch:
+    """幻灯片文字搜索 - 在所有已索引PPT的每页文字和备注中查找关键词"""
+
+    def __init__(self, db_manager):
+        self.db = db_manager
+        self.logger = logging.getLogger(__name__)
+
+    def search(self, query: str, limit: int = 50) -> List[Dict]:
+        """搜索包含关键词的幻灯片
+
+        Args:
+            query: 关键词（按短语匹配）
+            limit: 最多返回的结果数
+
+        Returns:
+            List[Dict]: [{'ppt_path', 'ppt_name', 'slide', 'snippet'}]，按相关度排序，
+                        snippet中命中的文字以【】标出
+        """
+        query = query.strip()
+        if not query:
+            return []
+        try:
+            if self.db.fts_enabled and len(query) >= MIN_FTS_QUERY_LENGTH:
+                rows = self._search_fts(query, limit)
+            else:
+                rows = self._search_like(query, limit)
+            return [
+                {
+                    'ppt_path': row['pptx_path'],
+                    'ppt_name': Path(row['pptx_path']).name,
+                    'slide': row['slide_index'],
+                    'snippet': row['snippet']
+                }
+                for row in rows
+            ]
+        except Exception as e:
+            self.logger.error(f"搜索幻灯片文字失败: {str(e)}")
+            return []
+
+    def _search_fts(self, query: str, limit: int) -> List[Dict]:
+        # 整体作为短语匹配，避免用户输入被解析为FTS5查询语法
+        phrase = '"' + query.replace('"', '""') + '"'
+        return self.db.execute(
+            f"""
+            SELECT s.pptx_path, s.slide_index,
+                   snippet(slide_text_fts, -1, '【', '】', '…', {SNIPPET_TOKENS}) AS snippet
+            FROM slide_text_fts
+            JOIN slide_text s ON s.id = slide_text_fts.rowid
+            WHERE slide_text_fts MATCH ?
+            ORDER BY rank
+            LIMIT ?
+            """,
+            (phrase, limit)
+        ).fetchall()
+
+    def _search_like(self, query: str, limit: int) -> List[Dict]:
+        pattern = '%' + query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        rows = self.db.execute(
+            """
+            SELECT pptx_path, slide_index, text, notes FROM slide_text
+            WHERE text LIKE ? ESCAPE '\\' OR notes LIKE ? ESCAPE '\\'
+            ORDER BY pptx_path, slide_index
+            LIMIT ?
+            """,
+            (pattern, pattern, limit)
+        ).fetchall()
+        return [
+            {
+                'pptx_path': row['pptx_path'],
+                'slide_index': row['slide_index'],
+                'snippet': _make_snippet(row['text'] if query.lower() in row['text'].lower() else row['notes'], query)
+            }
+            for row in rows
+        ]
+
+
+def _make_snippet(text: str, query: str) -> str:
+    """截取关键词前后的文字并标出关键词"""
+    pos = text.lower().find(query.lower())
+    if pos < 0:
+        return text[:SNIPPET_CONTEXT_CHARS * 2]
+    start = max(0, pos - SNIPPET_CONTEXT_CHARS)
+    end = min(len(text), pos + len(query) + SNIPPET_CONTEXT_CHARS)
+    return (
+        ('…' if start > 0 else '')
+        + text[start:pos] + '【' + text[pos:pos + len(query)] + '】' + text[pos + len(query):end]
+        + ('…' if end < len(text) else '')
+    )
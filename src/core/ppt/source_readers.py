@@ -0,0 +1,657 @@
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Iterator, NamedTuple, Optional, Tuple
+import io
+import mmap
+import posixpath
+import re
+import struct
+import zlib
+from .zip_media_reader import ZipMediaReader
+from .cfb_reader import CompoundFile
+
+# 图片以外的素材（音视频、字体等）不进入图库
+IMAGE_EXTENSIONS = {
+    '.png': 'image/png',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.gif': 'image/gif',
+    '.bmp': 'image/bmp',
+    '.tif': 'image/tiff',
+    '.tiff': 'image/tiff',
+    '.heic': 'image/heic',
+    '.webp': 'image/webp',
+    '.jp2': 'image/jp2',
+    '.emf': 'image/x-emf',
+    '.wmf': 'image/x-wmf',
+}
+
+
+class MediaInfo(NamedTuple):
+    """非zip来源中媒体的基本信息，字段与zipfile.ZipInfo同名"""
+    filename: str
+    CRC: int
+    file_size: int
+
+
+class OfficeDocumentReader(ZipMediaReader):
+    """通用OOXML文档（DOCX等）媒体读取器
+
+    从包根沿关系图遍历所有XML部件，产出其中引用的图片；文档没有页的概念，slide记为0。
+    """
+
+    def iter_media(self) -> Iterator[Dict]:
+        self._visited_parts = set()
+        pending = ['']
+        while pending:
+            part = pending.pop()
+            if part:
+                yield from self._iter_part_media(part, 0)
+            for rel in self.get_rels(part):
+                target = rel['target']
+                if (rel['external'] or target in self._visited_parts
+                        or not target.endswith('.xml') or not self.has_member(target)):
+                    continue
+                self._visited_parts.add(target)
+                pending.append(target)
+
+
+class KeynoteReader(ZipMediaReader):
+    """Keynote文稿（单文件格式）媒体读取器
+
+    Keynote的单文件格式是zip包，图片原样存放在Data/目录中；幻灯片结构保存在
+    Snappy压缩的protobuf（Index/*.iwa）中，无法确定图片所在的页，slide记为0。
+    """
+
+    # 根目录的preview*.jpg和QuickLook/中是整份文稿的预览图，Data/中的*-small-*是缩小的副本
+    SKIPPED_PREFIXES = ('QuickLook/', 'preview')
+    SMALL_COPY_MARKER = '-small-'
+
+    def iter_media(self) -> Iterator[Dict]:
+        members = sorted(self._names)
+        # 旧版（iWork '09）格式没有Data/目录，图片散落在包内
+        data_members = [member for member in members if member.startswith('Data/')]
+        for member in data_members or members:
+            ext = posixpath.splitext(member)[1].lower()
+            name = posixpath.basename(member)
+            if (ext not in IMAGE_EXTENSIONS or member.startswith(self.SKIPPED_PREFIXES)
+                    or self.SMALL_COPY_MARKER in name):
+                continue
+            yield {
+                'member': member,
+                'slide': 0,
+                'part': member,
+                'shape': '',
+                'rel_id': '',
+                'content_type': IMAGE_EXTENSIONS[ext],
+                'ext': ext
+            }
+
+
+class DecodedMediaReader(ABC):
+    """非zip来源的媒体读取器基类 - 图片需要从来源格式中解码（或补全文件头）才能得到
+
+    子类实现_get_media()和_decode_member()。CRC32和大小按输出的图片文件计算，
+    最近一次解码的结果会被保留，哈希前的get_info和随后的read只解码一次。
+    """
+
+    def __init__(self):
+        self._media = None
+        self._decoded = None
+        self._infos = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        pass
+
+    @abstractmethod
+    def _get_media(self) -> Dict[str, Tuple]:
+        """{成员名: 解码所需的信息}"""
+        pass
+
+    @abstractmethod
+    def _decode_member(self, member: str) -> bytes:
+        """解码成员，返回完整的图片文件字节"""
+        pass
+
+    def _media_record(self, member: str) -> Dict:
+        """iter_media产出的记录，无法确定所在页，slide记为0"""
+        ext = posixpath.splitext(member)[1].lower()
+        return {
+            'member': member,
+            'slide': 0,
+            'part': member,
+            'shape': '',
+            'rel_id': '',
+            'content_type': IMAGE_EXTENSIONS.get(ext, ''),
+            'ext': ext
+        }
+
+    def iter_media(self) -> Iterator[Dict]:
+        for member in self._get_media():
+            yield self._media_record(member)
+
+    def _decode(self, member: str) -> bytes:
+        if self._decoded is not None and self._decoded[0] == member:
+            return self._decoded[1]
+        if member not in self._get_media():
+            raise KeyError(f"不存在图片 {member}")
+        data = self._decode_member(member)
+        self._decoded = (member, data)
+        return data
+
+    def has_member(self, member: str) -> bool:
+        return member in self._get_media()
+
+    def get_info(self, member: str) -> Optional[MediaInfo]:
+        """获取图片的CRC32和大小（按输出的图片文件计算）"""
+        if member not in self._infos:
+            if not self.has_member(member):
+                return None
+            data = self._decode(member)
+            self._infos[member] = MediaInfo(member, zlib.crc32(data), len(data))
+        return self._infos[member]
+
+    def read(self, member: str) -> bytes:
+        return self._decode(member)
+
+    def open(self, member: str):
+        return io.BytesIO(self._decode(member))
+
+    def stored_view(self, member: str) -> Optional[memoryview]:
+        """图片不是zip成员，没有可直接复制的区间"""
+        return None
+
+
+class _PdfRef(NamedTuple):
+    """PDF间接引用（n g R）"""
+    num: int
+    gen: int
+
+
+PDF_WHITESPACE = b' \t\r\n\f\x00'
+PDF_DELIMITERS = b'()<>[]{}/%'
+PDF_OBJ_PATTERN = re.compile(rb'(\d+)\s+(\d+)\s+obj\b')
+PDF_TRAILER_PATTERN = re.compile(rb'trailer\s*<<')
+PDF_INT_PATTERN = re.compile(rb'-?\d+$')
+
+# 图片流的滤镜 -> 扩展名；DCT（JPEG）和JPX（JPEG 2000）流本身就是完整的图片文件
+PDF_PASSTHROUGH_FILTERS = {'DCTDecode': '.jpg', 'JPXDecode': '.jp2'}
+# FlateDecode的像素数据按颜色分量数封装为PNG
+PDF_COLOR_COMPONENTS = {'DeviceGray': 1, 'CalGray': 1, 'DeviceRGB': 3, 'CalRGB': 3}
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+PNG_COLOR_TYPES = {1: 0, 3: 2}
+
+
+def _png_chunk(chunk_type: bytes, data: bytes) -> bytes:
+    return struct.pack('>I', len(data)) + chunk_type + data + struct.pack('>I', zlib.crc32(chunk_type + data))
+
+
+class _PdfParser:
+    """最小的PDF对象解析器，只解析字典、数组、名字、数字、字符串和间接引用"""
+
+    def __init__(self, data):
+        self.data = data
+
+    def skip_space(self, pos: int) -> int:
+        data = self.data
+        while pos < len(data):
+            c = data[pos:pos + 1]
+            if c == b'%':
+                while pos < len(data) and data[pos:pos + 1] not in b'\r\n':
+                    pos += 1
+            elif c and c in PDF_WHITESPACE:
+                pos += 1
+            else:
+                break
+        return pos
+
+    def read_token(self, pos: int) -> Tuple[bytes, int]:
+        start = pos
+        while pos < len(self.data):
+            c = self.data[pos:pos + 1]
+            if c in PDF_WHITESPACE or c in PDF_DELIMITERS:
+                break
+            pos += 1
+        return self.data[start:pos], pos
+
+    def parse(self, pos: int):
+        """解析pos处的对象
+
+        Returns:
+            Tuple: (对象, 结束位置)；名字为str，字符串为bytes，间接引用为_PdfRef
+        """
+        data = self.data
+        pos = self.skip_space(pos)
+        head = data[pos:pos + 2]
+        if head == b'<<':
+            result, pos = {}, pos + 2
+            while True:
+                pos = self.skip_space(pos)
+                if data[pos:pos + 2] == b'>>' or pos >= len(data):
+                    return result, pos + 2
+                key, pos = self.parse(pos)
+                value, pos = self.parse(pos)
+                result[key] = value
+        if head[:1] == b'[':
+            result, pos = [], pos + 1
+            while True:
+                pos = self.skip_space(pos)
+                if data[pos:pos + 1] == b']' or pos >= len(data):
+                    return result, pos + 1
+                value, pos = self.parse(pos)
+                result.append(value)
+        if head[:1] == b'/':
+            token, pos = self.read_token(pos + 1)
+            return token.decode('latin-1'), pos
+        if head[:1] == b'<':
+            end = data.find(b'>', pos)
+            return bytes.fromhex(data[pos + 1:end].decode('latin-1')), end + 1
+        if head[:1] == b'(':
+            return self._parse_string(pos)
+
+        token, end = self.read_token(pos)
+        if PDF_INT_PATTERN.match(token):
+            # 可能是间接引用 n g R
+            gen_pos = self.skip_space(end)
+            gen, gen_end = self.read_token(gen_pos)
+            if gen.isdigit():
+                r_pos = self.skip_space(gen_end)
+                if data[r_pos:r_pos + 1] == b'R':
+                    return _PdfRef(int(token), int(gen)), r_pos + 1
+            return int(token), end
+        keywords = {b'true': True, b'false': False, b'null': None}
+        if token in keywords:
+            return keywords[token], end
+        try:
+            return float(token), end
+        except ValueError:
+            return token.decode('latin-1'), max(end, pos + 1)
+
+    def _parse_string(self, pos: int) -> Tuple[bytes, int]:
+        """解析字面字符串（括号可嵌套，反斜杠转义），只用于跳过，不处理转义内容"""
+        depth, start = 0, pos + 1
+        while pos < len(self.data):
+            c = self.data[pos:pos + 1]
+            if c == b'\\':
+                pos += 2
+                continue
+            if c == b'(':
+                depth += 1
+            elif c == b')':
+                depth -= 1
+                if depth == 0:
+                    return self.data[start:pos], pos + 1
+            pos += 1
+        return self.data[start:pos], pos
+
+
+class PdfImageReader(DecodedMediaReader):
+    """PDF内嵌图片读取器 - 只用标准库扫描文件中的图片流对象
+
+    按顺序扫描文件中的"n g obj"对象，记录所有流对象的位置，无需解析交叉引用表
+    （增量更新时同号对象以文件中最后出现的为准）。图片只能是流对象，不会出现在对象流中。
+    JPEG和JPEG 2000流原样作为图片文件，8位灰度/RGB的FlateDecode像素数据封装为PNG，
+    其余编码（CCITT、JBIG2、索引色、CMYK等）以及作为其他图片遮罩的SMask跳过。
+    PDF中的图片通过页面资源间接引用，slide记为0。
+    """
+
+    def __init__(self, pdf_path: str):
+        super().__init__()
+        self.pdf_path = Path(pdf_path)
+        self._file = open(str(self.pdf_path), 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # 空文件无法映射
+            self._file.close()
+            raise ValueError(f"无效的PDF文件: {self.pdf_path}")
+        self._parser = _PdfParser(self._mmap)
+        self._offsets = {}
+        self._streams = {}
+        try:
+            self._scan()
+        except Exception:
+            self.close()
+            raise
+
+    def close(self):
+        """关闭PDF文件"""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _scan(self):
+        """扫描所有对象，记录流对象的字典和数据区间"""
+        data = self._mmap
+        if data[:5] != b'%PDF-':
+            raise ValueError(f"无效的PDF文件: {self.pdf_path}")
+
+        encrypted = False
+        pos = 0
+        while True:
+            match = PDF_OBJ_PATTERN.search(data, pos)
+            if match is None:
+                break
+            num = int(match.group(1))
+            pos = self._parser.skip_space(match.end())
+            self._offsets[num] = pos
+            if data[pos:pos + 2] != b'<<':
+                continue
+            try:
+                obj, pos = self._parser.parse(pos)
+            except (ValueError, IndexError, TypeError):
+                continue
+            if obj.get('Type') == 'XRef' and 'Encrypt' in obj:
+                encrypted = True
+            stream_pos = self._parser.skip_space(pos)
+            if data[stream_pos:stream_pos + 6] != b'stream':
+                continue
+            start = stream_pos + 6
+            start += 2 if data[start:start + 2] == b'\r\n' else 1
+            end = self._find_stream_end(obj, start)
+            self._streams[num] = (obj, start, end)
+            # 跳过流数据，避免把数据中的字节误认为对象
+            pos = end
+
+        for match in PDF_TRAILER_PATTERN.finditer(data):
+            try:
+                trailer, _ = self._parser.parse(match.end() - 2)
+            except (ValueError, IndexError, TypeError):
+                continue
+            if 'Encrypt' in trailer:
+                encrypted = True
+        if encrypted:
+            raise ValueError(f"PDF已加密，无法读取图片: {self.pdf_path}")
+
+    def _find_stream_end(self, obj: Dict, start: int) -> int:
+        """确定流数据的结束位置，Length是间接引用或与实际不符时查找endstream"""
+        length = obj.get('Length')
+        if isinstance(length, int) and length >= 0:
+            after = self._parser.skip_space(start + length)
+            if self._mmap[after:after + 9] == b'endstream':
+                return start + length
+        end = self._mmap.find(b'endstream', start)
+        if end < 0:
+            return len(self._mmap)
+        # 去掉endstream前的行尾
+        if self._mmap[end - 2:end] == b'\r\n':
+            return end - 2
+        if self._mmap[end - 1:end] in (b'\n', b'\r'):
+            return end - 1
+        return end
+
+    def _resolve(self, value):
+        """解析间接引用，无法解析时返回None"""
+        if not isinstance(value, _PdfRef):
+            return value
+        if value.num in self._streams:
+            return self._streams[value.num][0]
+        offset = self._offsets.get(value.num)
+        if offset is None:
+            return None
+        try:
+            return self._parser.parse(offset)[0]
+        except (ValueError, IndexError, TypeError):
+            return None
+
+    def _color_components(self, color_space) -> Optional[int]:
+        """颜色空间的分量数，不支持的颜色空间返回None"""
+        color_space = self._resolve(color_space)
+        if isinstance(color_space, str):
+            return PDF_COLOR_COMPONENTS.get(color_space)
+        if isinstance(color_space, list) and color_space:
+            family = color_space[0]
+            if family in PDF_COLOR_COMPONENTS:
+                return PDF_COLOR_COMPONENTS[family]
+            if family == 'ICCBased' and len(color_space) > 1:
+                profile = self._resolve(color_space[1])
+                if isinstance(profile, dict):
+                    return profile.get('N') if profile.get('N') in PNG_COLOR_TYPES else None
+        return None
+
+    def _media_record(self, member: str) -> Dict:
+        # 形状记为图片流的对象号
+        return {**super()._media_record(member), 'shape': str(self._get_media()[member][0])}
+
+    def _get_media(self) -> Dict[str, Tuple[int, str]]:
+        """{成员名: (对象号, 扩展名)}，成员名形如obj/12.jpg"""
+        if self._media is not None:
+            return self._media
+
+        images = {num: obj for num, (obj, _, _) in self._streams.items() if obj.get('Subtype') == 'Image'}
+        masks = {
+            ref.num for obj in images.values() for key in ('SMask', 'Mask')
+            for ref in [obj.get(key)] if isinstance(ref, _PdfRef)
+        }
+        media = {}
+        for num, obj in sorted(images.items()):
+            if num in masks:
+                continue
+            ext = self._image_extension(obj)
+            if ext:
+                media[f"obj/{num}{ext}"] = (num, ext)
+        self._media = media
+        return media
+
+    def _image_extension(self, obj: Dict) -> Optional[str]:
+        """图片流可以输出的格式，不支持的编码返回None"""
+        filters = self._resolve(obj.get('Filter'))
+        if isinstance(filters, list):
+            if len(filters) != 1:
+                return None
+            filters = filters[0]
+        if filters in PDF_PASSTHROUGH_FILTERS:
+            return PDF_PASSTHROUGH_FILTERS[filters]
+        if filters == 'FlateDecode' and obj.get('BitsPerComponent') == 8 \
+                and self._color_components(obj.get('ColorSpace')) is not None:
+            return '.png'
+        return None
+
+    def _decode_member(self, member: str) -> bytes:
+        num, ext = self._get_media()[member]
+        obj, start, end = self._streams[num]
+        raw = self._mmap[start:end]
+        return raw if ext != '.png' else self._flate_to_png(obj, raw)
+
+    def _flate_to_png(self, obj: Dict, raw: bytes) -> bytes:
+        """把FlateDecode的8位像素数据封装为PNG
+
+        使用PNG预测器（Predictor>=10）的流本身就是PNG的IDAT数据，直接封装；
+        没有预测器的流解压后给每行加上滤波类型字节再压缩。
+        """
+        width, height = int(self._resolve(obj['Width'])), int(self._resolve(obj['Height']))
+        components = self._color_components(obj.get('ColorSpace'))
+        parms = self._resolve(obj.get('DecodeParms')) or {}
+        if isinstance(parms, list):
+            parms = self._resolve(parms[0]) or {} if parms else {}
+        predictor = parms.get('Predictor', 1)
+
+        if predictor >= 10:
+            if (parms.get('Colors', 1) != components or parms.get('BitsPerComponent', 8) != 8
+                    or parms.get('Columns', 1) != width):
+                raise ValueError(f"不支持的PNG预测器参数: {parms}")
+            idat = raw
+        elif predictor == 1:
+            pixels = zlib.decompress(raw)
+            row_size = width * components
+            if len(pixels) < row_size * height:
+                raise ValueError("图片数据不完整")
+            idat = zlib.compress(b''.join(
+                b'\x00' + pixels[row * row_size:(row + 1) * row_size] for row in range(height)
+            ))
+        else:
+            raise ValueError(f"不支持的预测器: {predictor}")
+
+        header = struct.pack('>IIBBBBB', width, height, 8, PNG_COLOR_TYPES[components], 0, 0, 0)
+        return PNG_SIGNATURE + _png_chunk(b'IHDR', header) + _png_chunk(b'IDAT', idat) + _png_chunk(b'IEND', b'')
+
+
+# OfficeArt BLIP记录类型 -> 扩展名（MS-ODRAW 2.2.23 OfficeArtBlip）
+BLIP_EXTENSIONS = {
+    0xF01A: '.emf',
+    0xF01B: '.wmf',
+    0xF01D: '.jpg',
+    0xF01E: '.png',
+    0xF01F: '.bmp',
+    0xF029: '.tiff',
+    0xF02A: '.jpg',
+}
+# 带两个UID的recInstance（单UID的值异或1）
+BLIP_DOUBLE_UID_INSTANCES = {0x3D5, 0x217, 0x46B, 0x6E1, 0x7A9, 0x6E5, 0x6E3}
+METAFILE_BLIP_TYPES = (0xF01A, 0xF01B)
+# 元文件BLIP的OfficeArtMetafileHeader
+METAFILE_HEADER_SIZE = 34
+METAFILE_COMPRESSION_DEFLATE = 0x00
+RECORD_HEADER_SIZE = 8
+UID_SIZE = 16
+BITMAP_TAG_SIZE = 1
+
+EMU_PER_INCH = 914400
+WMF_PLACEABLE_KEY = 0x9AC6CDD7
+BMP_FILE_HEADER_SIZE = 14
+
+
+class LegacyPptReader(DecodedMediaReader):
+    """旧版二进制PPT（.ppt）图片读取器 - 直接读取OLE复合文档中的Pictures流
+
+    Pictures流依次存放PPT中所有图片的OfficeArt BLIP记录（每张图片只存一份），
+    位图记录去掉UID和标记字节即是完整的JPEG/PNG/TIFF；DIB补上BMP文件头，
+    元文件（EMF/WMF）按记录头解压，WMF补上可放置文件头。不需要PowerPoint或第三方库。
+    图片与幻灯片的对应关系在PowerPoint Document流的绘图记录中，slide记为0。
+    """
+
+    def __init__(self, ppt_path: str):
+        super().__init__()
+        self.ppt_path = Path(ppt_path)
+        self._cfb = CompoundFile(str(self.ppt_path))
+        entry = self._cfb.find_stream('Pictures')
+        self._stream = self._cfb.open_stream(entry) if entry is not None else None
+
+    def close(self):
+        """关闭PPT文件"""
+        self._stream = None
+        if self._cfb is not None:
+            self._cfb.close()
+            self._cfb = None
+
+    def _get_media(self) -> Dict[str, Tuple[int, int, int, int]]:
+        """扫描Pictures流中的记录头，{成员名: (记录类型, recInstance, 数据偏移, 数据长度)}
+
+        成员名形如Pictures/1234.png（记录在流中的偏移），只读取记录头，不读取图片数据。
+        """
+        if self._media is not None:
+            return self._media
+
+        media = {}
+        stream = self._stream
+        pos = 0
+        while stream is not None:
+            stream.seek(pos)
+            header = stream.read(RECORD_HEADER_SIZE)
+            if len(header) < RECORD_HEADER_SIZE:
+                break
+            ver_instance, rec_type, rec_len = struct.unpack('<HHI', header)
+            instance = ver_instance >> 4
+            data_offset = pos + RECORD_HEADER_SIZE
+            ext = BLIP_EXTENSIONS.get(rec_type)
+            if ext is not None:
+                media[f"Pictures/{pos}{ext}"] = (rec_type, instance, data_offset, rec_len)
+            pos = data_offset + rec_len
+        self._media = media
+        return media
+
+    def _decode_member(self, member: str) -> bytes:
+        rec_type, instance, offset, length = self._get_media()[member]
+        self._stream.seek(offset)
+        record = self._stream.read(length)
+        uid_size = UID_SIZE * (2 if instance in BLIP_DOUBLE_UID_INSTANCES else 1)
+
+        if rec_type in METAFILE_BLIP_TYPES:
+            return self._decode_metafile(rec_type, record[uid_size:])
+
+        data = record[uid_size + BITMAP_TAG_SIZE:]
+        if rec_type == 0xF01F:
+            return self._dib_to_bmp(data)
+        return data
+
+    @staticmethod
+    def _decode_metafile(rec_type: int, record: bytes) -> bytes:
+        """解压元文件BLIP，WMF补上可放置文件头（包含尺寸信息，图片软件才能识别）"""
+        (_, left, top, right, bottom, width_emu, height_emu,
+         saved_size, compression, _) = struct.unpack('<I4i2iIBB', record[:METAFILE_HEADER_SIZE])
+        data = record[METAFILE_HEADER_SIZE:METAFILE_HEADER_SIZE + saved_size]
+        if compression == METAFILE_COMPRESSION_DEFLATE:
+            data = zlib.decompress(data)
+        if rec_type == 0xF01A:
+            return data
+
+        # 可放置文件头的单位数/英寸由边界框和物理尺寸（EMU）推算
+        units_per_inch = 1440
+        if width_emu > 0 and right > left:
+            units_per_inch = max(1, round((right - left) * EMU_PER_INCH / width_emu))
+        header = struct.pack('<IHhhhhHI', WMF_PLACEABLE_KEY, 0,
+                             *(max(-32768, min(32767, value)) for value in (left, top, right, bottom)),
+                             units_per_inch, 0)
+        checksum = 0
+        for (word,) in struct.iter_unpack('<H', header):
+            checksum ^= word
+        return header + struct.pack('<H', checksum) + data
+
+    @staticmethod
+    def _dib_to_bmp(dib: bytes) -> bytes:
+        """DIB（BITMAPINFOHEADER + 调色板 + 像素）补上BMP文件头"""
+        header_size, _, _, _, bit_count, compression = struct.unpack('<IiiHHI', dib[:20])
+        colors_used = struct.unpack('<I', dib[32:36])[0] if header_size >= 36 else 0
+        if not colors_used and bit_count <= 8:
+            colors_used = 1 << bit_count
+        # BI_BITFIELDS时40字节信息头后跟3个颜色掩码
+        masks = 12 if compression == 3 and header_size == 40 else 0
+        pixel_offset = BMP_FILE_HEADER_SIZE + header_size + masks + colors_used * 4
+        return struct.pack('<2sIHHI', b'BM', BMP_FILE_HEADER_SIZE + len(dib), 0, 0, pixel_offset) + dib
+
+
+# 文件扩展名 -> 读取器
+SOURCE_READERS = {
+    '.pptx': ZipMediaReader,
+    '.ppt': LegacyPptReader,
+    '.docx': OfficeDocumentReader,
+    '.key': KeynoteReader,
+    '.keynote': KeynoteReader,
+    '.pdf': PdfImageReader,
+}
+# 成员可通过zip中央目录缓存直接读取的来源
+ZIP_SOURCE_SUFFIXES = ('.pptx', '.docx', '.key', '.keynote')
+
+
+def is_zip_source(path) -> bool:
+    """来源文件是否为zip包"""
+    return Path(path).suffix.lower() in ZIP_SOURCE_SUFFIXES
+
+
+def open_source_reader(path):
+    """按扩展名打开来源文件的媒体读取器
+
+    Raises:
+        ValueError: 不支持的文件类型
+    """
+    reader_class = SOURCE_READERS.get(Path(path).suffix.lower())
+    if reader_class is None:
+        raise ValueError(f"不支持的文件类型: {path}")
+    return reader_class(str(path))
+
+
+def iter_source_files(folder_path: Path) -> Iterator[Path]:
+    """遍历文件夹中所有可提取图片的来源文件（跳过Office临时锁文件和Keynote包目录）"""
+    for suffix in SOURCE_READERS:
+        for path in Path(folder_path).glob(f"**/*{suffix}"):
+            if not path.name.startswith('~$') and path.is_file():
+                yield path
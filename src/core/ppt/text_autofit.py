@@ -0,0 +1,168 @@
+from pathlib import Path
+from typing import Dict, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+import logging
+import shutil
+from lxml import etree
+from tqdm import tqdm
+from .zip_media_reader import ZipMediaReader, NS_PRESENTATION
+from .text_extractor import NS_DRAWING, iter_pptx_files
+from .package_writer import rewrite_package
+from .deck_scheduler import plan_longest_first
+
+TAG_SHAPE = f"{{{NS_PRESENTATION}}}sp"
+TAG_TX_BODY = f"{{{NS_PRESENTATION}}}txBody"
+TAG_C_NV_PR = f"{{{NS_PRESENTATION}}}cNvPr"
+TAG_BODY_PR = f"{{{NS_DRAWING}}}bodyPr"
+TAG_PRST_TX_WARP = f"{{{NS_DRAWING}}}prstTxWarp"
+TAG_SP_AUTO_FIT = f"{{{NS_DRAWING}}}spAutoFit"
+# bodyPr中三种自动调整方式互斥
+AUTOFIT_TAGS = (
+    f"{{{NS_DRAWING}}}noAutofit",
+    f"{{{NS_DRAWING}}}normAutofit",
+    TAG_SP_AUTO_FIT,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _fit_body(body_pr) -> List[str]:
+    """将bodyPr设置为不自动换行、根据文字调整形状大小
+
+    Returns:
+        List[str]: 实际改动的项（'wrap'、'autofit'），已符合要求时为空
+    """
+    changes = []
+    if body_pr.get('wrap') != 'none':
+        body_pr.set('wrap', 'none')
+        changes.append('wrap')
+
+    autofit = [child for child in body_pr if child.tag in AUTOFIT_TAGS]
+    if len(autofit) != 1 or autofit[0].tag != TAG_SP_AUTO_FIT:
+        for child in autofit:
+            body_pr.remove(child)
+        # 按架构顺序，自动调整元素紧跟在prstTxWarp之后
+        warp = body_pr.find(TAG_PRST_TX_WARP)
+        position = body_pr.index(warp) + 1 if warp is not None else 0
+        body_pr.insert(position, etree.Element(TAG_SP_AUTO_FIT))
+        changes.append('autofit')
+    return changes
+
+
+def adjust_deck_text_boxes(pptx_path, output_path=None, dry_run: bool = False) -> Dict:
+    """调整PPT中所有文本框：不自动换行，并根据文字调整形状大小
+
+    直接改写各页XML中文本框的a:bodyPr（wrap="none"并设置a:spAutoFit），不启动PowerPoint。
+    形状尺寸由PowerPoint在下次渲染编辑文字时按内容重新计算。
+    只重写有改动的幻灯片部件，其余成员原样复制。
+
+    Args:
+        pptx_path: PPTX文件路径
+        output_path: 输出路径，默认覆盖原文件
+        dry_run: 只报告需要调整的文本框，不写入文件
+
+    Returns:
+        Dict: {'ppt', 'shapes': [{'slide', 'shape', 'name', 'changes'}]}，dry_run时shapes为需要调整的文本框
+    """
+    pptx_path = str(pptx_path)
+    shapes = []
+    replacements = {}
+
+    with ZipMediaReader(pptx_path) as reader:
+        for slide_idx, slide_part in enumerate(reader.get_slide_parts(), 1):
+            root = etree.fromstring(reader.read(slide_part))
+            changed = False
+            # 包括组合形状中的文本框
+            for shape in root.iter(TAG_SHAPE):
+                body_pr = shape.find(f"{TAG_TX_BODY}/{TAG_BODY_PR}")
+                if body_pr is None:
+                    continue
+                changes = _fit_body(body_pr)
+                if not changes:
+                    continue
+                c_nv_pr = shape.find(f".//{TAG_C_NV_PR}")
+                shapes.append({
+                    'slide': slide_idx,
+                    'shape': c_nv_pr.get('id') if c_nv_pr is not None else None,
+                    'name': c_nv_pr.get('name', '') if c_nv_pr is not None else '',
+                    'changes': changes
+                })
+                changed = True
+            if changed:
+                replacements[slide_part] = etree.tostring(
+                    root, xml_declaration=True, encoding='UTF-8', standalone=True
+                )
+
+    if not dry_run:
+        if replacements:
+            rewrite_package(pptx_path, replacements, output_path=output_path)
+        elif output_path:
+            Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(pptx_path, output_path)
+
+    return {'ppt': pptx_path, 'shapes': shapes}
+
+
+def _adjust_text_boxes_worker(pptx_path: str, output_path: Optional[str], dry_run: bool) -> Dict:
+    """进程池工作函数 - 调整单个PPT，失败时返回错误信息"""
+    try:
+        return adjust_deck_text_boxes(pptx_path, output_path, dry_run)
+    except Exception as e:
+        return {'ppt': pptx_path, 'error': str(e)}
+
+
+def adjust_folder_text_boxes(folder_path: str, output_folder: Optional[str] = None, workers: int = 1,
+                             dry_run: bool = False, progress_callback=None) -> Dict:
+    """批量调整文件夹中所有PPTX的文本框
+
+    Args:
+        folder_path: PPT文件夹路径
+        output_folder: 输出文件夹（保持相对目录结构），默认覆盖原文件
+        workers: 工作进程数
+        dry_run: 只生成报告，不写入文件
+        progress_callback: 进度回调函数
+
+    Returns:
+        Dict: {'decks': 处理的PPT数, 'shapes': 需要调整的文本框数,
+               'report': [{'ppt', 'slide', 'shape', 'name', 'changes'}], 'failed': [失败信息列表]}
+    """
+    folder_path = Path(folder_path)
+    if not folder_path.exists():
+        raise FileNotFoundError(f"文件夹不存在: {folder_path}")
+
+    # 大文件先处理，避免末尾被单个大文件拖住
+    ppt_files = [str(task['path']) for task in plan_longest_first(list(iter_pptx_files(folder_path)))]
+    output_paths = [
+        str(Path(output_folder) / Path(path).relative_to(folder_path)) if output_folder else None
+        for path in ppt_files
+    ]
+    summary = {'decks': 0, 'shapes': 0, 'report': [], 'failed': []}
+    if not ppt_files:
+        logger.warning(f"未在 {folder_path} 找到PPTX文件")
+        return summary
+
+    dry_run_flags = [dry_run] * len(ppt_files)
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(_adjust_text_boxes_worker, ppt_files, output_paths, dry_run_flags)
+    else:
+        executor = None
+        results = map(_adjust_text_boxes_worker, ppt_files, output_paths, dry_run_flags)
+
+    try:
+        for current_idx, result in enumerate(tqdm(results, total=len(ppt_files), desc="调整文本框"), 1):
+            if progress_callback:
+                progress_callback(current_idx, len(ppt_files), f"正在处理: {Path(result['ppt']).name}")
+
+            summary['decks'] += 1
+            if 'error' in result:
+                logger.error(f"调整 {result['ppt']} 的文本框时出错: {result['error']}")
+                summary['failed'].append(result)
+                continue
+            summary['shapes'] += len(result['shapes'])
+            summary['report'].extend({'ppt': result['ppt'], **shape} for shape in result['shapes'])
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return summary
@@ -0,0 +1,147 @@
+from pathlib import Path
+from typing import Dict, Iterator, List
+from concurrent.futures import ProcessPoolExecutor
+import json
+import logging
+from lxml import etree
+from tqdm import tqdm
+from .zip_media_reader import ZipMediaReader, RT_NOTES_SLIDE
+from .deck_scheduler import plan_longest_first
+
+NS_DRAWING = 'http://schemas.openxmlformats.org/drawingml/2006/main'
+
+TAG_PARAGRAPH = f"{{{NS_DRAWING}}}p"
+TAG_TEXT = f"{{{NS_DRAWING}}}t"
+TAG_FIELD = f"{{{NS_DRAWING}}}fld"
+TAG_BREAK = f"{{{NS_DRAWING}}}br"
+
+# 备注页中自动生成的页码字段不属于备注内容
+SKIPPED_FIELD_TYPES = ('slidenum',)
+
+logger = logging.getLogger(__name__)
+
+
+def iter_part_paragraphs(reader: ZipMediaReader, part_name: str) -> Iterator[str]:
+    """流式解析部件XML，逐段产出a:p中的文字
+
+    直接从压缩包流式读取，只关注a:p元素，处理完的元素立即释放，内存占用与部件大小无关。
+    a:p可以位于任何形状中，因此表格、组合形状和占位符中的文字都会包含在内。
+    """
+    with reader.open(part_name) as stream:
+        for _, paragraph in etree.iterparse(stream, events=('end',), tag=TAG_PARAGRAPH):
+            runs = []
+            for text in paragraph.iter(TAG_TEXT, TAG_BREAK):
+                if text.tag == TAG_BREAK:
+                    runs.append('\n')
+                    continue
+                parent = text.getparent()
+                if parent.tag == TAG_FIELD and parent.get('type') in SKIPPED_FIELD_TYPES:
+                    continue
+                if text.text:
+                    runs.append(text.text)
+            line = ''.join(runs).strip()
+            if line:
+                yield line
+
+            # 释放已处理的元素
+            paragraph.clear()
+            while paragraph.getprevious() is not None:
+                del paragraph.getparent()[0]
+
+
+def extract_deck_text(pptx_path) -> List[Dict]:
+    """提取PPT每页的文字和备注
+
+    Args:
+        pptx_path: PPTX文件路径
+
+    Returns:
+        List[Dict]: [{'slide': 页码, 'text': 幻灯片文字, 'notes': 备注文字}]，段落之间以换行分隔
+    """
+    slides = []
+    with ZipMediaReader(str(pptx_path)) as reader:
+        for slide_idx, slide_part in enumerate(reader.get_slide_parts(), 1):
+            notes = []
+            for rel in reader.get_rels(slide_part):
+                if rel['type'] == RT_NOTES_SLIDE and not rel['external']:
+                    notes.extend(iter_part_paragraphs(reader, rel['target']))
+            slides.append({
+                'slide': slide_idx,
+                'text': '\n'.join(iter_part_paragraphs(reader, slide_part)),
+                'notes': '\n'.join(notes)
+            })
+    return slides
+
+
+def _extract_text_worker(pptx_path: str) -> Dict:
+    """进程池工作函数 - 提取单个PPT的文字，失败时返回错误信息"""
+    try:
+        return {'ppt': pptx_path, 'slides': extract_deck_text(pptx_path)}
+    except Exception as e:
+        return {'ppt': pptx_path, 'error': str(e)}
+
+
+def iter_pptx_files(folder_path: Path) -> Iterator[Path]:
+    """遍历文件夹中的所有PPTX文件（跳过Office临时锁文件）"""
+    for pptx_path in Path(folder_path).glob('**/*.pptx'):
+        if not pptx_path.name.startswith('~$'):
+            yield pptx_path
+
+
+def export_folder_text(folder_path: str, output_path: str, workers: int = 1,
+                       progress_callback=None) -> Dict:
+    """批量提取文件夹中所有PPTX的文字，写入JSONL文件
+
+    每页一行：{"ppt": 路径, "slide": 页码, "text": 文字, "notes": 备注}；
+    无法解析的PPT写入一行 {"ppt": 路径, "error": 错误信息}。
+    多进程并行解析，当前进程按提交顺序写入文件。
+
+    Args:
+        folder_path: PPT文件夹路径
+        output_path: 输出的JSONL文件路径
+        workers: 工作进程数
+        progress_callback: 进度回调函数
+
+    Returns:
+        Dict: {'decks': 处理的PPT数, 'slides': 写入的页数, 'failed': [失败信息列表]}
+    """
+    folder_path = Path(folder_path)
+    if not folder_path.exists():
+        raise FileNotFoundError(f"文件夹不存在: {folder_path}")
+
+    # 大文件先处理，避免末尾被单个大文件拖住
+    ppt_files = [str(task['path']) for task in plan_longest_first(list(iter_pptx_files(folder_path)))]
+    summary = {'decks': 0, 'slides': 0, 'failed': []}
+    if not ppt_files:
+        logger.warning(f"未在 {folder_path} 找到PPTX文件")
+        return summary
+
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as out:
+        if workers > 1:
+            executor = ProcessPoolExecutor(max_workers=workers)
+            results = executor.map(_extract_text_worker, ppt_files, chunksize=4)
+        else:
+            executor = None
+            results = map(_extract_text_worker, ppt_files)
+
+        try:
+            for current_idx, result in enumerate(tqdm(results, total=len(ppt_files), desc="提取PPT文字"), 1):
+                if progress_callback:
+                    progress_callback(current_idx, len(ppt_files), f"正在处理: {Path(result['ppt']).name}")
+
+                summary['decks'] += 1
+                if 'error' in result:
+                    logger.error(f"提取 {result['ppt']} 的文字时出错: {result['error']}")
+                    summary['failed'].append(result)
+                    out.write(json.dumps(result, ensure_ascii=False) + '\n')
+                    continue
+
+                for slide in result['slides']:
+                    out.write(json.dumps({'ppt': result['ppt'], **slide}, ensure_ascii=False) + '\n')
+                summary['slides'] += len(result['slides'])
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    return summary
@@ -0,0 +1,176 @@
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import logging
+import os
+import sqlite3
+import struct
+import threading
+import zipfile
+import zlib
+
+from .zip_media_reader import LOCAL_HEADER_SIGNATURE, LOCAL_HEADER_SIZE
+
+# 读取成员时为本地文件头扩展字段多读的字节数，绝大多数情况下一次读取即可拿到完整数据
+LOCAL_EXTRA_SLACK = 256
+
+# 内存中保留的已解析中央目录数量
+DEFAULT_MEMORY_ENTRIES = 64
+
+SUPPORTED_COMPRESSION = (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED)
+
+
+class ZipIndexCache:
+    """zip中央目录持久化缓存 - 按(路径, 大小, 修改时间)保存每个成员的位置
+
+    在网络共享上打开大PPT需要先定位并解析整个中央目录，只为读取其中一张图片时
+    代价远高于读取图片本身。缓存命中后读取任意成员只需一次定位和一次读取。
+    缓存保存在独立的SQLite文件中，文件大小或修改时间变化后自动重建。
+    """
+
+    def __init__(self, cache_path, memory_entries: int = DEFAULT_MEMORY_ENTRIES):
+        self.cache_path = Path(cache_path)
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        self.memory_entries = memory_entries
+        self.logger = logging.getLogger(__name__)
+        self._memory = OrderedDict()
+        # 缩略图加载线程与界面线程共用同一连接
+        self._lock = threading.Lock()
+        # 并行索引时多个工作进程可能同时写入缓存文件
+        self._conn = sqlite3.connect(str(self.cache_path), timeout=30, check_same_thread=False)
+        self._init_tables()
+
+    def _init_tables(self):
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS zip_decks (
+                    path TEXT PRIMARY KEY,
+                    file_size INTEGER,
+                    mtime_ns INTEGER
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS zip_members (
+                    path TEXT,
+                    name TEXT,
+                    header_offset INTEGER,
+                    compress_type INTEGER,
+                    compress_size INTEGER,
+                    file_size INTEGER,
+                    crc32 INTEGER,
+                    extra_len INTEGER,
+                    PRIMARY KEY (path, name)
+                )
+            """)
+
+    def close(self):
+        """关闭缓存数据库"""
+        with self._lock:
+            self._memory.clear()
+            self._conn.close()
+
+    def get_members(self, pptx_path: str) -> Dict[str, Tuple]:
+        """获取PPT的成员目录，缓存缺失或过期时重新解析中央目录
+
+        Returns:
+            Dict[str, Tuple]: {成员名: (header_offset, compress_type, compress_size,
+                                        file_size, crc32, extra_len)}
+        """
+        pptx_path = str(pptx_path)
+        stat = os.stat(pptx_path)
+        signature = (stat.st_size, stat.st_mtime_ns)
+
+        with self._lock:
+            cached = self._memory.get(pptx_path)
+            if cached is not None and cached[0] == signature:
+                self._memory.move_to_end(pptx_path)
+                return cached[1]
+
+            members = self._load(pptx_path, signature)
+            if members is None:
+                members = self._build(pptx_path, signature)
+
+            self._memory[pptx_path] = (signature, members)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+            return members
+
+    def _load(self, pptx_path: str, signature: Tuple[int, int]) -> Optional[Dict[str, Tuple]]:
+        """从缓存数据库加载成员目录，签名不一致时返回None"""
+        row = self._conn.execute(
+            "SELECT file_size, mtime_ns FROM zip_decks WHERE path = ?", (pptx_path,)
+        ).fetchone()
+        if row is None or tuple(row) != signature:
+            return None
+        rows = self._conn.execute(
+            """
+            SELECT name, header_offset, compress_type, compress_size, file_size, crc32, extra_len
+            FROM zip_members WHERE path = ?
+            """,
+            (pptx_path,)
+        ).fetchall()
+        return {row[0]: tuple(row[1:]) for row in rows}
+
+    def _build(self, pptx_path: str, signature: Tuple[int, int]) -> Dict[str, Tuple]:
+        """解析中央目录并写入缓存（只记录可直接解压的成员）"""
+        with zipfile.ZipFile(pptx_path) as zf:
+            members = {
+                info.filename: (
+                    info.header_offset, info.compress_type, info.compress_size,
+                    info.file_size, info.CRC, len(info.extra)
+                )
+                for info in zf.infolist()
+                if info.compress_type in SUPPORTED_COMPRESSION and not info.flag_bits & 0x1
+            }
+
+        with self._conn:
+            self._conn.execute("DELETE FROM zip_members WHERE path = ?", (pptx_path,))
+            self._conn.executemany(
+                """
+                INSERT INTO zip_members
+                (path, name, header_offset, compress_type, compress_size, file_size, crc32, extra_len)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [(pptx_path, name) + entry for name, entry in members.items()]
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO zip_decks (path, file_size, mtime_ns) VALUES (?, ?, ?)",
+                (pptx_path,) + signature
+            )
+        return members
+
+    def has_member(self, pptx_path: str, member: str) -> bool:
+        """判断PPT中是否存在该成员"""
+        return member in self.get_members(pptx_path)
+
+    def read(self, pptx_path: str, member: str) -> bytes:
+        """读取单个成员：一次定位、一次读取，再按需解压
+
+        Raises:
+            KeyError: 成员不存在
+            zipfile.BadZipFile: 本地文件头损坏或CRC校验失败
+        """
+        entry = self.get_members(pptx_path).get(member)
+        if entry is None:
+            raise KeyError(f"PPT中不存在成员 {member}: {pptx_path}")
+        header_offset, compress_type, compress_size, file_size, crc32, extra_len = entry
+
+        # 文件名和扩展字段长度以本地文件头为准，按中央目录的值预估并多读一些
+        name_len = len(member.encode('utf-8'))
+        span = LOCAL_HEADER_SIZE + name_len + extra_len + LOCAL_EXTRA_SLACK + compress_size
+        with open(pptx_path, 'rb') as f:
+            f.seek(header_offset)
+            buffer = f.read(span)
+            if len(buffer) < LOCAL_HEADER_SIZE or buffer[:4] != LOCAL_HEADER_SIGNATURE:
+                raise zipfile.BadZipFile(f"本地文件头损坏: {member}")
+            local_name_len, local_extra_len = struct.unpack('<HH', buffer[26:30])
+            data_start = LOCAL_HEADER_SIZE + local_name_len + local_extra_len
+            raw = buffer[data_start:data_start + compress_size]
+            if len(raw) < compress_size:
+                # 本地扩展字段超出预估，补读剩余部分
+                raw += f.read(compress_size - len(raw))
+
+        data = raw if compress_type == zipfile.ZIP_STORED else zlib.decompress(raw, -15)
+        if len(data) != file_size or zlib.crc32(data) != crc32:
+            raise zipfile.BadZipFile(f"CRC校验失败: {member}")
+        return data
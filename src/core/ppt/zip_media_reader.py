@@ -0,0 +1,356 @@
+import mmap
+import posixpath
+import struct
+import zipfile
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# OOXML命名空间
+NS_CONTENT_TYPES = 'http://schemas.openxmlformats.org/package/2006/content-types'
+NS_RELATIONSHIPS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+NS_PRESENTATION = 'http://schemas.openxmlformats.org/presentationml/2006/main'
+NS_OFFICE_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+
+RT_OFFICE_DOCUMENT = NS_OFFICE_REL + '/officeDocument'
+RT_IMAGE = NS_OFFICE_REL + '/image'
+RT_SLIDE_LAYOUT = NS_OFFICE_REL + '/slideLayout'
+RT_SLIDE_MASTER = NS_OFFICE_REL + '/slideMaster'
+RT_NOTES_SLIDE = NS_OFFICE_REL + '/notesSlide'
+# 图表、SmartArt等嵌入部件中的图片归属于引用它们的图形框
+RT_EMBEDDED_PARTS = (
+    NS_OFFICE_REL + '/chart',
+    NS_OFFICE_REL + '/diagramData',
+    NS_OFFICE_REL + '/diagramDrawing',
+)
+
+# 元素属性中引用关系ID的命名空间前缀（r:embed、r:link、r:id等）
+REL_ATTR_PREFIX = f"{{{NS_OFFICE_REL}}}"
+
+# zip本地文件头：固定30字节，之后是文件名和扩展字段
+LOCAL_HEADER_SIGNATURE = b'PK\x03\x04'
+LOCAL_HEADER_SIZE = 30
+
+
+def rels_path_for(part_name: str) -> str:
+    """获取部件对应的.rels文件路径，如 ppt/slides/slide1.xml -> ppt/slides/_rels/slide1.xml.rels"""
+    directory, name = posixpath.split(part_name)
+    return posixpath.join(directory, '_rels', f"{name}.rels")
+
+
+def part_for_rels(rels_name: str) -> str:
+    """获取.rels文件所属的部件路径（rels_path_for的逆运算），包级关系_rels/.rels返回空字符串"""
+    rels_dir, name = posixpath.split(rels_name)
+    return posixpath.join(posixpath.dirname(rels_dir), name[:-len('.rels')]).lstrip('/')
+
+
+def resolve_target(source_part: str, target: str) -> str:
+    """将关系中的相对Target解析为zip内的成员路径"""
+    if target.startswith('/'):
+        return posixpath.normpath(target.lstrip('/'))
+    base_dir = posixpath.dirname(source_part)
+    return posixpath.normpath(posixpath.join(base_dir, target))
+
+
+class ZipMediaReader:
+    """PPTX压缩包媒体读取器 - 直接读取zip中的ppt/media/*，不解析python-pptx对象模型
+
+    幻灯片归属通过presentation.xml中的幻灯片顺序和各部件的_rels文件确定。
+    每个.rels和部件XML只解析一次，即可得到媒体到(幻灯片, 部件, 形状ID)的完整引用关系，
+    覆盖组合形状、图片填充、表格、背景、版式、母版和备注中的图片。
+    """
+
+    def __init__(self, pptx_path: str):
+        self.pptx_path = Path(pptx_path)
+        self.zip_file = zipfile.ZipFile(str(self.pptx_path))
+        self._names = set(self.zip_file.namelist())
+        self._content_types = None
+        self._slide_parts = None
+        self._rels_cache = {}
+        self._shape_refs_cache = {}
+        self._visited_parts = set()
+        self._raw_file = None
+        self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """关闭压缩包（调用前需释放stored_view返回的所有视图）"""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._raw_file is not None:
+            self._raw_file.close()
+            self._raw_file = None
+        if self.zip_file:
+            self.zip_file.close()
+            self.zip_file = None
+
+    def _load_content_types(self) -> Dict[str, Dict[str, str]]:
+        """解析[Content_Types].xml"""
+        defaults, overrides = {}, {}
+        if '[Content_Types].xml' in self._names:
+            root = ET.fromstring(self.zip_file.read('[Content_Types].xml'))
+            for elem in root:
+                tag = elem.tag.rsplit('}', 1)[-1]
+                if tag == 'Default':
+                    defaults[elem.get('Extension', '').lower()] = elem.get('ContentType', '')
+                elif tag == 'Override':
+                    overrides[elem.get('PartName', '').lstrip('/')] = elem.get('ContentType', '')
+        return {'defaults': defaults, 'overrides': overrides}
+
+    def get_content_type(self, member: str) -> str:
+        """获取成员的内容类型"""
+        if self._content_types is None:
+            self._content_types = self._load_content_types()
+        if member in self._content_types['overrides']:
+            return self._content_types['overrides'][member]
+        ext = posixpath.splitext(member)[1].lstrip('.').lower()
+        return self._content_types['defaults'].get(ext, '')
+
+    def get_rels(self, part_name: str) -> List[Dict[str, str]]:
+        """解析部件的关系文件（结果缓存，每个.rels只解析一次）
+
+        Returns:
+            List[Dict]: [{'id', 'type', 'target', 'external'}]，target已解析为zip成员路径
+        """
+        if part_name in self._rels_cache:
+            return self._rels_cache[part_name]
+
+        rels = []
+        rels_name = rels_path_for(part_name) if part_name else '_rels/.rels'
+        if rels_name in self._names:
+            root = ET.fromstring(self.zip_file.read(rels_name))
+            for rel in root.iter(f"{{{NS_RELATIONSHIPS}}}Relationship"):
+                external = rel.get('TargetMode') == 'External'
+                target = rel.get('Target', '')
+                rels.append({
+                    'id': rel.get('Id'),
+                    'type': rel.get('Type', ''),
+                    'target': target if external else resolve_target(part_name, target),
+                    'external': external
+                })
+
+        self._rels_cache[part_name] = rels
+        return rels
+
+    def get_presentation_part(self) -> str:
+        """获取主演示文稿部件路径（通常为ppt/presentation.xml）"""
+        for rel in self.get_rels(''):
+            if rel['type'] == RT_OFFICE_DOCUMENT:
+                return rel['target']
+        return 'ppt/presentation.xml'
+
+    def get_slide_parts(self) -> List[str]:
+        """按放映顺序获取幻灯片部件路径"""
+        if self._slide_parts is not None:
+            return self._slide_parts
+
+        pres_part = self.get_presentation_part()
+        if pres_part not in self._names:
+            raise ValueError(f"无效的PPTX文件，缺少{pres_part}: {self.pptx_path}")
+
+        targets = {rel['id']: rel['target'] for rel in self.get_rels(pres_part)}
+
+        # 只读取sldIdLst，无需解析整个presentation.xml的其余内容
+        slide_parts = []
+        root = ET.fromstring(self.zip_file.read(pres_part))
+        sld_id_lst = root.find(f"{{{NS_PRESENTATION}}}sldIdLst")
+        if sld_id_lst is not None:
+            for sld_id in sld_id_lst:
+                target = targets.get(sld_id.get(f"{{{NS_OFFICE_REL}}}id"))
+                if target and target in self._names:
+                    slide_parts.append(target)
+
+        self._slide_parts = slide_parts
+        return slide_parts
+
+    def get_shape_refs(self, part_name: str) -> Dict[str, List[str]]:
+        """解析部件XML，获取每个关系ID被哪些形状引用（结果缓存）
+
+        形状ID取自包含引用的最内层形状的cNvPr id，组合形状内的图片归属于该图片本身，
+        表格单元格和形状的图片填充归属于所在的图形框或形状，背景中的引用记为'background'。
+
+        Returns:
+            Dict[str, List[str]]: {关系ID: [形状ID]}
+        """
+        if part_name in self._shape_refs_cache:
+            return self._shape_refs_cache[part_name]
+
+        refs = {}
+
+        def walk(elem, shape_id):
+            tag = elem.tag.rsplit('}', 1)[-1]
+            if tag == 'bg':
+                shape_id = 'background'
+            else:
+                # 形状的非可视属性（nvPicPr、nvSpPr、nvGrpSpPr、nvGraphicFramePr等）中的cNvPr
+                for child in elem:
+                    child_tag = child.tag.rsplit('}', 1)[-1]
+                    if child_tag.startswith('nv') and child_tag.endswith('Pr'):
+                        for prop in child:
+                            if prop.tag.endswith('}cNvPr') and prop.get('id'):
+                                shape_id = prop.get('id')
+                                break
+            for name, value in elem.attrib.items():
+                if name.startswith(REL_ATTR_PREFIX) and shape_id is not None:
+                    shape_ids = refs.setdefault(value, [])
+                    if shape_id not in shape_ids:
+                        shape_ids.append(shape_id)
+            for child in elem:
+                walk(child, shape_id)
+
+        if part_name in self._names:
+            walk(ET.fromstring(self.zip_file.read(part_name)), None)
+        self._shape_refs_cache[part_name] = refs
+        return refs
+
+    def _iter_part_media(self, part_name: str, slide_idx: int,
+                         owner_shape: Optional[str] = None) -> Iterator[Dict]:
+        """遍历单个部件（及其嵌入的图表、SmartArt部件）引用的图片"""
+        rels = [
+            rel for rel in self.get_rels(part_name)
+            if not rel['external'] and rel['target'] in self._names
+            and (rel['type'] == RT_IMAGE or rel['type'] in RT_EMBEDDED_PARTS)
+        ]
+        if not rels:
+            return
+
+        # 嵌入部件中的图片统一归属于引用该部件的形状，无需解析其XML
+        refs = self.get_shape_refs(part_name) if owner_shape is None else {}
+        for rel in rels:
+            member = rel['target']
+            shapes = [owner_shape] if owner_shape is not None else refs.get(rel['id'])
+            if rel['type'] in RT_EMBEDDED_PARTS:
+                owner = shapes[0] if shapes else rel['id']
+                if member not in self._visited_parts:
+                    self._visited_parts.add(member)
+                    yield from self._iter_part_media(member, slide_idx, owner)
+                continue
+            # XML中找不到引用（如VML等旧格式）时以关系ID代替形状ID
+            for shape in shapes or [rel['id']]:
+                yield {
+                    'member': member,
+                    'slide': slide_idx,
+                    'part': part_name,
+                    'shape': shape,
+                    'rel_id': rel['id'],
+                    'content_type': self.get_content_type(member),
+                    'ext': posixpath.splitext(member)[1].lower() or '.bin'
+                }
+
+    def iter_media(self) -> Iterator[Dict]:
+        """一次遍历关系图，产出所有被引用的图片
+
+        处理每页幻灯片，以及其关系中的备注页和首次用到的版式、母版。版式和母版中的图片
+        不属于某一页，slide记为0；每个部件只解析一次。
+
+        Yields:
+            Dict: {
+                'member': zip内媒体路径,
+                'slide': 幻灯片序号（从1开始，版式和母版为0）,
+                'part': 引用图片的部件路径,
+                'shape': 形状ID（cNvPr id，背景为'background'）,
+                'rel_id': 关系ID（如rId2）,
+                'content_type': 内容类型,
+                'ext': 扩展名（含点）
+            }
+        """
+        self._visited_parts = set()
+        for slide_idx, slide_part in enumerate(self.get_slide_parts(), 1):
+            yield from self._iter_part_media(slide_part, slide_idx)
+
+            for rel in self.get_rels(slide_part):
+                target = rel['target']
+                if rel['external'] or target not in self._names:
+                    continue
+                if rel['type'] == RT_NOTES_SLIDE:
+                    yield from self._iter_part_media(target, slide_idx)
+                elif rel['type'] == RT_SLIDE_LAYOUT and target not in self._visited_parts:
+                    self._visited_parts.add(target)
+                    yield from self._iter_part_media(target, 0)
+                    for layout_rel in self.get_rels(target):
+                        master = layout_rel['target']
+                        if layout_rel['type'] == RT_SLIDE_MASTER and master not in self._visited_parts:
+                            self._visited_parts.add(master)
+                            yield from self._iter_part_media(master, 0)
+
+    def has_member(self, member: str) -> bool:
+        """判断压缩包中是否存在该成员"""
+        return member in self._names
+
+    def read(self, member: str) -> bytes:
+        """读取成员的完整字节内容"""
+        return self.zip_file.read(member)
+
+    def open(self, member: str):
+        """以流的方式打开成员，按需解压，不把整个成员读入内存"""
+        return self.zip_file.open(member)
+
+    def get_info(self, member: str) -> Optional[zipfile.ZipInfo]:
+        """获取成员的ZipInfo（包含CRC32、压缩方式和大小）"""
+        try:
+            return self.zip_file.getinfo(member)
+        except KeyError:
+            return None
+
+    def get_stored_range(self, member: str) -> Optional[Tuple[int, int]]:
+        """获取未压缩（STORED）成员在PPTX文件中的数据区间
+
+        JPEG、PNG等已压缩格式在PPTX中通常以STORED方式存放，其数据就是文件中的一段连续字节。
+
+        Returns:
+            Optional[Tuple[int, int]]: (数据起始偏移, 长度)，压缩或加密的成员返回None
+        """
+        info = self.get_info(member)
+        if info is None or info.compress_type != zipfile.ZIP_STORED:
+            return None
+        return self.get_raw_range(member)
+
+    def get_raw_range(self, member: str) -> Optional[Tuple[int, int]]:
+        """获取成员原始（压缩后）数据在PPTX文件中的区间，用于不解压直接复制成员
+
+        Returns:
+            Optional[Tuple[int, int]]: (数据起始偏移, 压缩后长度)，加密或本地文件头损坏的成员返回None
+        """
+        info = self.get_info(member)
+        if info is None or info.flag_bits & 0x1:
+            return None
+
+        # 中央目录与本地文件头的扩展字段长度可能不同，以本地文件头为准
+        raw = self._get_raw_file()
+        raw.seek(info.header_offset)
+        header = raw.read(LOCAL_HEADER_SIZE)
+        if len(header) < LOCAL_HEADER_SIZE or header[:4] != LOCAL_HEADER_SIGNATURE:
+            return None
+        name_len, extra_len = struct.unpack('<HH', header[26:30])
+        return info.header_offset + LOCAL_HEADER_SIZE + name_len + extra_len, info.compress_size
+
+    def stored_view(self, member: str) -> Optional[memoryview]:
+        """以内存映射视图的方式访问未压缩成员，不产生字节拷贝
+
+        Returns:
+            Optional[memoryview]: 成员数据的只读视图，非STORED成员返回None。
+                                  使用完毕后需调用release()（或用with语句）释放
+        """
+        data_range = self.get_stored_range(member)
+        if data_range is None:
+            return None
+        offset, size = data_range
+        if self._mmap is None:
+            self._mmap = mmap.mmap(self._get_raw_file().fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(self._mmap)[offset:offset + size]
+
+    def raw_fileno(self) -> int:
+        """PPTX文件的底层文件描述符，供os.copy_file_range直接复制数据区间"""
+        return self._get_raw_file().fileno()
+
+    def _get_raw_file(self):
+        """独立于ZipFile打开的原始文件句柄，用于读取本地文件头和内存映射"""
+        if self._raw_file is None:
+            self._raw_file = open(str(self.pptx_path), 'rb')
+        return self._raw_file
@@ -1,5 +1,5 @@
 from PyQt6.QtCore import QThread, pyqtSignal
-import os
+from ....core.images.deck_media_cache import get_deck_media_cache
 
 class ImageLoader(QThread):
     """图片加载线程"""
@@ -37,7 +37,7 @@ class ImageLoader(QThread):
                         return
                         
                     try:
-                        if not os.path.exists(img_info['path']):
+                        if not get_deck_media_cache().exists(img_info['path']):
                             continue
                         
                         # 获取或创建缩略图
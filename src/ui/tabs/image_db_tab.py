@@ -10,6 +10,9 @@ from PyQt6.QtWidgets import QApplication
 import os
 from pathlib import Path
 from .base_tab import BaseTab
+from ...utils.config.settings import Settings
+from ...core.images.deck_media_cache import get_deck_media_cache, local_path_for
+from ...core.ppt.source_readers import iter_source_files
 from PIL import Image
 import win32clipboard
 import win32con
@@ -57,7 +60,7 @@ class ImageLoader(QThread):
                         return
                         
                     try:
-                        if not os.path.exists(img_info['path']):
+                        if not get_deck_media_cache().exists(img_info['path']):
                             continue
                         
                         # 获取或创建缩略图
@@ -146,6 +149,9 @@ class ImageDBTab(BaseTab):
             if lib_path:
                 self.image_lib_path.setText(lib_path)
             
+            # 加载PPT目录
+            self._load_deck_catalog()
+            
             # 更新标签过滤器
             self._update_tag_filter()
             
@@ -234,9 +240,28 @@ class ImageDBTab(BaseTab):
         settings_layout.addWidget(self.db_status_label)
         settings_group.setLayout(settings_layout)
         
+        # 3. PPT目录（文档属性和缩略图，来自扫描时的编目）
+        catalog_group = QGroupBox("PPT目录")
+        catalog_layout = QVBoxLayout()
+        
+        self.deck_table = QTableWidget()
+        self.deck_table.setColumnCount(4)
+        self.deck_table.setHorizontalHeaderLabels(["标题", "作者", "修改时间", "页数"])
+        self.deck_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.deck_table.setIconSize(QSize(64, 48))
+        self.deck_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.deck_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.deck_table.itemDoubleClicked.connect(
+            lambda item: self._open_ppt_file(self.deck_table.item(item.row(), 0).data(Qt.ItemDataRole.UserRole))
+        )
+        
+        catalog_layout.addWidget(self.deck_table)
+        catalog_group.setLayout(catalog_layout)
+        
         # 添加到左侧面板
         left_layout.addWidget(source_group)
         left_layout.addWidget(settings_group)
+        left_layout.addWidget(catalog_group)
         left_layout.addStretch()
         
         # 右侧面板：图片显示区域
@@ -361,9 +386,13 @@ class ImageDBTab(BaseTab):
             for row in range(self.source_table.rowCount()):
                 folder_path = self.source_table.item(row, 0).text()
                 
-                # 统计PPT文件数量
-                ppt_count = sum(1 for f in Path(folder_path).rglob('*.ppt*')
-                              if not f.name.startswith('~$'))
+                # 统计来源文件数量（PPT、DOCX、Keynote、PDF）
+                ppt_count = sum(1 for _ in iter_source_files(Path(folder_path)))
+                
+                # 编目PPTX（只读取docProps，未变化的PPT跳过）
+                self.ppt_processor.catalog_folder(
+                    folder_path, workers=Settings().EXTRACT_CONFIG['workers']
+                )
                 
                 # 更新状态
                 status_item = QTableWidgetItem(f"已找到 {ppt_count} 个PPT")
@@ -374,12 +403,44 @@ class ImageDBTab(BaseTab):
             
             # 更新数据库状态
             self.db_status_label.setText(f"数据库状态: 共发现 {total_ppts} 个PPT文件")
+            self._load_deck_catalog()
             
         except Exception as e:
             QMessageBox.critical(self, "错误", f"扫描文件夹时出错：{str(e)}")
         finally:
             self.image_progress_bar.setVisible(False)
 
+    def _load_deck_catalog(self):
+        """从PPT目录表加载PPT列表（缩略图和属性已在编目时读取，无需打开PPT）"""
+        catalog = self.ppt_processor.deck_catalog
+        if catalog is None:
+            return
+        
+        self.deck_table.setSortingEnabled(False)
+        self.deck_table.setRowCount(0)
+        for deck in catalog.list_decks():
+            row = self.deck_table.rowCount()
+            self.deck_table.insertRow(row)
+            
+            title_item = QTableWidgetItem(deck['title'] or Path(deck['pptx_path']).stem)
+            title_item.setData(Qt.ItemDataRole.UserRole, deck['pptx_path'])
+            title_item.setToolTip(deck['pptx_path'])
+            if deck['has_thumbnail']:
+                pixmap = QPixmap()
+                if pixmap.loadFromData(catalog.get_thumbnail(deck['pptx_path'])):
+                    title_item.setIcon(QIcon(pixmap))
+            
+            # 页数按数值排序
+            count_item = QTableWidgetItem()
+            count_item.setData(Qt.ItemDataRole.DisplayRole, deck['slide_count'] or 0)
+            
+            self.deck_table.setItem(row, 0, title_item)
+            self.deck_table.setItem(row, 1, QTableWidgetItem(deck['author'] or ''))
+            # W3CDTF日期按字符串排序即按时间排序
+            self.deck_table.setItem(row, 2, QTableWidgetItem((deck['modified'] or '').replace('T', ' ').rstrip('Z')))
+            self.deck_table.setItem(row, 3, count_item)
+        self.deck_table.setSortingEnabled(True)
+
     def _browse_image_lib(self):
         """选择图片库位置"""
         folder_path = QFileDialog.getExistingDirectory(self, "选择图片库位置")
@@ -400,7 +461,8 @@ class ImageDBTab(BaseTab):
             return
         
         try:
-            image_processor = self.ppt_processor.get_image_processor()
+            ppt_extractor = self.ppt_processor.ppt_extractor
+            extract_config = Settings().EXTRACT_CONFIG
             
             # 示进度条
             self.image_progress_bar.setVisible(True)
@@ -410,55 +472,32 @@ class ImageDBTab(BaseTab):
             # 处理每个源文件夹
             for row in range(self.source_table.rowCount()):
                 folder_path = self.source_table.item(row, 0).text()
-                
-                # 统计PPT文件数量
-                ppt_files = list(Path(folder_path).rglob('*.ppt*'))
-                ppt_files = [f for f in ppt_files if not f.name.startswith('~$')]
-                
-                # 设置进度最大值（每个PPT文100个单位）
-                self.image_progress_bar.setMaximum(len(ppt_files) * 100)
                 self.image_progress_bar.setValue(0)
                 
-                # 遍历所有PPT文件
-                for ppt_idx, ppt_file in enumerate(ppt_files, 1):
-                    try:
-                        # 更新状态
-                        self.source_table.setItem(
-                            row, 1,
-                            QTableWidgetItem(f"正在处理: {ppt_file.name}")
-                        )
-                        
-                        def update_progress(current, total, message):
-                            # 计算当前PPT的进度（0-100）
-                            progress = int((current / total) * 100)
-                            # 计算总进度
-                            total_progress = (ppt_idx - 1) * 100 + progress
-                            self.image_progress_bar.setValue(total_progress)
-                            
-                            self.source_table.setItem(
-                                row, 1,
-                                QTableWidgetItem(f"{message} - {ppt_file.name}")
-                            )
-                            QApplication.processEvents()
-                        
-                        # 提取图片
-                        extracted = image_processor.extract_background_images(
-                            str(ppt_file),
-                            self.image_lib_path.text(),
-                            progress_callback=update_progress
-                        )
-                        
-                        total_images += len(extracted)
-                        total_ppts += 1
-                        
-                    except Exception as e:
-                        print(f"处理 {ppt_file} 时出错: {str(e)}")
-                        continue
-                    
-                    # 更新进度条到当前PPT的100%
-                    self.image_progress_bar.setValue(ppt_idx * 100)
+                def update_progress(current, total, message, row=row):
+                    self.image_progress_bar.setMaximum(total)
+                    self.image_progress_bar.setValue(current)
+                    self.source_table.setItem(
+                        row, 1,
+                        QTableWidgetItem(f"{message} ({current}/{total})")
+                    )
                     QApplication.processEvents()
                 
+                # 提取图片（多进程并行提取，当前进程统一写库）
+                processed_before = ppt_extractor.total_processed_ppts
+                results = ppt_extractor.extract_images_from_folder(
+                    folder_path,
+                    self.image_lib_path.text(),
+                    progress_callback=update_progress,
+                    workers=extract_config['workers'],
+                    virtual=extract_config['virtual_library']
+                )
+                for failed in results['failed']:
+                    print(f"处理 {failed['path']} 时出错: {failed['error']}")
+                
+                total_images += len(results['success'])
+                total_ppts += ppt_extractor.total_processed_ppts - processed_before
+                
                 # 更新最状态
                 self.source_table.setItem(
                     row, 1,
@@ -605,6 +644,7 @@ class ImageDBTab(BaseTab):
                         }
                     ppt_groups[ppt_path]['slides'].append({
                         'slide': mapping['slide'],
+                        'part': mapping['part'],
                         'shape': mapping['shape']
                     })
                 
@@ -629,9 +669,12 @@ class ImageDBTab(BaseTab):
                             # 按页码排序
                             sorted_slides = sorted(info['slides'], key=lambda x: x['slide'])
                             for slide_info in sorted_slides:
-                                slide_action = ppt_submenu.addAction(
-                                    f"第 {slide_info['slide']} 页"
-                                )
+                                # 版式和母版中的图片不属于某一页，显示部件名
+                                if slide_info['slide']:
+                                    label = f"第 {slide_info['slide']} 页"
+                                else:
+                                    label = Path(slide_info['part']).stem
+                                slide_action = ppt_submenu.addAction(label)
                                 # 这里可以添加跳转到具体页面的功能
                 
                 # 添加其他菜单项
@@ -643,8 +686,61 @@ class ImageDBTab(BaseTab):
                 copy_action = menu.addAction("复制图片")
                 copy_action.triggered.connect(lambda: self._copy_image(item))
                 
+                if ppt_groups:
+                    replace_action = menu.addAction("在所有PPT中替换此图片...")
+                    replace_action.triggered.connect(
+                        lambda: self._replace_image_everywhere(image_info['hash'], len(ppt_groups))
+                    )
+                
                 menu.exec(self.image_grid.mapToGlobal(pos))
 
+    def _replace_image_everywhere(self, img_hash: str, ppt_count: int):
+        """选择新图片，替换所有使用该图片的PPT中的媒体"""
+        new_image_path, _ = QFileDialog.getOpenFileName(
+            self, "选择新图片", "", "Images (*.png *.jpg *.jpeg *.gif *.bmp *.tif *.tiff *.emf *.wmf)"
+        )
+        if not new_image_path:
+            return
+        
+        reply = QMessageBox.question(
+            self, "确认",
+            f"将直接修改 {ppt_count} 个PPT文件，用所选图片替换此图片，是否继续？",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+        
+        try:
+            self.image_progress_bar.setVisible(True)
+            
+            def update_progress(current, total, message):
+                self.image_progress_bar.setMaximum(total)
+                self.image_progress_bar.setValue(current)
+                QApplication.processEvents()
+            
+            result = self.ppt_processor.replace_image_everywhere(
+                img_hash, new_image_path,
+                workers=Settings().EXTRACT_CONFIG['workers'],
+                progress_callback=update_progress
+            )
+            
+            message = f"已在 {result['decks']} 个PPT中替换 {result['members']} 个图片"
+            if result['skipped']:
+                message += f"\n跳过 {len(result['skipped'])} 个PPT（非PPTX、文件不存在或已不含此图片）"
+            if result['failed']:
+                message += f"\n{len(result['failed'])} 个PPT替换失败"
+                for failed in result['failed']:
+                    print(f"替换 {failed['ppt']} 中的图片时出错: {failed['error']}")
+            QMessageBox.information(self, "完成", message)
+            
+            # 刷新图片显示
+            self._display_database_images()
+            
+        except Exception as e:
+            QMessageBox.critical(self, "错误", f"替换图片时出错：{str(e)}")
+        finally:
+            self.image_progress_bar.setVisible(False)
+
     def _find_source_ppt(self, item):
         """查找图片所在的PPT文件"""
         if not item:
@@ -666,7 +762,7 @@ class ImageDBTab(BaseTab):
             os.system(f'open -R "{ppt_path}"')
 
     def _open_image_folder(self, item):
-        """打开图片所在文件夹"""
+        """打开图片所在文件夹（虚拟图库中的图片定位到所在的PPT）"""
         if not item:
             return
         
@@ -674,7 +770,7 @@ class ImageDBTab(BaseTab):
         if not image_info or 'path' not in image_info:
             return
         
-        image_path = image_info['path']
+        image_path = local_path_for(image_info['path'])
         if not Path(image_path).exists():
             QMessageBox.warning(self, "警告", "图片文件已不存在")
             return
@@ -695,13 +791,14 @@ class ImageDBTab(BaseTab):
             return
         
         image_path = image_info['path']
-        if not Path(image_path).exists():
+        media_cache = get_deck_media_cache()
+        if not media_cache.exists(image_path):
             QMessageBox.warning(self, "警告", "图片文件已不存在")
             return
         
         try:
-            # 使用PIL打开图片以检查格式
-            with Image.open(image_path) as pil_img:
+            # 使用PIL打开图片以检查格式（虚拟图库中的图片从PPT中按需读取）
+            with media_cache.open_image(image_path) as pil_img:
                 # 如果是PNG且有透明通道
                 if pil_img.format == 'PNG' and pil_img.mode == 'RGBA':
                     # 将图片保存到内存中
@@ -723,7 +820,7 @@ class ImageDBTab(BaseTab):
                     return
                 
                 # 对于其他格式的图片，使用常规方式复制
-                qimage = QImage(image_path)
+                qimage = QImage.fromData(media_cache.read(image_path))
                 QApplication.clipboard().setImage(qimage)
                 
         except Exception as e:
@@ -8,7 +8,7 @@ import os
 from pathlib import Path
 from .base_tab import BaseTab
 from PyQt6.QtCore import QSettings
-from PyQt6.QtGui import QDragEnterEvent, QDropEvent
+from PyQt6.QtGui import QDragEnterEvent, QDropEvent, QPixmap
 
 class PPTTab(BaseTab):
     def __init__(self, ppt_processor, parent=None):
@@ -33,6 +33,16 @@ class PPTTab(BaseTab):
         ppt_layout.addWidget(self.ppt_path_input, 0, 1)
         ppt_layout.addWidget(ppt_browse_btn, 0, 2)
         
+        # PPT预览（缩略图和文档属性，只读取docProps）
+        self.ppt_thumbnail = QLabel()
+        self.ppt_thumbnail.setFixedSize(160, 120)
+        self.ppt_thumbnail.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.ppt_info = QLabel()
+        self.ppt_info.setWordWrap(True)
+        ppt_layout.addWidget(self.ppt_thumbnail, 1, 0)
+        ppt_layout.addWidget(self.ppt_info, 1, 1, 1, 2)
+        self.ppt_path_input.textChanged.connect(self._update_deck_preview)
+        
         ppt_group.setLayout(ppt_layout)
         self.layout.addWidget(ppt_group)
         
@@ -100,8 +110,12 @@ class PPTTab(BaseTab):
         adjust_text_btn = QPushButton("调整文本框")
         adjust_text_btn.clicked.connect(self._adjust_ppt_textboxes)
         
+        slim_ppt_btn = QPushButton("精简PPT（压缩图片）")
+        slim_ppt_btn.clicked.connect(self._slim_ppt)
+        
         quick_actions_layout.addWidget(clean_master_btn)
         quick_actions_layout.addWidget(adjust_text_btn)
+        quick_actions_layout.addWidget(slim_ppt_btn)
         
         quick_actions_group.setLayout(quick_actions_layout)
         self.layout.addWidget(quick_actions_group)
@@ -137,6 +151,35 @@ class PPTTab(BaseTab):
                 default_output = os.path.join(os.path.dirname(file_path), 'images')
                 self.output_folder_input.setText(default_output)
 
+    def _update_deck_preview(self, file_path: str):
+        """显示PPT的缩略图、标题、作者、修改时间和页数"""
+        self.ppt_thumbnail.clear()
+        self.ppt_info.clear()
+        if not file_path.lower().endswith('.pptx') or not os.path.isfile(file_path):
+            return
+        
+        try:
+            properties = self.ppt_processor.get_deck_properties(file_path)
+        except Exception:
+            # 文件损坏或不是PPTX时不显示预览
+            return
+        
+        if properties['thumbnail']:
+            pixmap = QPixmap()
+            if pixmap.loadFromData(properties['thumbnail']):
+                self.ppt_thumbnail.setPixmap(pixmap.scaled(
+                    self.ppt_thumbnail.size(), Qt.AspectRatioMode.KeepAspectRatio,
+                    Qt.TransformationMode.SmoothTransformation
+                ))
+        
+        lines = [f"标题: {properties['title'] or Path(file_path).stem}"]
+        if properties['author']:
+            lines.append(f"作者: {properties['author']}")
+        if properties['modified']:
+            lines.append(f"修改时间: {properties['modified'].replace('T', ' ').rstrip('Z')}")
+        lines.append(f"页数: {properties['slide_count']}")
+        self.ppt_info.setText("\n".join(lines))
+
     def _browse_output_folder(self):
         """选择图片输出文件夹"""
         folder_path = QFileDialog.getExistingDirectory(self, "选择图片保存位置")
@@ -184,10 +227,11 @@ class PPTTab(BaseTab):
             
             # 显示结果
             if extracted_images:
+                unique_count = len({img['hash'] for img in extracted_images})
                 QMessageBox.information(
                     self,
                     "完成",
-                    f"成功提取 {len(extracted_images)} 张图片\n保存位置：{output_folder}"
+                    f"成功提取 {unique_count} 张图片（共 {len(extracted_images)} 处引用）\n保存位置：{output_folder}"
                 )
                 
                 # 打开输出文件夹
@@ -223,7 +267,7 @@ class PPTTab(BaseTab):
             QMessageBox.information(
                 self,
                 "完成",
-                f"清理完成，共移除{cleaned_count}个未使用的布局"
+                f"清理完成，共移除{cleaned_count}个未使用的母版、布局和占位符"
             )
             
         except Exception as e:
@@ -245,16 +289,45 @@ class PPTTab(BaseTab):
             self.ppt_processor.open_presentation(self.ppt_path_input.text())
             
             # 调整文本框
-            self.ppt_processor.adjust_text_boxes()
+            adjusted_count = self.ppt_processor.adjust_text_boxes()
             
             # 显示结果
-            QMessageBox.information(self, "完成", "文本框调整完成")
+            QMessageBox.information(self, "完成", f"文本框调整完成，共调整{adjusted_count}个文本框")
             
         except Exception as e:
             QMessageBox.critical(self, "错误", f"调整文本框时出错：{str(e)}")
         finally:
             self.ppt_progress_bar.setVisible(False)
 
+    def _slim_ppt(self):
+        """精简PPT中的图片"""
+        if not self._check_ppt_file():
+            return
+        
+        try:
+            # 显示进度条
+            self.ppt_progress_bar.setVisible(True)
+            self.ppt_progress_bar.setMaximum(0)  # 显示忙碌状态
+            
+            # 打开PPT文件
+            self.ppt_processor.open_presentation(self.ppt_path_input.text())
+            
+            # 精简图片
+            result = self.ppt_processor.slim_presentation()
+            saved_mb = (result['size_before'] - result['size_after']) / (1024 * 1024)
+            
+            # 显示结果
+            QMessageBox.information(
+                self,
+                "完成",
+                f"精简完成，重新采样{len(result['images'])}张图片，文件减小{saved_mb:.1f}MB"
+            )
+            
+        except Exception as e:
+            QMessageBox.critical(self, "错误", f"精简PPT时出错：{str(e)}")
+        finally:
+            self.ppt_progress_bar.setVisible(False)
+
     def _extract_ppt_text(self):
         """提取PPT中的所有文字"""
         if not self._check_ppt_file():
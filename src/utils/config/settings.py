@@ -25,6 +25,22 @@ class Settings:
             ]
         }
         
+        # PPT图片提取配置
+        self.EXTRACT_CONFIG = {
+            'workers': int(os.getenv('EXTRACT_WORKERS', str(os.cpu_count() or 1))),
+            # 单个工作进程在内存中缓冲媒体的上限，超过的媒体分块流式写入磁盘
+            'memory_limit_mb': int(os.getenv('EXTRACT_MEMORY_LIMIT_MB', '64')),
+            'chunk_size': 1024 * 1024,
+            # 虚拟图库：不复制图片，只记录图片所在的PPT和成员，查看时按需读取
+            'virtual_library': os.getenv('EXTRACT_VIRTUAL_LIBRARY', '0').lower() in ('1', 'true', 'yes')
+        }
+        
+        # PPT精简配置：图片按显示尺寸和目标DPI重新采样
+        self.SLIM_CONFIG = {
+            'target_dpi': int(os.getenv('SLIM_TARGET_DPI', '150')),
+            'jpeg_quality': int(os.getenv('SLIM_JPEG_QUALITY', '85'))
+        }
+        
         # AI服务配置
         self.AI_SERVICE_CONFIG = {
             'clip': {
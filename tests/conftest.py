@@ -12,4 +12,84 @@ def test_data_dir():
     """创建测试数据目录"""
     test_dir = tempfile.mkdtemp()
     yield test_dir
-    shutil.rmtree(test_dir) 
\ No newline at end of file
+    shutil.rmtree(test_dir) 
+
+PNG_1X1 = bytes.fromhex(
+    '89504e470d0a1a0a0000000d4948445200000001000000010806000000'
+    '1f15c4890000000d49444154789c6360000002000100e221bc330000000049454e44ae426082'
+)
+
+
+def build_pptx(path: Path, slides, media=None, compress_media=False):
+    """构建最小化的PPTX测试文件
+
+    Args:
+        path: 输出路径
+        slides: 每页引用的媒体文件名列表，如 [['image1.png'], []]
+        media: 媒体文件名到字节内容的映射，默认全部使用1x1 PNG
+        compress_media: 是否压缩媒体，默认与PowerPoint一致以STORED方式存放
+    """
+    import zipfile
+
+    media = media or {}
+    names = sorted({name for refs in slides for name in refs} | set(media))
+    ns_rel = 'http://schemas.openxmlformats.org/package/2006/relationships'
+    rt = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+
+    with zipfile.ZipFile(str(path), 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr('[Content_Types].xml', (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="png" ContentType="image/png"/>'
+            '<Default Extension="jpeg" ContentType="image/jpeg"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '</Types>'
+        ))
+        zf.writestr('_rels/.rels', (
+            f'<Relationships xmlns="{ns_rel}">'
+            f'<Relationship Id="rId1" Type="{rt}/officeDocument" Target="ppt/presentation.xml"/>'
+            '</Relationships>'
+        ))
+        sld_ids = ''.join(
+            f'<p:sldId id="{256 + i}" r:id="rId{i + 1}"/>' for i in range(len(slides))
+        )
+        zf.writestr('ppt/presentation.xml', (
+            '<p:presentation xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main" '
+            f'xmlns:r="{rt}"><p:sldIdLst>{sld_ids}</p:sldIdLst></p:presentation>'
+        ))
+        zf.writestr('ppt/_rels/presentation.xml.rels', (
+            f'<Relationships xmlns="{ns_rel}">' + ''.join(
+                f'<Relationship Id="rId{i + 1}" Type="{rt}/slide" Target="slides/slide{i + 1}.xml"/>'
+                for i in range(len(slides))
+            ) + '</Relationships>'
+        ))
+        for i, refs in enumerate(slides, 1):
+            pics = ''.join(
+                '<p:pic><p:nvPicPr><p:cNvPr id="%d" name="Picture %d"/></p:nvPicPr>'
+                '<p:blipFill><a:blip r:embed="rId%d"/></p:blipFill></p:pic>' % (j + 2, j + 1, j + 1)
+                for j in range(len(refs))
+            )
+            zf.writestr(f'ppt/slides/slide{i}.xml', (
+                '<p:sld xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main" '
+                'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" '
+                f'xmlns:r="{rt}"><p:cSld><p:spTree>{pics}</p:spTree></p:cSld></p:sld>'
+            ))
+            zf.writestr(f'ppt/slides/_rels/slide{i}.xml.rels', (
+                f'<Relationships xmlns="{ns_rel}">' + ''.join(
+                    f'<Relationship Id="rId{j + 1}" Type="{rt}/image" Target="../media/{name}"/>'
+                    for j, name in enumerate(refs)
+                ) + '</Relationships>'
+            ))
+        for name in names:
+            zf.writestr(f'ppt/media/{name}', media.get(name, PNG_1X1),
+                        zipfile.ZIP_DEFLATED if compress_media else zipfile.ZIP_STORED)
+    return path
+
+
+@pytest.fixture
+def make_pptx(tmp_path):
+    """返回在临时目录中构建PPTX测试文件的函数"""
+    def _make(name, slides, media=None, compress_media=False):
+        return build_pptx(tmp_path / name, slides, media, compress_media)
+    return _make
@@ -0,0 +1,86 @@
+"""
+测试从docProps编目PPT
+"""
+
+import os
+import zipfile
+from src.core.database.db_manager import DatabaseManager
+from src.core.ppt.deck_catalog import DeckCatalog, read_deck_properties
+
+NS_REL = 'http://schemas.openxmlformats.org/package/2006/relationships'
+RT_META = 'http://schemas.openxmlformats.org/package/2006/relationships/metadata'
+RT_DOC = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+
+
+def _build_deck(path, title, modified, slides=None, thumbnail=b'\xff\xd8thumb'):
+    rels = (
+        f'<Relationships xmlns="{NS_REL}">'
+        f'<Relationship Id="rId1" Type="{RT_DOC}/officeDocument" Target="ppt/presentation.xml"/>'
+        f'<Relationship Id="rId2" Type="{RT_META}/thumbnail" Target="docProps/thumbnail.jpeg"/>'
+        f'<Relationship Id="rId3" Type="{RT_META}/core-properties" Target="docProps/core.xml"/>'
+        f'<Relationship Id="rId4" Type="{RT_DOC}/extended-properties" Target="docProps/app.xml"/>'
+        '</Relationships>'
+    )
+    core = (
+        '<cp:coreProperties xmlns:cp="http://schemas.openxmlformats.org/package/2006/metadata/core-properties" '
+        'xmlns:dc="http://purl.org/dc/elements/1.1/" xmlns:dcterms="http://purl.org/dc/terms/">'
+        f'<dc:title>{title}</dc:title><dc:creator>张三</dc:creator>'
+        f'<dcterms:modified>{modified}</dcterms:modified></cp:coreProperties>'
+    )
+    app = (
+        '<Properties xmlns="http://schemas.openxmlformats.org/officeDocument/2006/extended-properties">'
+        + (f'<Slides>{slides}</Slides>' if slides is not None else '') + '</Properties>'
+    )
+    presentation = (
+        '<p:presentation xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main"/>'
+    )
+    with zipfile.ZipFile(path, 'w') as zf:
+        zf.writestr('_rels/.rels', rels)
+        zf.writestr('docProps/core.xml', core)
+        zf.writestr('docProps/app.xml', app)
+        zf.writestr('docProps/thumbnail.jpeg', thumbnail)
+        zf.writestr('ppt/presentation.xml', presentation)
+    return path
+
+
+def test_read_deck_properties(tmp_path):
+    deck = _build_deck(tmp_path / 'a.pptx', '季度汇报', '2024-03-01T08:00:00Z', slides=12)
+
+    properties = read_deck_properties(deck)
+
+    assert properties['title'] == '季度汇报'
+    assert properties['author'] == '张三'
+    assert properties['modified'] == '2024-03-01T08:00:00Z'
+    assert properties['slide_count'] == 12
+    assert properties['thumbnail'] == b'\xff\xd8thumb'
+    # app.xml缺少页数时按presentation.xml计数
+    assert read_deck_properties(_build_deck(tmp_path / 'b.pptx', 'b', '2024-01-01T00:00:00Z'))['slide_count'] == 0
+
+
+def test_catalog_skips_unchanged_and_removes_deleted(tmp_path):
+    folder = tmp_path / 'decks'
+    folder.mkdir()
+    _build_deck(folder / 'old.pptx', '旧版', '2023-05-01T00:00:00Z', slides=3)
+    new = _build_deck(folder / 'new.pptx', '新版', '2024-05-01T00:00:00Z', slides=5)
+    (folder / 'broken.pptx').write_bytes(b'not a zip')
+    db = DatabaseManager(tmp_path / 'app')
+    catalog = DeckCatalog(db)
+
+    summary = catalog.update_folder(str(folder))
+    assert (summary['decks'], summary['updated'], len(summary['failed'])) == (3, 2, 1)
+    assert [deck['title'] for deck in catalog.list_decks()] == ['新版', '旧版']
+    assert [deck['slide_count'] for deck in catalog.list_decks(order_by='slide_count', descending=False)] == [3, 5]
+    assert catalog.get_thumbnail(str(new)) == b'\xff\xd8thumb'
+
+    (folder / 'broken.pptx').unlink()
+    _build_deck(new, '新版v2', '2024-06-01T00:00:00Z', slides=6)
+    stat = new.stat()
+    os.utime(new, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    summary = catalog.update_folder(str(folder))
+    assert (summary['decks'], summary['updated'], summary['removed']) == (2, 1, 0)
+    assert catalog.list_decks()[0]['title'] == '新版v2'
+
+    (folder / 'old.pptx').unlink()
+    assert catalog.update_folder(str(folder))['removed'] == 1
+    assert [deck['title'] for deck in catalog.list_decks()] == ['新版v2']
+    db.close()
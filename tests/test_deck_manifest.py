@@ -0,0 +1,36 @@
+"""
+测试PPT变更清单（增量索引）
+"""
+
+import os
+from src.core.database.db_manager import DatabaseManager
+from src.core.ppt.deck_manifest import DeckManifest
+
+
+def test_partition_detects_new_unchanged_modified_and_deleted(tmp_path, make_pptx):
+    """测试新增、未变化、修改和删除的PPT划分"""
+    db = DatabaseManager(tmp_path / "app")
+    manifest = DeckManifest(db)
+    keep = make_pptx('keep.pptx', [['image1.png']])
+    edit = make_pptx('edit.pptx', [['image1.png']])
+    gone = make_pptx('gone.pptx', [['image1.png']])
+
+    changed, unchanged, deleted = manifest.partition(tmp_path, [keep, edit, gone])
+    assert [path for path, _ in changed] == [keep, edit, gone]
+    assert not any(entry['modified'] for _, entry in changed)
+    for path, entry in changed:
+        manifest.record(path, entry)
+
+    # 仅修改时间变化的文件视为未变化
+    os.utime(keep, ns=(0, 0))
+    make_pptx('edit.pptx', [['image1.png'], ['image2.png']])
+    gone.unlink()
+
+    changed, unchanged, deleted = manifest.partition(tmp_path, [keep, edit])
+    assert [(path, entry['modified']) for path, entry in changed] == [(edit, True)]
+    assert unchanged == [keep]
+    assert deleted == [str(gone)]
+
+    manifest.purge_deleted(deleted)
+    assert str(gone) not in manifest.load(tmp_path)
+    db.close()
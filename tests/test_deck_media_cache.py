@@ -0,0 +1,39 @@
+"""
+测试虚拟图库的PPT媒体按需读取
+"""
+
+from src.core.images.deck_media_cache import (
+    DeckMediaCache, make_virtual_path, split_virtual_path, local_path_for
+)
+from src.core.ppt.zip_index_cache import ZipIndexCache
+from tests.conftest import PNG_1X1
+
+
+def test_virtual_path_round_trip(tmp_path):
+    """测试虚拟路径的构造与拆分"""
+    pptx_path = str(tmp_path / 'a!b.pptx')
+    path = make_virtual_path(pptx_path, 'ppt/media/image1.png')
+
+    assert split_virtual_path(path) == (pptx_path, 'ppt/media/image1.png')
+    assert local_path_for(path) == pptx_path
+
+
+def test_read_reparses_modified_deck(make_pptx, tmp_path):
+    """测试通过中央目录缓存读取成员，PPT被修改后重新解析"""
+    pptx_path = make_pptx('deck.pptx', [['image1.png']])
+    path = make_virtual_path(pptx_path, 'ppt/media/image1.png')
+    cache = DeckMediaCache(ZipIndexCache(tmp_path / 'zip_index.db'))
+
+    assert cache.read(path) == PNG_1X1
+    assert cache.exists(path)
+    assert not cache.exists(make_virtual_path(pptx_path, 'ppt/media/missing.png'))
+
+    make_pptx('deck.pptx', [['image1.png']], media={'image1.png': PNG_1X1 + b'changed'},
+              compress_media=True)
+    assert cache.read(path) == PNG_1X1 + b'changed'
+    cache.close()
+
+    # 新的缓存实例从磁盘加载已解析的中央目录
+    reloaded = ZipIndexCache(tmp_path / 'zip_index.db')
+    assert reloaded.read(str(pptx_path), 'ppt/media/image1.png') == PNG_1X1 + b'changed'
+    reloaded.close()
@@ -0,0 +1,58 @@
+"""
+测试PPT处理顺序规划和按字节的进度估算
+"""
+
+import zipfile
+from src.core.ppt import deck_scheduler
+from src.core.ppt.deck_scheduler import (
+    ENTRY_COST_BYTES, ByteProgress, format_eta, plan_longest_first, read_zip_entry_count
+)
+
+
+def test_read_zip_entry_count(tmp_path, make_pptx):
+    """测试从中央目录结束记录读取成员数量，非zip文件返回0"""
+    deck = make_pptx('deck.pptx', [['image1.png'], ['image2.png']])
+    with zipfile.ZipFile(deck) as zf:
+        expected = len(zf.infolist())
+    assert read_zip_entry_count(deck, deck.stat().st_size) == expected
+
+    legacy = tmp_path / 'legacy.ppt'
+    legacy.write_bytes(b'\xd0\xcf\x11\xe0' + b'\0' * 100)
+    assert read_zip_entry_count(legacy, legacy.stat().st_size) == 0
+
+
+def test_plan_longest_first_orders_by_size_and_entries(tmp_path, make_pptx):
+    """测试按文件大小加成员数量折算的成本降序排列，无法读取的文件按零成本排在最后"""
+    small = make_pptx('small.pptx', [['image1.png']])
+    many = make_pptx('many.pptx', [[f'image{i}.png' for i in range(1, 4)] for _ in range(8)])
+    big = make_pptx('big.pptx', [['image1.png']], media={'image1.png': b'\x89PNG' + b'\0' * 64 * ENTRY_COST_BYTES})
+    missing = tmp_path / 'missing.pptx'
+
+    plan = plan_longest_first([missing, small, many, big])
+    assert [task['path'] for task in plan] == [big, many, small, missing]
+    assert plan[-1] == {'path': missing, 'size': 0, 'entries': 0, 'cost': 0}
+    for task in plan[:-1]:
+        assert task['cost'] == task['size'] + task['entries'] * ENTRY_COST_BYTES
+
+
+def test_byte_progress_eta(monkeypatch):
+    """测试剩余时间按已处理字节数的比例估算"""
+    clock = [100.0]
+    monkeypatch.setattr(deck_scheduler.time, 'monotonic', lambda: clock[0])
+    progress = ByteProgress(1000)
+    assert progress.eta() is None
+
+    clock[0] = 110.0
+    progress.advance(250)
+    assert progress.eta() == 30.0
+
+    progress.advance(750)
+    assert progress.eta() == 0
+
+
+def test_format_eta():
+    """测试剩余时间的格式化"""
+    assert format_eta(None) == "估算中"
+    assert format_eta(42.7) == "42秒"
+    assert format_eta(125) == "2分5秒"
+    assert format_eta(3 * 3600 + 7 * 60 + 9) == "3小时7分"
@@ -0,0 +1,66 @@
+"""
+测试按显示尺寸精简PPT中的图片
+"""
+
+import io
+import zipfile
+from PIL import Image
+from pptx import Presentation
+from pptx.util import Inches
+from src.core.ppt.deck_slimmer import slim_deck, slim_folder
+
+
+def _image_bytes(size, image_format):
+    buffer = io.BytesIO()
+    # 渐变内容避免纯色图片压缩后过小
+    img = Image.linear_gradient('L').resize(size).convert('RGB')
+    img.save(buffer, image_format)
+    return io.BytesIO(buffer.getvalue())
+
+
+def _make_deck(path):
+    """同一张大图在两页以不同宽度显示，另有一张显示尺寸足够的小图"""
+    prs = Presentation()
+    big = _image_bytes((3000, 2000), 'JPEG').getvalue()
+    first = prs.slides.add_slide(prs.slide_layouts[6])
+    first.shapes.add_picture(io.BytesIO(big), Inches(1), Inches(1), width=Inches(2))
+    first.shapes.add_picture(_image_bytes((200, 100), 'PNG'), Inches(4), Inches(1), width=Inches(2))
+    second = prs.slides.add_slide(prs.slide_layouts[6])
+    second.shapes.add_picture(io.BytesIO(big), Inches(1), Inches(1), width=Inches(4))
+    prs.save(str(path))
+    return path
+
+
+def test_slim_deck_resamples_to_largest_extent(tmp_path):
+    """共享图片按最大显示尺寸重新采样一次，小图保持不变"""
+    deck = _make_deck(tmp_path / 'deck.pptx')
+    result = slim_deck(deck, target_dpi=150)
+
+    assert len(result['images']) == 1
+    image = result['images'][0]
+    assert image['size'] == (3000, 2000)
+    # 最大显示宽度4英寸 × 150 DPI
+    assert image['new_size'] == (600, 400)
+    assert result['size_after'] < result['size_before']
+
+    with zipfile.ZipFile(deck) as zf:
+        assert zf.testzip() is None
+        with Image.open(io.BytesIO(zf.read(image['member']))) as img:
+            assert img.size == (600, 400)
+            assert img.format == 'JPEG'
+    assert len(Presentation(str(deck)).slides) == 2
+
+    # 再次精简不再有需要处理的图片
+    assert slim_deck(deck, target_dpi=150)['images'] == []
+
+
+def test_slim_folder_reports_bytes_saved(tmp_path):
+    _make_deck(tmp_path / 'a.pptx')
+    _make_deck(tmp_path / 'b.pptx')
+
+    summary = slim_folder(str(tmp_path), str(tmp_path / 'out'), workers=2, target_dpi=150)
+
+    assert summary['decks'] == 2
+    assert summary['images'] == 2
+    assert summary['bytes_saved'] > 0
+    assert not summary['failed']
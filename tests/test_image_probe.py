@@ -0,0 +1,36 @@
+"""
+测试图片文件头解析
+"""
+
+import io
+import struct
+import pytest
+from PIL import Image
+from src.core.images.image_probe import probe_image, describe_image
+
+
+@pytest.mark.parametrize("fmt", ["PNG", "JPEG", "GIF", "BMP", "TIFF", "WEBP"])
+def test_probe_raster_formats(fmt):
+    """测试常见位图格式的尺寸解析与PIL一致"""
+    buffer = io.BytesIO()
+    Image.new('RGB', (123, 45), (200, 100, 50)).save(buffer, fmt)
+    assert probe_image(buffer.getvalue()) == (fmt, 123, 45)
+
+
+def test_probe_metafiles():
+    """测试EMF和可放置WMF的尺寸解析"""
+    emf = struct.pack('<II', 1, 108) + struct.pack('<iiii', 0, 0, 639, 479) \
+        + struct.pack('<iiii', 0, 0, 16933, 12700) + b' EMF' + b'\x00' * 64
+    assert probe_image(emf) == ('EMF', 640, 480)
+
+    # 1440单位/英寸，2x1英寸
+    wmf = b'\xD7\xCD\xC6\x9A' + struct.pack('<HhhhhH', 0, 0, 0, 2880, 1440, 1440) + b'\x00' * 6
+    assert probe_image(wmf) == ('WMF', 192, 96)
+
+
+def test_describe_unknown_data():
+    """测试无法识别的数据仍返回哈希和大小"""
+    info = describe_image(b'not an image')
+    assert info['format'] is None
+    assert info['file_size'] == 12
+    assert len(info['hash']) == 32
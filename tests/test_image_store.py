@@ -0,0 +1,71 @@
+"""
+测试内容寻址图片存储
+"""
+
+import hashlib
+import io
+import mmap
+import os
+from src.core.database.db_manager import DatabaseManager
+from src.core.images import image_store
+from src.core.images.image_store import ImageStore
+from src.core.ppt.ppt_extractor import PPTExtractor
+from tests.conftest import PNG_1X1
+
+
+def test_put_and_put_stream_write_each_image_once(tmp_path):
+    """测试内存写入与流式写入得到相同的内容寻址路径，重复内容不再写入"""
+    store = ImageStore(str(tmp_path / 'lib'))
+    data = PNG_1X1 * 50
+    img_hash = hashlib.md5(data).hexdigest()
+
+    assert store.put(data, '.png') == (img_hash, tmp_path / 'lib' / img_hash[:2] / f'{img_hash}.png', True)
+    assert store.put(data, '.png')[2] is False
+
+    stream = io.BytesIO(data)
+    head = stream.read(10)
+    assert store.put_stream(stream, '.png', prefix=head, chunk_size=7) == (img_hash, store.path_for(img_hash, '.png'), False)
+    assert store.put_stream(io.BytesIO(b'other'), '.bin', chunk_size=2)[2] is True
+    # 流式写入的临时文件不会残留
+    assert not list((tmp_path / 'lib').glob('*.tmp'))
+
+
+def test_put_view_copies_file_range_with_fallback(tmp_path, monkeypatch):
+    """测试从内存映射区间写入，内核复制不可用时回退为普通写入"""
+    src = tmp_path / 'src.bin'
+    payload = b'head' + PNG_1X1 + b'tail'
+    src.write_bytes(payload)
+    store = ImageStore(str(tmp_path / 'lib'), shard=False)
+
+    with open(src, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        view = memoryview(mm)[4:4 + len(PNG_1X1)]
+        img_hash, path, written = store.put_view(view, '.png', src_fd=f.fileno(), src_offset=4)
+        assert written and path.read_bytes() == PNG_1X1
+        assert img_hash == hashlib.md5(PNG_1X1).hexdigest()
+
+        def unsupported(*args):
+            raise OSError('cross-device')
+        monkeypatch.setattr(os, 'copy_file_range', unsupported, raising=False)
+        path.unlink()
+        assert store.put_view(view, '.png', src_fd=f.fileno(), src_offset=4)[2]
+        assert path.read_bytes() == PNG_1X1
+        view.release()
+
+    assert image_store._copy_file_range(0, 0, 0, 1) is False
+
+
+def test_shared_image_is_stored_once_across_decks(tmp_path, make_pptx):
+    """测试两个PPT中的相同图片在图库中只保存一份，映射指向同一文件"""
+    (tmp_path / 'decks').mkdir()
+    make_pptx('decks/a.pptx', [['image1.png']])
+    make_pptx('decks/b.pptx', [['photo.png'], ['image9.png']], compress_media=True)
+    db = DatabaseManager(tmp_path / 'app')
+
+    results = PPTExtractor(db).extract_images_from_folder(str(tmp_path / 'decks'), str(tmp_path / 'lib'))
+
+    assert len(results['success']) == 3
+    assert {img['path'] for img in results['success']} == {str(ImageStore(str(tmp_path / 'lib')).path_for(
+        hashlib.md5(PNG_1X1).hexdigest(), '.png'))}
+    assert len([p for p in (tmp_path / 'lib').rglob('*') if p.is_file()]) == 1
+    assert db.execute("SELECT COUNT(*) FROM images").fetchone()[0] == 1
+    db.close()
@@ -0,0 +1,57 @@
+"""
+测试纯XML的版式和母版清理
+"""
+
+import zipfile
+from pptx import Presentation
+from src.core.ppt.layout_cleaner import clean_deck_layouts, clean_folder_layouts
+
+
+def _make_deck(path):
+    """默认模板共11个版式，只使用其中2个"""
+    prs = Presentation()
+    prs.slides.add_slide(prs.slide_layouts[0]).shapes.title.text = '封面'
+    prs.slides.add_slide(prs.slide_layouts[5]).shapes.title.text = '正文'
+    prs.save(str(path))
+    return path
+
+
+def test_clean_deck_layouts_removes_unused_parts(tmp_path):
+    """删除未使用的版式及其部件，幻灯片内容和版式引用保持不变"""
+    deck = _make_deck(tmp_path / 'deck.pptx')
+    result = clean_deck_layouts(deck)
+
+    assert result['layouts'] == 9
+    assert result['placeholders'] > 0
+    assert result['size_after'] < result['size_before']
+
+    with zipfile.ZipFile(deck) as zf:
+        assert zf.testzip() is None
+        layouts = [name for name in zf.namelist() if name.startswith('ppt/slideLayouts/slideLayout')]
+        content_types = zf.read('[Content_Types].xml').decode('utf-8')
+    assert len(layouts) == 2
+    assert content_types.count('slideLayout+xml') == 2
+
+    prs = Presentation(str(deck))
+    assert [slide.slide_layout.name for slide in prs.slides] == ['Title Slide', 'Title Only']
+    assert [slide.shapes.title.text for slide in prs.slides] == ['封面', '正文']
+
+    # 再次清理没有可删除的内容
+    assert clean_deck_layouts(deck)['parts'] == 0
+
+
+def test_clean_folder_layouts_writes_output_tree(tmp_path):
+    """批量模式按相对路径写入输出文件夹，原文件不变"""
+    source = tmp_path / 'src'
+    (source / 'sub').mkdir(parents=True)
+    _make_deck(source / 'a.pptx')
+    _make_deck(source / 'sub' / 'b.pptx')
+    original_size = (source / 'a.pptx').stat().st_size
+
+    summary = clean_folder_layouts(str(source), str(tmp_path / 'out'), workers=2)
+
+    assert summary['decks'] == 2
+    assert summary['layouts'] == 18
+    assert not summary['failed']
+    assert (tmp_path / 'out' / 'sub' / 'b.pptx').exists()
+    assert (source / 'a.pptx').stat().st_size == original_size
@@ -0,0 +1,62 @@
+"""
+测试媒体CRC索引（复用已入库图片的记录）
+"""
+
+import zlib
+from src.core.database.db_manager import DatabaseManager
+from src.core.ppt import ppt_extractor
+from src.core.ppt.ppt_extractor import PPTExtractor
+from src.core.ppt.media_index import MediaCrcIndex
+from tests.conftest import PNG_1X1
+
+
+def _spy_describe(monkeypatch):
+    """记录完整哈希（describe_image）过的图片"""
+    described = []
+    original = ppt_extractor.describe_image
+    monkeypatch.setattr(ppt_extractor, 'describe_image',
+                        lambda data: described.append(data) or original(data))
+    return described
+
+
+def test_known_media_skips_hashing_on_later_runs(tmp_path, make_pptx, monkeypatch):
+    """测试(CRC32, 大小)命中已入库图片的成员不再解压哈希，直接复用已有记录"""
+    logo, photo = PNG_1X1 + b'logo', PNG_1X1 + b'photo'
+    (tmp_path / 'first').mkdir()
+    (tmp_path / 'second').mkdir()
+    make_pptx('first/a.pptx', [['logo.png']], media={'logo.png': logo})
+    make_pptx('second/b.pptx', [['image1.png', 'image2.png']], media={'image1.png': logo, 'image2.png': photo})
+    db = DatabaseManager(tmp_path / 'app')
+    extractor = PPTExtractor(db)
+    described = _spy_describe(monkeypatch)
+
+    extractor.extract_images_from_folder(str(tmp_path / 'first'), None, virtual=True)
+    assert described == [logo]
+    known = MediaCrcIndex(db).load()
+    assert known[(zlib.crc32(logo), len(logo))]['path'].endswith('a.pptx!/ppt/media/logo.png')
+
+    described.clear()
+    results = extractor.extract_images_from_folder(str(tmp_path / 'second'), None, virtual=True)
+    assert described == [photo]
+    # 复用的记录沿用已入库的路径和尺寸
+    reused = next(img for img in results['success'] if img['member'] == 'ppt/media/image1.png')
+    assert reused['path'] == known[(zlib.crc32(logo), len(logo))]['path']
+    assert (reused['width'], reused['height']) == (1, 1)
+    assert db.execute(f"SELECT COUNT(*) FROM {db.table_name}").fetchone()[0] == 2
+
+
+def test_remember_marks_crc_collisions(tmp_path):
+    """测试同一(CRC32, 大小)对应不同图片时标记为冲突，之后只能完整哈希"""
+    image = {'crc32': 1, 'file_size': 10, 'path': 'a.png', 'format': 'PNG', 'width': 1, 'height': 1}
+    index = MediaCrcIndex(DatabaseManager(tmp_path / 'app'))
+    known = {}
+    index.remember( known, [dict(image, hash='aaa')])
+    assert known[(1, 10)]['hash'] == 'aaa'
+
+    index.remember(known, [dict(image, hash='aaa'), {'crc32': None, 'file_size': 10}])
+    assert known[(1, 10)]['hash'] == 'aaa'
+
+    index.remember(known, [dict(image, hash='bbb')])
+    assert known[(1, 10)] is None
+    index.remember(known, [dict(image, hash='ccc')])
+    assert known[(1, 10)] is None
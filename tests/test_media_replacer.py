@@ -0,0 +1,117 @@
+"""
+测试在所有PPT中批量替换图片
+"""
+
+import hashlib
+import io
+import zipfile
+import zlib
+from PIL import Image
+from pptx import Presentation
+from pptx.util import Inches
+from src.core.database.db_manager import DatabaseManager
+from src.core.ppt.ppt_extractor import PPTExtractor
+from src.core.ppt.media_replacer import MediaReplacer, replace_deck_media
+from src.core.images.deck_media_cache import DeckMediaCache
+from src.core.ppt.zip_index_cache import ZipIndexCache
+from src.core.ppt.slide_fingerprint import SlideCopyIndex
+
+
+def _image_bytes(color, image_format='PNG', size=(8, 6)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, image_format)
+    return buffer.getvalue()
+
+
+def _make_deck(path, images):
+    prs = Presentation()
+    for image in images:
+        slide = prs.slides.add_slide(prs.slide_layouts[6])
+        slide.shapes.add_picture(io.BytesIO(image), Inches(1), Inches(1), Inches(2))
+    prs.save(str(path))
+    return path
+
+
+def test_replace_everywhere_rewrites_decks_and_mappings(tmp_path):
+    logo, photo = _image_bytes((200, 30, 30)), _image_bytes((30, 30, 200), size=(16, 12))
+    new_logo = _image_bytes((30, 200, 30), 'JPEG')
+    decks = tmp_path / 'decks'
+    decks.mkdir()
+    deck_a = _make_deck(decks / 'a.pptx', [logo, photo])
+    deck_b = _make_deck(decks / 'b.pptx', [photo, logo])
+    new_path = tmp_path / 'new_logo.jpg'
+    new_path.write_bytes(new_logo)
+
+    db = DatabaseManager(tmp_path / 'app')
+    PPTExtractor(db).extract_images_from_folder(str(decks), str(tmp_path / 'library'))
+    old_hash = db.execute("SELECT img_hash FROM images WHERE width = 8").fetchone()[0]
+    with zipfile.ZipFile(deck_a) as zf:
+        untouched = {name: zf.getinfo(name).CRC for name in zf.namelist() if name != 'ppt/media/image1.png'}
+
+    result = MediaReplacer(db).replace_everywhere(old_hash, str(new_path))
+
+    assert (result['decks'], result['members'], result['failed']) == (2, 2, [])
+    with zipfile.ZipFile(deck_a) as zf:
+        assert zf.read('ppt/media/image1.png') == new_logo
+        assert 'PartName="/ppt/media/image1.png" ContentType="image/jpeg"' in zf.read('[Content_Types].xml').decode()
+        assert all(zf.getinfo(name).CRC == crc for name, crc in untouched.items() if name != '[Content_Types].xml')
+    Presentation(str(deck_b))
+
+    mapped = db.execute(
+        "SELECT pptx_path, slide_index FROM image_ppt_mapping WHERE img_hash = ? ORDER BY pptx_path",
+        (result['hash'],)
+    ).fetchall()
+    assert [tuple(row) for row in mapped] == [(str(deck_a), 1), (str(deck_b), 2)]
+    assert db.execute("SELECT COUNT(*) FROM image_ppt_mapping WHERE img_hash = ?", (old_hash,)).fetchone()[0] == 0
+    new_row = db.execute("SELECT img_path, format FROM images WHERE img_hash = ?", (result['hash'],)).fetchone()
+    assert new_row['format'] == 'JPEG'
+    assert open(new_row['img_path'], 'rb').read() == new_logo
+    # 替换后的幻灯片哈希仍能对应到另一个PPT中的同一页
+    assert [(copy['ppt_name'], copy['slide']) for copy in SlideCopyIndex(db).find_copies(str(deck_a), 1)] == \
+        [('b.pptx', 2)]
+    db.close()
+
+
+def test_crc_candidates_are_confirmed_by_md5(tmp_path):
+    """测试(CRC32, 大小)只用于预筛选：已知媒体索引有误时也不会替换内容不同的成员"""
+    logo, photo = _image_bytes((200, 30, 30)), _image_bytes((30, 30, 200), size=(16, 12))
+    deck = _make_deck(tmp_path / 'deck.pptx', [logo, photo])
+    old_hash = hashlib.md5(logo).hexdigest()
+    logo_key, photo_key = (zlib.crc32(logo), len(logo)), (zlib.crc32(photo), len(photo))
+    # 过期的索引把photo的键指向了原图片
+    known_media = {photo_key: {'hash': old_hash}}
+
+    result = replace_deck_media(deck, old_hash, _image_bytes((30, 200, 30)), '.png', known_media,
+                                old_keys={logo_key, photo_key})
+
+    assert result['members'] == ['ppt/media/image1.png']
+    with zipfile.ZipFile(deck) as zf:
+        assert zf.read('ppt/media/image2.png') == photo
+
+
+def test_virtual_replace_drops_stale_old_image(tmp_path):
+    """测试虚拟图库中替换后原图片记录不再指向已改写的成员"""
+    logo, photo = _image_bytes((200, 30, 30)), _image_bytes((30, 30, 200), size=(16, 12))
+    new_logo = _image_bytes((30, 200, 30))
+    decks = tmp_path / 'decks'
+    decks.mkdir()
+    _make_deck(decks / 'a.pptx', [logo, photo])
+    _make_deck(decks / 'b.pptx', [logo])
+    new_path = tmp_path / 'new_logo.png'
+    new_path.write_bytes(new_logo)
+
+    db = DatabaseManager(tmp_path / 'app')
+    PPTExtractor(db).extract_images_from_folder(str(decks), None, virtual=True)
+    old_hash = hashlib.md5(logo).hexdigest()
+
+    result = MediaReplacer(db).replace_everywhere(old_hash, str(new_path))
+
+    assert (result['decks'], result['failed']) == (2, [])
+    assert db.get_image_by_hash(old_hash) is None
+    cache = DeckMediaCache(ZipIndexCache(tmp_path / 'zip_index.db'))
+    rows = db.execute("SELECT img_hash, img_path FROM images").fetchall()
+    assert {row['img_hash'] for row in rows} == {result['hash'], hashlib.md5(photo).hexdigest()}
+    for row in rows:
+        assert hashlib.md5(cache.read(row['img_path'])).hexdigest() == row['img_hash']
+    db.close()
+
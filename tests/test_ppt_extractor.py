@@ -0,0 +1,216 @@
+"""
+测试文件夹批量提取图片并建立索引
+"""
+
+import hashlib
+from pathlib import Path
+import pytest
+from src.core.images.image_store import ImageStore
+from src.core.images.deck_media_cache import DeckMediaCache, split_virtual_path
+from src.core.ppt.zip_index_cache import ZipIndexCache
+from src.core.database.db_manager import DatabaseManager
+from src.core.ppt import ppt_extractor
+from src.core.ppt.ppt_extractor import PPTExtractor, iter_deck_media
+from src.core.ppt.index_journal import IndexJournal
+from tests.conftest import PNG_1X1
+
+
+def _png(tag: bytes) -> bytes:
+    """内容不同的1x1 PNG（IEND之后的附加字节不影响解码）"""
+    return PNG_1X1 + tag
+
+
+def _make_decks(tmp_path, make_pptx):
+    (tmp_path / 'decks').mkdir()
+    make_pptx('decks/a.pptx', [['logo.png'], ['a.png']], media={'logo.png': _png(b'logo'), 'a.png': _png(b'a')})
+    make_pptx('decks/b.pptx', [['b.png', 'logo.png']], media={'logo.png': _png(b'logo'), 'b.png': _png(b'b')})
+    make_pptx('decks/c.pptx', [['c.png']], media={'c.png': _png(b'c')}, compress_media=True)
+    return tmp_path / 'decks'
+
+
+def _mappings(db):
+    rows = db.execute(
+        "SELECT img_hash, pptx_path, slide_index FROM image_ppt_mapping ORDER BY pptx_path, slide_index, img_hash"
+    ).fetchall()
+    return [tuple(row) for row in rows]
+
+
+def test_parallel_extraction_matches_sequential(tmp_path, make_pptx):
+    """测试多进程提取与顺序提取写入相同的映射"""
+    decks = _make_decks(tmp_path, make_pptx)
+    sequential_db = DatabaseManager(tmp_path / 'seq')
+    parallel_db = DatabaseManager(tmp_path / 'par')
+
+    sequential = PPTExtractor(sequential_db).extract_images_from_folder(str(decks), str(tmp_path / 'lib1'))
+    parallel = PPTExtractor(parallel_db).extract_images_from_folder(str(decks), str(tmp_path / 'lib2'), workers=2)
+
+    assert sequential['failed'] == parallel['failed'] == []
+    assert len(sequential['success']) == len(parallel['success']) == 5
+    assert _mappings(parallel_db) == _mappings(sequential_db)
+    sequential_db.close()
+    parallel_db.close()
+
+
+def test_bulk_ingest_writes_deck_atomically(tmp_path):
+    """测试一个PPT的图片、映射和CRC索引在同一事务中写入，出错时整体回滚"""
+    db = DatabaseManager(tmp_path / 'app')
+    image = {'hash': 'h1', 'path': 'lib/h1.png', 'format': 'PNG', 'width': 1, 'height': 1,
+             'slide': 1, 'shape': '2', 'part': 'ppt/slides/slide1.xml', 'file_size': 10, 'crc32': 123}
+
+    assert db.bulk_ingest('a.pptx', [image, {**image, 'slide': 2}]) == 2
+    assert db.execute("SELECT img_hash FROM media_crc_index WHERE crc32 = 123").fetchone()[0] == 'h1'
+
+    # 文字数据不完整时整个PPT的写入回滚，已有的映射保持不变
+    try:
+        db.bulk_ingest('a.pptx', [{**image, 'hash': 'h2'}], replace_mappings=True, slides=[{'slide': 1}])
+    except KeyError:
+        pass
+    assert _mappings(db) == [('h1', 'a.pptx', 1), ('h1', 'a.pptx', 2)]
+    assert db.execute("SELECT COUNT(*) FROM images WHERE img_hash = 'h2'").fetchone()[0] == 0
+
+    db.bulk_ingest('a.pptx', [{**image, 'hash': 'h2'}], replace_mappings=True)
+    assert _mappings(db) == [('h2', 'a.pptx', 1)]
+    db.close()
+
+
+def test_incremental_rerun_skips_replaces_and_purges(tmp_path, make_pptx):
+    """测试增量索引：跳过未变化的PPT，重新处理修改的PPT，清除已删除PPT的映射"""
+    decks = _make_decks(tmp_path, make_pptx)
+    db = DatabaseManager(tmp_path / 'app')
+    PPTExtractor(db).extract_images_from_folder(str(decks), str(tmp_path / 'lib'))
+    before = _mappings(db)
+
+    make_pptx('decks/b.pptx', [['b2.png']], media={'b2.png': _png(b'b2')})
+    (decks / 'c.pptx').unlink()
+    extractor = PPTExtractor(db)
+    results = extractor.extract_images_from_folder(str(decks), str(tmp_path / 'lib'))
+
+    assert (extractor.total_skipped_ppts, extractor.total_processed_ppts) == (1, 1)
+    assert len(results['success']) == 1
+    after = _mappings(db)
+    assert [row for row in after if row[1].endswith('a.pptx')] == [row for row in before if row[1].endswith('a.pptx')]
+    assert [row[2] for row in after if row[1].endswith('b.pptx')] == [1]
+    assert not any(row[1].endswith('c.pptx') for row in after)
+    db.close()
+
+
+def test_iter_images_streams_records_without_db_writes(tmp_path, make_pptx):
+    """测试流式遍历：不写数据库，不指定图库时携带图片字节，指定时写入图库"""
+    decks = _make_decks(tmp_path, make_pptx)
+    db = DatabaseManager(tmp_path / 'app')
+    extractor = PPTExtractor(db)
+
+    records = list(extractor.iter_images(str(decks)))
+    assert sorted((record['ppt'].rsplit('/', 1)[-1], record['slide']) for record in records) == [
+        ('a.pptx', 1), ('a.pptx', 2), ('b.pptx', 1), ('b.pptx', 1), ('c.pptx', 1)
+    ]
+    assert all(record['data'].startswith(PNG_1X1) and record['width'] == 1 for record in records)
+    assert _mappings(db) == []
+
+    stored = list(extractor.iter_images(str(decks), str(tmp_path / 'lib')))
+    assert all('data' not in record and open(record['path'], 'rb').read().startswith(PNG_1X1) for record in stored)
+    db.close()
+
+
+def test_resume_after_interruption_retries_failed_decks(tmp_path, make_pptx):
+    """测试中途中断后续跑：已完成的PPT不再处理，未完成和失败的PPT重新处理"""
+    decks = _make_decks(tmp_path, make_pptx)
+    db = DatabaseManager(tmp_path / 'app')
+
+    def interrupt(current, total, message):
+        if current == 2:
+            raise KeyboardInterrupt
+    with pytest.raises(KeyboardInterrupt):
+        PPTExtractor(db).extract_images_from_folder(str(decks), str(tmp_path / 'lib'),
+                                                    progress_callback=interrupt)
+
+    journal = IndexJournal(db)
+    job_id = journal.find_resumable(decks)
+    assert journal.get_summary(job_id) == {'pending': 2, 'done': 1, 'failed': 0}
+    # 模拟工作进程崩溃时正在处理的PPT被标记为失败
+    journal.mark_failed(job_id, journal.get_decks(job_id)[0], 'process pool crashed')
+
+    extractor = PPTExtractor(db)
+    results = extractor.extract_images_from_folder(str(decks), str(tmp_path / 'lib'))
+
+    assert results['failed'] == []
+    assert extractor.total_processed_ppts == 2
+    assert journal.get_summary(job_id) == {'pending': 0, 'done': 3, 'failed': 0}
+    assert journal.find_resumable(decks) is None
+    assert len({row[1] for row in _mappings(db)}) == 3
+    db.close()
+
+
+def test_large_media_is_streamed_in_chunks(tmp_path, make_pptx, monkeypatch):
+    """测试超过内存上限的媒体分块流式处理，哈希和写入图库的内容与整体读取一致"""
+    big = PNG_1X1 + bytes(range(256)) * 64
+    deck = make_pptx('deck.pptx', [['big.png']], media={'big.png': big}, compress_media=True)
+    streamed = []
+    original = ppt_extractor._stream_member
+    monkeypatch.setattr(ppt_extractor, '_stream_member',
+                        lambda reader, member, *args: streamed.append(member) or original(reader, member, *args))
+
+    [stored] = iter_deck_media(deck, ImageStore(str(tmp_path / 'lib')), memory_limit=1024, chunk_size=100)
+    [hashed] = iter_deck_media(deck, None, memory_limit=1024, chunk_size=100)
+
+    assert streamed == ['ppt/media/big.png'] * 2
+    assert stored['hash'] == hashed['hash'] == hashlib.md5(big).hexdigest()
+    assert (stored['width'], stored['height']) == (1, 1)
+    with open(stored['path'], 'rb') as f:
+        assert f.read() == big
+    # 流式处理的成员不携带图片字节
+    assert 'data' not in hashed
+
+
+
+def _logo_path(db):
+    row = db.execute(f"SELECT img_path FROM {db.table_name} WHERE img_hash = ?",
+                     (hashlib.md5(_png(b'logo')).hexdigest(),)).fetchone()
+    return row['img_path'] if row else None
+
+
+def test_virtual_image_paths_follow_remaining_decks(tmp_path, make_pptx):
+    """测试虚拟图库中图片首次所在的PPT不再引用或被删除后，图片路径改为指向其他PPT，无引用时删除"""
+    decks = _make_decks(tmp_path, make_pptx)
+    db = DatabaseManager(tmp_path / 'app')
+    extractor = PPTExtractor(db)
+    cache = DeckMediaCache(ZipIndexCache(tmp_path / 'zip_index.db'))
+    extractor.extract_images_from_folder(str(decks), None, virtual=True)
+
+    # logo首次所在的PPT改为不再使用logo：重新索引后指向另一个PPT中的成员
+    first, _ = split_virtual_path(_logo_path(db))
+    first = Path(first)
+    other = decks / ('b.pptx' if first.name == 'a.pptx' else 'a.pptx')
+    own = first.stem + '.png'
+    make_pptx(f'decks/{first.name}', [[own]], media={own: _png(first.stem.encode())})
+    extractor.extract_images_from_folder(str(decks), None, virtual=True)
+    assert split_virtual_path(_logo_path(db)) == (str(other), 'ppt/media/logo.png')
+    assert cache.read(_logo_path(db)) == _png(b'logo')
+
+    # 另一个PPT也被删除：logo和它独有的图片已无PPT引用，记录删除
+    other.unlink()
+    extractor.extract_images_from_folder(str(decks), None, virtual=True)
+    assert _logo_path(db) is None
+    remaining = db.execute(f"SELECT img_path FROM {db.table_name}").fetchall()
+    assert len(remaining) == 2
+    for row in remaining:
+        assert cache.exists(row['img_path'])
+    db.close()
+
+
+def test_shared_image_survives_deleting_first_deck(tmp_path, make_pptx):
+    """测试两个PPT共用的图片在首次所在的PPT被删除后仍可读取"""
+    decks = _make_decks(tmp_path, make_pptx)
+    db = DatabaseManager(tmp_path / 'app')
+    extractor = PPTExtractor(db)
+    cache = DeckMediaCache(ZipIndexCache(tmp_path / 'zip_index.db'))
+    extractor.extract_images_from_folder(str(decks), None, virtual=True)
+
+    first, _ = split_virtual_path(_logo_path(db))
+    Path(first).unlink()
+    extractor.extract_images_from_folder(str(decks), None, virtual=True)
+
+    assert split_virtual_path(_logo_path(db))[0] != first
+    assert cache.exists(_logo_path(db))
+    assert cache.read(_logo_path(db)) == _png(b'logo')
+    db.close()
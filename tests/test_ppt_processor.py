@@ -0,0 +1,57 @@
+"""
+测试PPT处理器打开和移除PPT
+"""
+
+import zipfile
+import pytest
+from src.core.database.db_manager import DatabaseManager
+from src.core.ppt.ppt_processor import PPTProcessor
+
+
+def test_open_presentation_rejects_invalid_files(tmp_path, make_pptx):
+    """测试打开时即检查文件是PPTX：不存在、不是zip、缺少presentation.xml的文件立即报错"""
+    processor = PPTProcessor()
+    with pytest.raises(ValueError, match="打开PPT文件失败"):
+        processor.open_presentation(str(tmp_path / 'missing.pptx'))
+
+    corrupt = tmp_path / 'corrupt.pptx'
+    corrupt.write_bytes(b'PK\x03\x04 truncated')
+    with pytest.raises(ValueError, match="打开PPT文件失败"):
+        processor.open_presentation(str(corrupt))
+
+    not_pptx = tmp_path / 'archive.pptx'
+    with zipfile.ZipFile(not_pptx, 'w') as zf:
+        zf.writestr('readme.txt', 'not a presentation')
+    with pytest.raises(ValueError, match="presentation.xml"):
+        processor.open_presentation(str(not_pptx))
+    assert processor.current_ppt_path is None
+
+    deck = make_pptx('deck.pptx', [['image1.png']])
+    processor.open_presentation(str(deck))
+    assert processor.current_ppt_path == str(deck)
+
+
+def test_removed_source_is_reindexed(tmp_path, make_pptx):
+    """测试移除PPT源后再次增量索引会重新处理该PPT"""
+    (tmp_path / 'decks').mkdir()
+    deck = make_pptx('decks/deck.pptx', [['image1.png'], ['image2.png']])
+    db = DatabaseManager(tmp_path / 'app')
+    processor = PPTProcessor(db)
+
+    def mappings():
+        return db.execute("SELECT COUNT(*) FROM image_ppt_mapping WHERE pptx_path = ?",
+                          (str(deck),)).fetchone()[0]
+
+    processor.ppt_extractor.extract_images_from_folder(str(tmp_path / 'decks'), str(tmp_path / 'lib'))
+    assert mappings() == 2
+
+    processor.remove_ppt_source(str(deck))
+    assert mappings() == 0
+    for table, column in (('ppt_sources', 'path'), ('slides', 'pptx_path'), ('deck_manifest', 'pptx_path')):
+        assert db.execute(f"SELECT COUNT(*) FROM {table} WHERE {column} = ?", (str(deck),)).fetchone()[0] == 0
+
+    processor.ppt_extractor.extract_images_from_folder(str(tmp_path / 'decks'), str(tmp_path / 'lib'))
+    assert processor.ppt_extractor.total_skipped_ppts == 0
+    assert mappings() == 2
+    db.close()
+
@@ -0,0 +1,74 @@
+"""
+测试幻灯片规范化哈希和跨PPT复制查找
+"""
+
+import io
+from PIL import Image
+from pptx import Presentation
+from pptx.util import Inches
+from src.core.database.db_manager import DatabaseManager
+from src.core.ppt.deck_manifest import DeckManifest
+from src.core.ppt.slide_fingerprint import canonicalize_slide, hash_deck_slides, SlideCopyIndex
+
+SLIDE_XML = (
+    '<p:sld xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main" '
+    'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships" '
+    'xmlns:p14="http://schemas.microsoft.com/office/powerpoint/2010/main">'
+    '<p:cSld><p:spTree><p:pic><p:nvPicPr><p:cNvPr id="{shape_id}" name="Logo"/></p:nvPicPr>'
+    '<p:blipFill><a:blip r:embed="{rel_id}"/></p:blipFill></p:pic></p:spTree></p:cSld>'
+    '<p:extLst><p:ext uri="{{BB962C8B-B14F-4D97-AF65-F5344CB8AC3E}}">'
+    '<p14:creationId val="{creation_id}"/></p:ext></p:extLst></p:sld>'
+)
+
+
+def _image_bytes(color):
+    buffer = io.BytesIO()
+    Image.new('RGB', (8, 6), color).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def _make_deck(path, slides):
+    """slides: 每页(标题, 图片字节或None)"""
+    prs = Presentation()
+    for title, image in slides:
+        slide = prs.slides.add_slide(prs.slide_layouts[5])
+        slide.shapes.title.text = title
+        if image:
+            slide.shapes.add_picture(io.BytesIO(image), Inches(1), Inches(1), Inches(2))
+    prs.save(str(path))
+    return path
+
+
+def test_canonicalize_ignores_rel_ids_shape_ids_and_creation_ids():
+    first = SLIDE_XML.format(shape_id=4, rel_id='rId2', creation_id=111)
+    copied = SLIDE_XML.format(shape_id=9, rel_id='rId7', creation_id=222)
+
+    assert canonicalize_slide(first.encode(), {'rId2': 'media:abc'}) == \
+        canonicalize_slide(copied.encode(), {'rId7': 'media:abc'})
+    assert canonicalize_slide(first.encode(), {'rId2': 'media:abc'}) != \
+        canonicalize_slide(copied.encode(), {'rId7': 'media:def'})
+
+
+def test_copied_slide_found_across_decks(tmp_path):
+    logo, photo = _image_bytes((200, 30, 30)), _image_bytes((30, 30, 200))
+    deck_a = _make_deck(tmp_path / 'a.pptx', [('公司介绍', logo), ('目录', None)])
+    # 复制的页在b.pptx中位于第2页，图片成员名和关系ID都不同
+    deck_b = _make_deck(tmp_path / 'b.pptx', [('产品', photo), ('公司介绍', logo), ('目录 ', None)])
+
+    hashes_a = hash_deck_slides(deck_a)
+    hashes_b = hash_deck_slides(deck_b)
+    assert hashes_a[0]['hash'] == hashes_b[1]['hash']
+    assert hashes_a[1]['hash'] != hashes_b[2]['hash']
+
+    db = DatabaseManager(tmp_path / 'app')
+    db.bulk_ingest(str(deck_a), [], slide_hashes=hashes_a)
+    db.bulk_ingest(str(deck_b), [], slide_hashes=hashes_b)
+    index = SlideCopyIndex(db)
+
+    assert [(copy['ppt_name'], copy['slide']) for copy in index.find_copies(str(deck_a), 1)] == [('b.pptx', 2)]
+    assert [group['slides'] for group in index.duplicate_groups()] == [[(str(deck_a), 1), (str(deck_b), 2)]]
+
+    DeckManifest(db).purge_deleted([str(deck_b)])
+    assert index.find_copies(str(deck_a), 1) == []
+    db.close()
@@ -0,0 +1,31 @@
+"""
+测试幻灯片文字全文搜索
+"""
+
+from src.core.database.db_manager import DatabaseManager
+from src.core.ppt.deck_manifest import DeckManifest
+from src.core.ppt.slide_search import SlideTextSearch
+
+
+def test_search_returns_slide_hits_and_follows_reindex(tmp_path):
+    """测试按页返回命中和摘要，重新索引和删除PPT后同步更新"""
+    db = DatabaseManager(tmp_path / "app")
+    search = SlideTextSearch(db)
+    db.bulk_ingest('a.pptx', [], slides=[
+        {'slide': 1, 'text': '项目概览', 'notes': ''},
+        {'slide': 2, 'text': 'EX90 Program timeline', 'notes': '与供应商确认'},
+    ])
+    db.bulk_ingest('b.pptx', [], slides=[{'slide': 3, 'text': 'ex90 program budget', 'notes': ''}])
+
+    hits = search.search('EX90 program')
+    assert sorted((hit['ppt_name'], hit['slide']) for hit in hits) == [('a.pptx', 2), ('b.pptx', 3)]
+    assert all('【' in hit['snippet'] for hit in hits)
+    # 短于3个字符的查询走LIKE，同样能搜到备注
+    assert [(hit['ppt_name'], hit['slide']) for hit in search.search('供应')] == [('a.pptx', 2)]
+
+    db.bulk_ingest('a.pptx', [], replace_mappings=True, slides=[{'slide': 1, 'text': '新内容', 'notes': ''}])
+    assert [hit['ppt_name'] for hit in search.search('EX90 program')] == ['b.pptx']
+
+    DeckManifest(db).purge_deleted(['b.pptx'])
+    assert search.search('EX90 program') == []
+    db.close()
@@ -0,0 +1,182 @@
+"""
+测试DOCX、Keynote、PDF和旧版PPT来源的图片读取
+"""
+
+import io
+import struct
+import zipfile
+import zlib
+import pytest
+from PIL import Image
+from src.core.ppt.ppt_extractor import iter_deck_media
+from src.core.ppt.source_readers import DecodedMediaReader, open_source_reader, iter_source_files
+
+RT = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+NS_REL = 'http://schemas.openxmlformats.org/package/2006/relationships'
+
+
+def _image_bytes(image_format, size=(8, 6), color=(200, 30, 30)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, image_format)
+    return buffer.getvalue()
+
+
+def _build_docx(path, png):
+    rels = (
+        f'<Relationships xmlns="{NS_REL}">'
+        f'<Relationship Id="rId1" Type="{RT}/officeDocument" Target="word/document.xml"/></Relationships>'
+    )
+    doc_rels = (
+        f'<Relationships xmlns="{NS_REL}">'
+        f'<Relationship Id="rId5" Type="{RT}/image" Target="media/image1.png"/></Relationships>'
+    )
+    document = (
+        f'<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+        f'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" '
+        f'xmlns:pic="http://schemas.openxmlformats.org/drawingml/2006/picture" xmlns:r="{RT}">'
+        '<w:body><w:p><w:r><pic:pic><pic:nvPicPr><pic:cNvPr id="7" name="图片"/></pic:nvPicPr>'
+        '<pic:blipFill><a:blip r:embed="rId5"/></pic:blipFill></pic:pic></w:r></w:p></w:body></w:document>'
+    )
+    with zipfile.ZipFile(path, 'w') as zf:
+        zf.writestr('_rels/.rels', rels)
+        zf.writestr('word/document.xml', document)
+        zf.writestr('word/_rels/document.xml.rels', doc_rels)
+        zf.writestr('word/media/image1.png', png)
+    return path
+
+
+def _blip(rec_type, instance, body):
+    return struct.pack('<HHI', instance << 4, rec_type, len(body)) + body
+
+
+def _build_ppt(path, pictures):
+    """只包含Pictures流的最小OLE复合文档（版本3，512字节扇区，流不小于4096字节）"""
+    sector = 512
+    pictures += b'\x00' * (-len(pictures) % sector)
+    stream_sectors = len(pictures) // sector
+
+    def dir_entry(name, obj_type, start, size, child=0xFFFFFFFF):
+        encoded = (name + '\x00').encode('utf-16-le')
+        return (encoded.ljust(64, b'\x00') + struct.pack('<HBB', len(encoded), obj_type, 1)
+                + struct.pack('<III', 0xFFFFFFFF, 0xFFFFFFFF, child) + b'\x00' * 36
+                + struct.pack('<IQ', start, size))
+
+    header = (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1' + b'\x00' * 16
+              + struct.pack('<HHHHH', 0x3E, 3, 0xFFFE, 9, 6) + b'\x00' * 10
+              + struct.pack('<IIIIIIII', 1, 1, 0, 4096, 0xFFFFFFFE, 0, 0xFFFFFFFE, 0)
+              + struct.pack('<109I', 0, *[0xFFFFFFFF] * 108))
+    # 扇区0为FAT，扇区1为目录，之后是Pictures流
+    fat = [0xFFFFFFFD, 0xFFFFFFFE] + list(range(3, 2 + stream_sectors)) + [0xFFFFFFFE]
+    fat += [0xFFFFFFFF] * (sector // 4 - len(fat))
+    directory = (dir_entry('Root Entry', 5, 0xFFFFFFFE, 0, child=1)
+                 + dir_entry('Pictures', 2, 2, len(pictures))).ljust(sector, b'\x00')
+    path.write_bytes(header + struct.pack(f'<{len(fat)}I', *fat) + directory + pictures)
+    return path
+
+
+def _build_pdf(path, jpeg, rgb_pixels, size):
+    """包含一张JPEG、一张Flate像素图及其SMask的PDF"""
+    width, height = size
+    flate = zlib.compress(rgb_pixels)
+    mask = zlib.compress(b'\xff' * (width * height))
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [] /Count 0 >>',
+        b'<< /Type /XObject /Subtype /Image /Width 8 /Height 6 /ColorSpace /DeviceRGB '
+        b'/BitsPerComponent 8 /Filter /DCTDecode /Length %d >>\nstream\n' % len(jpeg) + jpeg + b'\nendstream',
+        b'<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace [/ICCBased 6 0 R] '
+        b'/BitsPerComponent 8 /Filter [/FlateDecode] /SMask 5 0 R /Length 7 0 R >>\nstream\n'
+        % (width, height) + flate + b'\nendstream',
+        b'<< /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceGray /BitsPerComponent 8 '
+        b'/Filter /FlateDecode /Length %d >>\nstream\n' % (width, height, len(mask)) + mask + b'\nendstream',
+        b'<< /N 3 /Length 0 >>\nstream\n\nendstream',
+        b'%d' % len(flate),
+    ]
+    out = io.BytesIO()
+    out.write(b'%PDF-1.7\n%\xe2\xe3\xcf\xd3\n')
+    for num, body in enumerate(objects, 1):
+        out.write(b'%d 0 obj\n' % num + body + b'\nendobj\n')
+    out.write(b'trailer\n<< /Root 1 0 R /Size 8 >>\n%%EOF\n')
+    path.write_bytes(out.getvalue())
+    return path
+
+
+def test_docx_images_follow_relationships(tmp_path):
+    png = _image_bytes('PNG')
+    docx = _build_docx(tmp_path / 'report.docx', png)
+
+    records = list(iter_deck_media(docx))
+
+    assert len(records) == 1
+    assert records[0]['member'] == 'word/media/image1.png'
+    assert records[0]['part'] == 'word/document.xml'
+    assert records[0]['shape'] == '7'
+    assert records[0]['slide'] == 0
+    assert records[0]['data'] == png
+
+
+def test_keynote_skips_previews_and_small_copies(tmp_path):
+    keynote = tmp_path / 'design.key'
+    with zipfile.ZipFile(keynote, 'w') as zf:
+        zf.writestr('Index/Document.iwa', b'\x00')
+        zf.writestr('Data/render-123.jpg', _image_bytes('JPEG'))
+        zf.writestr('Data/render-small-123.jpg', _image_bytes('JPEG', (2, 2)))
+        zf.writestr('preview.jpg', _image_bytes('JPEG'))
+
+    with open_source_reader(keynote) as reader:
+        assert [media['member'] for media in reader.iter_media()] == ['Data/render-123.jpg']
+
+
+def test_pdf_images_are_extracted_without_masks(tmp_path):
+    jpeg = _image_bytes('JPEG')
+    size = (4, 3)
+    pixels = bytes(range(size[0] * size[1] * 3))
+    pdf = _build_pdf(tmp_path / 'brochure.pdf', jpeg, pixels, size)
+
+    records = {record['member']: record for record in iter_deck_media(pdf)}
+
+    assert sorted(records) == ['obj/3.jpg', 'obj/4.png']
+    assert records['obj/3.jpg']['data'] == jpeg
+    with Image.open(io.BytesIO(records['obj/4.png']['data'])) as img:
+        assert img.size == size
+        assert img.tobytes() == pixels
+    assert records['obj/4.png']['width'] == 4
+
+
+def test_iter_source_files(tmp_path):
+    for name in ('a.pptx', 'b.docx', 'c.pdf', 'd.key', '~$e.pptx', 'f.txt'):
+        (tmp_path / name).write_bytes(b'')
+    (tmp_path / 'bundle.key').mkdir()
+
+    assert sorted(path.name for path in iter_source_files(tmp_path)) == ['a.pptx', 'b.docx', 'c.pdf', 'd.key']
+
+
+def test_legacy_ppt_pictures_stream(tmp_path):
+    png = _image_bytes('PNG')
+    emf = b'\x01\x00\x00\x00' + bytes(range(60))
+    emf_header = struct.pack('<I4i2iIBB', len(emf), 0, 0, 100, 50, 914400, 457200,
+                             len(zlib.compress(emf)), 0, 0xFE)
+    pictures = (
+        _blip(0xF01E, 0x6E0, b'\x11' * 16 + b'\xff' + png)
+        # 未知记录和填充按记录头跳过
+        + _blip(0xF000, 0, b'\x00' * 4096)
+        + _blip(0xF01A, 0x3D5, b'\x22' * 32 + emf_header + zlib.compress(emf))
+    )
+    ppt = _build_ppt(tmp_path / 'legacy.ppt', pictures)
+
+    records = {record['member']: record for record in iter_deck_media(ppt)}
+
+    emf_member = f'Pictures/{len(png) + 25 + 4104}.emf'
+    assert sorted(records) == sorted(['Pictures/0.png', emf_member])
+    assert records['Pictures/0.png']['data'] == png
+    assert records['Pictures/0.png']['slide'] == 0
+    assert records[emf_member]['data'] == emf
+
+
+def test_decoded_media_reader_requires_decoder():
+    class Incomplete(DecodedMediaReader):
+        def _get_media(self):
+            return {}
+
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,51 @@
+"""
+测试文本框自动调整（直接改写bodyPr）
+"""
+
+from pptx import Presentation
+from pptx.enum.text import MSO_AUTO_SIZE
+from pptx.util import Inches
+from src.core.ppt.text_autofit import adjust_deck_text_boxes, adjust_folder_text_boxes
+
+
+def _make_deck(path):
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    for idx in range(3):
+        box = slide.shapes.add_textbox(Inches(1), Inches(1 + idx), Inches(3), Inches(1))
+        box.text_frame.text = f'文本框{idx}'
+        box.text_frame.word_wrap = True
+        box.text_frame.auto_size = MSO_AUTO_SIZE.TEXT_TO_FIT_SHAPE
+    prs.save(str(path))
+    return path
+
+
+def test_adjust_deck_text_boxes(tmp_path):
+    """所有文本框改为不换行并根据文字调整形状大小，再次运行没有改动"""
+    deck = _make_deck(tmp_path / 'deck.pptx')
+
+    report = adjust_deck_text_boxes(deck, dry_run=True)
+    assert len(report['shapes']) == 3
+    assert report['shapes'][0]['changes'] == ['wrap', 'autofit']
+    assert Presentation(str(deck)).slides[0].shapes[0].text_frame.word_wrap is True
+
+    adjust_deck_text_boxes(deck)
+    for shape in Presentation(str(deck)).slides[0].shapes:
+        assert shape.text_frame.word_wrap is False
+        assert shape.text_frame.auto_size == MSO_AUTO_SIZE.SHAPE_TO_FIT_TEXT
+
+    assert adjust_deck_text_boxes(deck)['shapes'] == []
+
+
+def test_adjust_folder_text_boxes_dry_run(tmp_path):
+    """批量试运行只生成报告，不修改文件"""
+    _make_deck(tmp_path / 'a.pptx')
+    _make_deck(tmp_path / 'b.pptx')
+    before = (tmp_path / 'a.pptx').read_bytes()
+
+    summary = adjust_folder_text_boxes(str(tmp_path), workers=2, dry_run=True)
+
+    assert summary['decks'] == 2
+    assert summary['shapes'] == 6
+    assert {row['ppt'] for row in summary['report']} == {str(tmp_path / 'a.pptx'), str(tmp_path / 'b.pptx')}
+    assert (tmp_path / 'a.pptx').read_bytes() == before
@@ -0,0 +1,80 @@
+"""
+测试幻灯片文字流式提取
+"""
+
+import json
+import zipfile
+from src.core.ppt.text_extractor import extract_deck_text, export_folder_text
+
+NS_REL = 'http://schemas.openxmlformats.org/package/2006/relationships'
+RT = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+NS_P = 'http://schemas.openxmlformats.org/presentationml/2006/main'
+NS_A = 'http://schemas.openxmlformats.org/drawingml/2006/main'
+
+
+def _paragraph(*runs):
+    return '<a:p>' + ''.join(f'<a:r><a:t>{run}</a:t></a:r>' for run in runs) + '</a:p>'
+
+
+def _build_text_deck(path):
+    """构建包含组合形状、表格和备注的PPTX"""
+    sp = '<p:sp><p:txBody>{}</p:txBody></p:sp>'
+    slide = (
+        f'<p:sld xmlns:p="{NS_P}" xmlns:a="{NS_A}" xmlns:r="{RT}"><p:cSld><p:spTree>'
+        + sp.format(_paragraph('标题', '文字'))
+        + '<p:grpSp>' + sp.format(_paragraph('组合内')) + '</p:grpSp>'
+        + '<p:graphicFrame><a:graphic><a:graphicData><a:tbl><a:tr><a:tc><a:txBody>'
+        + _paragraph('单元格') + '</a:txBody></a:tc></a:tr></a:tbl></a:graphicData></a:graphic></p:graphicFrame>'
+        + '</p:spTree></p:cSld></p:sld>'
+    )
+    notes = (
+        f'<p:notes xmlns:p="{NS_P}" xmlns:a="{NS_A}"><p:cSld><p:spTree>'
+        + sp.format(_paragraph('备注内容'))
+        + sp.format('<a:p><a:fld type="slidenum"><a:t>1</a:t></a:fld></a:p>')
+        + '</p:spTree></p:cSld></p:notes>'
+    )
+    with zipfile.ZipFile(str(path), 'w') as zf:
+        zf.writestr('_rels/.rels', (
+            f'<Relationships xmlns="{NS_REL}"><Relationship Id="rId1" '
+            f'Type="{RT}/officeDocument" Target="ppt/presentation.xml"/></Relationships>'
+        ))
+        zf.writestr('ppt/presentation.xml', (
+            f'<p:presentation xmlns:p="{NS_P}" xmlns:r="{RT}">'
+            '<p:sldIdLst><p:sldId id="256" r:id="rId1"/></p:sldIdLst></p:presentation>'
+        ))
+        zf.writestr('ppt/_rels/presentation.xml.rels', (
+            f'<Relationships xmlns="{NS_REL}"><Relationship Id="rId1" '
+            f'Type="{RT}/slide" Target="slides/slide1.xml"/></Relationships>'
+        ))
+        zf.writestr('ppt/slides/slide1.xml', slide)
+        zf.writestr('ppt/slides/_rels/slide1.xml.rels', (
+            f'<Relationships xmlns="{NS_REL}"><Relationship Id="rId1" '
+            f'Type="{RT}/notesSlide" Target="../notesSlides/notesSlide1.xml"/></Relationships>'
+        ))
+        zf.writestr('ppt/notesSlides/notesSlide1.xml', notes)
+    return path
+
+
+def test_extract_deck_text_includes_groups_tables_and_notes(tmp_path):
+    """测试提取组合形状、表格中的文字和备注，跳过备注页码"""
+    pptx_path = _build_text_deck(tmp_path / 'text.pptx')
+
+    assert extract_deck_text(pptx_path) == [
+        {'slide': 1, 'text': '标题文字\n组合内\n单元格', 'notes': '备注内容'}
+    ]
+
+
+def test_export_folder_text_writes_jsonl(tmp_path):
+    """测试批量模式按页写出JSONL，损坏的PPT单独记录错误"""
+    folder = tmp_path / 'decks'
+    folder.mkdir()
+    _build_text_deck(folder / 'a.pptx')
+    (folder / 'broken.pptx').write_bytes(b'not a zip')
+    output = tmp_path / 'text.jsonl'
+
+    summary = export_folder_text(str(folder), str(output))
+
+    lines = [json.loads(line) for line in output.read_text(encoding='utf-8').splitlines()]
+    assert summary['decks'] == 2 and summary['slides'] == 1 and len(summary['failed']) == 1
+    assert {'ppt': str(folder / 'a.pptx'), 'slide': 1, 'text': '标题文字\n组合内\n单元格',
+            'notes': '备注内容'} in lines
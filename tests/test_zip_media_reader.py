@@ -0,0 +1,111 @@
+"""
+测试PPTX压缩包媒体读取器
+"""
+
+from src.core.ppt.zip_media_reader import ZipMediaReader, resolve_target, rels_path_for
+
+
+def test_rels_path_and_target_resolution():
+    """测试关系文件路径与相对Target解析"""
+    assert rels_path_for('ppt/slides/slide1.xml') == 'ppt/slides/_rels/slide1.xml.rels'
+    assert resolve_target('ppt/slides/slide1.xml', '../media/image1.png') == 'ppt/media/image1.png'
+    assert resolve_target('ppt/slides/slide1.xml', '/ppt/media/image2.png') == 'ppt/media/image2.png'
+
+
+def test_iter_media_resolves_slide_ownership(make_pptx):
+    """测试按幻灯片顺序解析媒体归属"""
+    pptx_path = make_pptx('deck.pptx', [['image1.png'], [], ['image1.png', 'image2.png']])
+
+    with ZipMediaReader(str(pptx_path)) as reader:
+        media = list(reader.iter_media())
+
+    assert [(m['slide'], m['member']) for m in media] == [
+        (1, 'ppt/media/image1.png'),
+        (3, 'ppt/media/image1.png'),
+        (3, 'ppt/media/image2.png'),
+    ]
+    assert all(m['content_type'] == 'image/png' for m in media)
+    assert all(m['ext'] == '.png' for m in media)
+
+
+def test_stored_view_matches_member_bytes(make_pptx):
+    """测试未压缩成员的内存映射视图与解压结果一致，压缩成员不提供视图"""
+    data = b'\x89PNG' + bytes(range(256)) * 4
+    stored = make_pptx('stored.pptx', [['image1.png']], media={'image1.png': data})
+    deflated = make_pptx('deflated.pptx', [['image1.png']], media={'image1.png': data},
+                         compress_media=True)
+
+    with ZipMediaReader(str(stored)) as reader:
+        offset, size = reader.get_stored_range('ppt/media/image1.png')
+        with reader.stored_view('ppt/media/image1.png') as view:
+            assert bytes(view) == reader.read('ppt/media/image1.png') == data
+        assert size == len(data)
+        assert stored.read_bytes()[offset:offset + size] == data
+
+    with ZipMediaReader(str(deflated)) as reader:
+        assert reader.stored_view('ppt/media/image1.png') is None
+
+
+def test_iter_media_walks_groups_layouts_masters_and_notes(tmp_path):
+    """测试关系图遍历覆盖组合形状、背景、版式、母版和备注"""
+    import zipfile
+    from tests.conftest import PNG_1X1
+
+    ns_rel = 'http://schemas.openxmlformats.org/package/2006/relationships'
+    rt = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+    p = 'http://schemas.openxmlformats.org/presentationml/2006/main'
+    a = 'http://schemas.openxmlformats.org/drawingml/2006/main'
+
+    def rels(*items):
+        return f'<Relationships xmlns="{ns_rel}">' + ''.join(
+            f'<Relationship Id="{rid}" Type="{rt}/{kind}" Target="{target}"/>'
+            for rid, kind, target in items
+        ) + '</Relationships>'
+
+    def part(body):
+        return f'<p:sld xmlns:p="{p}" xmlns:a="{a}" xmlns:r="{rt}"><p:cSld>{body}</p:cSld></p:sld>'
+
+    pic = ('<p:pic><p:nvPicPr><p:cNvPr id="{id}" name="pic"/></p:nvPicPr>'
+           '<p:blipFill><a:blip r:embed="{rid}"/></p:blipFill></p:pic>')
+    pptx_path = tmp_path / 'graph.pptx'
+    with zipfile.ZipFile(str(pptx_path), 'w') as zf:
+        zf.writestr('_rels/.rels', rels(('rId1', 'officeDocument', 'ppt/presentation.xml')))
+        zf.writestr('ppt/presentation.xml', (
+            f'<p:presentation xmlns:p="{p}" xmlns:r="{rt}">'
+            '<p:sldIdLst><p:sldId id="256" r:id="rId1"/></p:sldIdLst></p:presentation>'
+        ))
+        zf.writestr('ppt/_rels/presentation.xml.rels', rels(('rId1', 'slide', 'slides/slide1.xml')))
+        zf.writestr('ppt/slides/slide1.xml', part(
+            '<p:bg><p:bgPr><a:blipFill><a:blip r:embed="rId2"/></a:blipFill></p:bgPr></p:bg>'
+            '<p:spTree><p:grpSp><p:nvGrpSpPr><p:cNvPr id="5" name="group"/></p:nvGrpSpPr>'
+            + pic.format(id=6, rid='rId3') + '</p:grpSp></p:spTree>'
+        ))
+        zf.writestr('ppt/slides/_rels/slide1.xml.rels', rels(
+            ('rId1', 'slideLayout', '../slideLayouts/slideLayout1.xml'),
+            ('rId2', 'image', '../media/bg.png'),
+            ('rId3', 'image', '../media/grouped.png'),
+            ('rId4', 'notesSlide', '../notesSlides/notesSlide1.xml'),
+        ))
+        zf.writestr('ppt/notesSlides/notesSlide1.xml', part('<p:spTree>' + pic.format(id=2, rid='rId1') + '</p:spTree>'))
+        zf.writestr('ppt/notesSlides/_rels/notesSlide1.xml.rels', rels(('rId1', 'image', '../media/notes.png')))
+        zf.writestr('ppt/slideLayouts/slideLayout1.xml', part('<p:spTree>' + pic.format(id=3, rid='rId2') + '</p:spTree>'))
+        zf.writestr('ppt/slideLayouts/_rels/slideLayout1.xml.rels', rels(
+            ('rId1', 'slideMaster', '../slideMasters/slideMaster1.xml'),
+            ('rId2', 'image', '../media/layout.png'),
+        ))
+        zf.writestr('ppt/slideMasters/slideMaster1.xml', part('<p:spTree>' + pic.format(id=4, rid='rId1') + '</p:spTree>'))
+        zf.writestr('ppt/slideMasters/_rels/slideMaster1.xml.rels', rels(('rId1', 'image', '../media/master.png')))
+        for name in ('bg', 'grouped', 'notes', 'layout', 'master'):
+            zf.writestr(f'ppt/media/{name}.png', PNG_1X1)
+
+    with ZipMediaReader(str(pptx_path)) as reader:
+        media = [(m['slide'], m['part'].rsplit('/', 1)[-1], m['shape'], m['member'].rsplit('/', 1)[-1])
+                 for m in reader.iter_media()]
+
+    assert media == [
+        (1, 'slide1.xml', 'background', 'bg.png'),
+        (1, 'slide1.xml', '6', 'grouped.png'),
+        (0, 'slideLayout1.xml', '3', 'layout.png'),
+        (0, 'slideMaster1.xml', '4', 'master.png'),
+        (1, 'notesSlide1.xml', '2', 'notes.png'),
+    ]